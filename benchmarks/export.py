@@ -0,0 +1,78 @@
+"""
+Throughput and peak memory of the interview export encoders.
+
+Streams --interviews synthetic graded interviews, in pages of the export's page size, through
+every format and encoding, and reports the time per row, output size and the peak traced
+allocation (which should not grow with --interviews).
+
+    python benchmarks/export.py --interviews 100000
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from helper.company.export import EXPORT_PAGE_SIZE, export_stream
+from helper.evaluation.rubrics import get_rubric
+
+VARIANTS = (("csv", None), ("csv", "gzip"), ("csv", "zstd"), ("xlsx", None))
+
+
+def pages(count: int, seed: int):
+    rng = random.Random(seed)
+    fields = get_rubric().schema.model_fields
+    for start in range(0, count, EXPORT_PAGE_SIZE):
+        page = []
+        for idx in range(start, min(count, start + EXPORT_PAGE_SIZE)):
+            scores = None
+            if rng.random() < 0.8:
+                scores = {
+                    name: rng.randint(0, 100) if info.annotation is int else f"Candidate {idx} {name.replace('_', ' ')} notes " * rng.randint(1, 4)
+                    for name, info in fields.items()
+                }
+            page.append({
+                "id": idx + 1,
+                "created_at": "2026-10-01T12:00:00+00:00",
+                "candidate_name": f"Candidate {idx}",
+                "candidate_email": f"candidate{idx}@example.com",
+                "candidate_phone": f"+1555{idx:07d}",
+                "position": rng.choice(("Backend Engineer", "Data Scientist", "Product Manager")),
+                "status": "Completed",
+                "interview_date": "2026-10-01",
+                "interview_time": "12:00:00",
+                "call_status": "ended",
+                "call_duration_seconds": round(rng.uniform(120, 1800), 3),
+                "call_cost": round(rng.uniform(0.1, 2), 4),
+                "grading_cost": round(rng.uniform(0, 0.01), 6),
+                "ai_evaluation": scores,
+            })
+        yield page
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interviews", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.interviews} interviews, pages of {EXPORT_PAGE_SIZE}")
+    for export_format, encoding in VARIANTS:
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in export_stream(pages(args.interviews, args.seed), export_format, encoding))
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        for _ in export_stream(pages(args.interviews, args.seed), export_format, encoding):
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        label = f"{export_format}{'+' + encoding if encoding else ''}"
+        print(f"  {label:<9} {elapsed:6.2f} s  {elapsed / args.interviews * 1e6:6.1f} us/row  {size / 2**20:7.1f} MiB  peak {peak / 2**20:5.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Throughput of the local heuristic grading backend, in one process and across --workers
+processes (how grading scales out on our own hardware).
+
+Grades --transcripts synthetic interviews of --turns question/answer turns with every rubric.
+
+    python benchmarks/heuristic_grading.py --transcripts 2000 --turns 12 --workers 4
+"""
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from helper.evaluation.engine import evaluate
+from helper.evaluation.heuristic import SIGNALS, FILLERS
+from helper.evaluation.rubrics import list_rubrics
+
+FILLER_WORDS = "the a so and then it was that on our with for this to of in".split()
+
+
+def transcript(rng: random.Random, turns: int) -> str:
+    phrases = [phrase for group in SIGNALS.values() for phrase in group]
+    lines = []
+    for turn in range(turns):
+        lines.append(f"AI: Question {turn + 1}, can you walk me through it?")
+        words = rng.choices(FILLER_WORDS, k=rng.randint(20, 150))
+        for _ in range(rng.randint(0, 8)):
+            words.insert(rng.randrange(len(words)), rng.choice(phrases))
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words)), rng.choice(FILLERS))
+        lines.append("User: " + " ".join(words) + ".")
+    return "\n".join(lines)
+
+def grade_all(transcripts: list[str]) -> int:
+    rubrics = list_rubrics()
+    for text in transcripts:
+        for rubric in rubrics:
+            evaluate(text, rubric.name, rubric.version, backend="heuristic")
+    return len(transcripts) * len(rubrics)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transcripts", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    transcripts = [transcript(rng, args.turns) for _ in range(args.transcripts)]
+    words = sum(len(text.split()) for text in transcripts) / len(transcripts)
+
+    start = time.perf_counter()
+    grades = grade_all(transcripts)
+    single = time.perf_counter() - start
+
+    chunks = [transcripts[idx::args.workers] for idx in range(args.workers)]
+    with ProcessPoolExecutor(args.workers) as pool:
+        list(pool.map(grade_all, [chunks[0][:1]] * args.workers))
+        start = time.perf_counter()
+        sum(pool.map(grade_all, chunks))
+        parallel = time.perf_counter() - start
+
+    print(f"{args.transcripts} transcripts, {words:.0f} words on average, {grades} grades")
+    print(f"  1 process   {single:7.2f} s  {single / grades * 1e3:6.2f} ms/grade  {grades / single:8.0f} grades/s")
+    print(f"  {args.workers} processes {parallel:7.2f} s  {parallel / grades * 1e3:6.2f} ms/grade  {grades / parallel:8.0f} grades/s")
+
+
+if __name__ == "__main__":
+    main()
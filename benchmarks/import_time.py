@@ -0,0 +1,84 @@
+"""
+Measures how long `import main` takes in a fresh interpreter and which top-level packages
+dominate it, using `python -X importtime`.
+
+    python benchmarks/import_time.py                  # current tree
+    python benchmarks/import_time.py --compare HEAD~1 # current tree vs. another git ref
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def measure(tree: Path, runs: int) -> tuple[list[float], dict[str, float]]:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    totals, by_package = [], defaultdict(list)
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import main"],
+            cwd=tree, env=env, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise SystemExit(proc.stderr[-2000:])
+        # Lines are emitted children-first: the depth-1 entries right before the top-level
+        # "main" line are what main imported, each with the cumulative cost of its subtree.
+        children, packages, total = defaultdict(float), {}, None
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, raw_name = line.split(":", 1)[1].split("|", 2)
+            if not cumulative.strip().isdigit():
+                continue
+            depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+            name = raw_name.strip()
+            if depth == 0:
+                if name == "main":
+                    packages, total = dict(children), int(cumulative) / 1000
+                children = defaultdict(float)
+            elif depth == 1:
+                children[name.split(".")[0]] += int(cumulative) / 1000
+        totals.append(total)
+        for name, value in packages.items():
+            by_package[name].append(value)
+    return totals, {name: statistics.median(values) for name, values in by_package.items()}
+
+def report(label: str, totals: list[float], packages: dict[str, float], top: int):
+    print(f"{label}: import main median {statistics.median(totals):.1f} ms (min {min(totals):.1f}, runs {len(totals)})")
+    for name, value in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"    {name:<28} {value:8.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--compare", metavar="GIT_REF", help="also measure this ref in a temporary worktree")
+    args = parser.parse_args()
+
+    current = measure(ROOT, args.runs)
+    report("current", *current, args.top)
+
+    if args.compare:
+        with tempfile.TemporaryDirectory() as tmp:
+            worktree = Path(tmp) / "baseline"
+            subprocess.run(["git", "worktree", "add", "--detach", str(worktree), args.compare], cwd=ROOT, check=True, capture_output=True)
+            try:
+                env_file = ROOT / ".env"
+                if env_file.exists():
+                    (worktree / ".env").write_text(env_file.read_text())
+                baseline = measure(worktree, args.runs)
+            finally:
+                subprocess.run(["git", "worktree", "remove", "--force", str(worktree)], cwd=ROOT, check=True, capture_output=True)
+        report(args.compare, *baseline, args.top)
+        speedup = statistics.median(baseline[0]) / statistics.median(current[0])
+        print(f"speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Cost of turning interview rows into a response body, per 1k rows.
+
+    before  build InterviewBasic per row with ai_evaluation re-encoded by json.dumps, then the
+            response_model pass FastAPI runs on the returned list (dump, re-validate,
+            serialize to JSON-compatible data, json.dumps)
+    after   rows selected with the model's columns go straight to ORJSONResponse
+
+    python benchmarks/serialization.py --rows 1000 5000 --repeat 20
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime, time as dtime, timezone
+from pathlib import Path
+from pydantic import BaseModel, TypeAdapter
+from fastapi.responses import ORJSONResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from routes.company import INTERVIEW_COLUMNS, _interview_out
+from helper.evaluation.rubrics import InterviewScores
+
+
+class LegacyInterviewBasic(BaseModel):
+    id: int
+    created_at: datetime
+    company_id: str
+    candidate_name: str
+    candidate_email: str | None = None
+    candidate_phone: str
+    position: str | None = None
+    status: str
+    interview_date: date | None = None
+    interview_time: dtime | None = None
+    call_id: str | None = None
+    transcript: str | None = None
+    ai_evaluation: str | None = None
+
+
+def make_rows(count: int) -> list[dict]:
+    scores = {
+        name: (7 if name.endswith("_score") else "Clear, structured answers with concrete examples.")
+        for name in InterviewScores.model_fields
+    }
+    scores["recommendation"] = "Hire"
+    scores["key_strengths"] = "System design, communication"
+    columns = INTERVIEW_COLUMNS.split(", ")
+    rows = []
+    for idx in range(count):
+        row = {
+            "id": idx + 1,
+            "created_at": datetime(2025, 1, 1, tzinfo=timezone.utc).isoformat(),
+            "company_id": "6f1c2a4e-8f0b-4c1e-9d8e-2b6a1f3c5d7e",
+            "candidate_name": f"Candidate {idx}",
+            "candidate_email": f"candidate{idx}@example.com",
+            "candidate_phone": "+15555550100",
+            "position": "Backend Engineer",
+            "status": "Completed",
+            "interview_date": "2025-01-02",
+            "interview_time": "10:30:00",
+            "call_id": f"call-{idx}",
+            "transcript": "AI: Tell me about yourself.\nUser: I build backend services. " * 20,
+            "ai_evaluation": dict(scores),
+        }
+        rows.append({column: row[column] for column in columns})
+    return rows
+
+def before(rows: list[dict]) -> bytes:
+    models = []
+    for interview_dict in rows:
+        interview_dict = dict(interview_dict)
+        if interview_dict.get("ai_evaluation") and isinstance(interview_dict["ai_evaluation"], dict):
+            interview_dict["ai_evaluation"] = json.dumps(interview_dict["ai_evaluation"])
+        models.append(LegacyInterviewBasic(**interview_dict))
+    adapter = TypeAdapter(list[LegacyInterviewBasic])
+    content = [model.model_dump() for model in models]
+    validated = adapter.validate_python(content)
+    data = adapter.dump_python(validated, mode="json")
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+def after(rows: list[dict]) -> bytes:
+    return ORJSONResponse([_interview_out(dict(row)) for row in rows]).body
+
+def timed(fn, rows: list[dict], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(rows)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for count in args.rows:
+        rows = make_rows(count)
+        before_ms = timed(before, rows, args.repeat)
+        after_ms = timed(after, rows, args.repeat)
+        per_k = 1000 / count
+        print(
+            f"{count:>6} rows  before {before_ms * per_k:8.2f} ms/1k  after {after_ms * per_k:8.2f} ms/1k  "
+            f"({before_ms / after_ms:.1f}x)  body {len(after(rows)) / count:.0f} B/row"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Throughput of the offline workflow checks over many generated workflows.
+
+Renders --workflows workflows from every template with random question counts, then for each
+one validates the graph, computes the turn range and runs --scripts simulated calls with
+random answer scores.
+
+    python benchmarks/workflow_check.py --workflows 5000 --max-questions 30 --scripts 5
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from helper.company.workflow_check import WorkflowGraph, check_workflow, question_script
+from helper.company.workflow_templates import list_workflow_templates
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workflows", type=int, default=5000)
+    parser.add_argument("--max-questions", type=int, default=30)
+    parser.add_argument("--scripts", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    templates = list_workflow_templates()
+    start = time.perf_counter()
+    workflows = []
+    for idx in range(args.workflows):
+        count = rng.randint(0, args.max_questions)
+        workflows.append((count, templates[idx % len(templates)].render([f"Question {n + 1}" for n in range(count)])))
+    rendered = time.perf_counter()
+
+    problems = turns = 0
+    for _, workflow in workflows:
+        report = check_workflow(workflow)
+        problems += len(report.problems)
+        turns += report.max_turns or 0
+    checked = time.perf_counter()
+
+    simulations = stuck = 0
+    for count, workflow in workflows:
+        graph = WorkflowGraph(workflow)
+        for _ in range(args.scripts):
+            attempts = [[rng.randint(1, 10) for _ in range(3)] for _ in range(count)]
+            simulations += 1
+            stuck += not graph.simulate(question_script(attempts)).terminated
+    simulated = time.perf_counter()
+
+    nodes = sum(len(workflow["nodes"]) for _, workflow in workflows)
+    print(f"{args.workflows} workflows, {nodes} nodes ({', '.join(template.name for template in templates)})")
+    print(f"  render    {rendered - start:7.2f} s")
+    print(f"  check     {checked - rendered:7.2f} s  {(checked - rendered) / args.workflows * 1e6:7.1f} us/workflow  {problems} problems, mean worst case {turns / args.workflows:.1f} turns")
+    print(f"  simulate  {simulated - checked:7.2f} s  {(simulated - checked) / max(simulations, 1) * 1e6:7.1f} us/call  {simulations} calls, {stuck} did not terminate")
+
+
+if __name__ == "__main__":
+    main()
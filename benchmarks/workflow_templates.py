@@ -0,0 +1,56 @@
+"""
+Cost of building a role's Vapi workflow from a template.
+
+    compile  parse and compile the template file (once per file version; cached after)
+    lookup   get_workflow_template() on a compiled template (cache hit)
+    render   render the workflow for a role with N questions; reported per question too,
+             which should stay flat as N grows
+
+    python benchmarks/workflow_templates.py --questions 10 100 1000 --repeat 20
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from helper.company.workflow_templates import _load, compile_template, get_workflow_template, list_workflow_templates, TEMPLATES_DIR
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--template", action="append", help="template name (default: every template)")
+    args = parser.parse_args()
+
+    names = args.template or [template.name for template in list_workflow_templates()]
+    for name in names:
+        path = TEMPLATES_DIR / f"{name}.json"
+        compile_ms = timed(lambda: compile_template(json.loads(path.read_text()), name), args.repeat)
+        get_workflow_template(name)
+        lookup_ms = timed(lambda: get_workflow_template(name), args.repeat)
+        print(f"{name}: compile {compile_ms:.3f} ms  lookup {lookup_ms * 1000:.1f} us")
+
+        template = get_workflow_template(name)
+        for count in args.questions:
+            questions = [f"Question {idx + 1}: describe a project where you had to make a trade-off." for idx in range(count)]
+            render_ms = timed(lambda: template.render(questions, company_name="Acme", name="Acme_Engineer_Interview_Workflow"), args.repeat)
+            body = len(json.dumps(template.render(questions)))
+            print(f"  {count:>6} questions  render {render_ms:8.2f} ms  {render_ms * 1000 / count:6.1f} us/question  body {body / 1024:8.1f} KiB")
+    print(f"compiled templates cached: {_load.cache_info().currsize}")
+
+
+if __name__ == "__main__":
+    main()
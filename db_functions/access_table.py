@@ -1,16 +1,18 @@
-from supabase import create_client, Client
 import os
-import dotenv
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
-dotenv.load_dotenv()
+if TYPE_CHECKING:
+    from supabase import Client
 
-_supabase_client: Optional[Client] = None
+_supabase_client: Optional["Client"] = None
 
-def get_supabase_client() -> Client:
+def get_supabase_client() -> "Client":
     global _supabase_client
     
     if _supabase_client is None:
+        # Imported here: the supabase stack (postgrest, gotrue, storage, realtime) is slow to load.
+        from supabase import create_client
+
         supabase_url = os.getenv("SUPABASE_URL")
         supabase_key = os.getenv("SUPABASE_KEY")
         
@@ -21,7 +23,25 @@ def get_supabase_client() -> Client:
     
     return _supabase_client
 
-def get_db() -> Client:
+def reset_supabase_client():
+    global _supabase_client
+    _supabase_client = None
+
+def get_db() -> "Client":
     return get_supabase_client()
 
-supabase = get_supabase_client()
\ No newline at end of file
+
+class _LazySupabase:
+    """
+    Module-level handle that resolves the client on each use. The client (and its connection
+    pool) is created on first use in each process, and a fork drops the parent's copy, so
+    preloaded gunicorn workers never share sockets.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_supabase_client(), name)
+
+
+supabase = _LazySupabase()
+
+os.register_at_fork(after_in_child=reset_supabase_client)
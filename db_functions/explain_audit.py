@@ -0,0 +1,255 @@
+"""
+Query-plan audit: finds every Supabase query chain in the API source
+(supabase.table("x").select(...).eq(...)...), rebuilds it as parameterised SQL and runs
+EXPLAIN against a Postgres database, flagging any that can only be answered with a
+sequential scan.
+
+    python -m db_functions.explain_audit --list                          # show the extracted SQL
+    python -m db_functions.explain_audit --dsn postgresql://localhost/yapply --migrate
+
+Sequential scans are disabled for the session, so the planner still picks an index on a
+small local table whenever one applies; a Seq Scan in the plan means no index can serve
+the lookup. update/delete chains are audited as the SELECT that locates their rows, and
+inserts/upserts are skipped. Exits with status 1 when any query is flagged.
+
+Chain parts that aren't literals are approximated (a computed .limit(n) as limit 100, a
+select() of a computed column list as select *) and listed under the query they affect.
+
+Needs psycopg for everything but --list; it is in the development requirements:
+
+    pip install -r requirements-dev.txt
+"""
+import argparse
+import ast
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_SOURCES = ("routes/*.py", "helper/**/*.py")
+MIGRATIONS_DIR = ROOT / "supabase" / "migrations"
+
+COMPARISONS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+ACTIONS = ("select", "update", "delete", "insert", "upsert")
+
+
+@dataclass
+class QueryPattern:
+    table: str
+    action: str = "select"
+    columns: str = "*"
+    where: list[str] = field(default_factory=list)
+    order_by: list[str] = field(default_factory=list)
+    limit: int | None = None
+    params: int = 0
+    locations: list[str] = field(default_factory=list)
+    # Parts of the chain that aren't literals and were stood in for, so the audited SQL can
+    # differ from what runs (a computed limit, a column list built at run time).
+    approximations: list[str] = field(default_factory=list)
+
+    def param(self) -> str:
+        self.params += 1
+        return f"${self.params}"
+
+    def sql(self) -> str:
+        columns = self.columns if self.action == "select" else "1"
+        sql = f"select {columns} from public.{self.table}"
+        if self.where:
+            sql += " where " + " and ".join(self.where)
+        if self.order_by:
+            sql += " order by " + ", ".join(self.order_by)
+        if self.limit is not None:
+            sql += f" limit {self.limit}"
+        return sql
+
+
+def _constant(node):
+    return node.value if isinstance(node, ast.Constant) else None
+
+def _source(node) -> str:
+    return ast.unparse(node) if node is not None else ""
+
+def _unwind(node) -> list[tuple[str, ast.Call | None]]:
+    """Method chain from the receiver outwards, as (name, call node or None for attributes)."""
+    chain = []
+    while True:
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            chain.append((node.func.attr, node))
+            node = node.func.value
+        elif isinstance(node, ast.Attribute):
+            chain.append((node.attr, None))
+            node = node.value
+        else:
+            break
+    chain.reverse()
+    return chain
+
+def _pattern(chain: list[tuple[str, ast.Call | None]]) -> QueryPattern | None:
+    names = [name for name, _ in chain]
+    if "table" not in names:
+        return None
+    start = names.index("table")
+    table = _constant(chain[start][1].args[0]) if chain[start][1] is not None and chain[start][1].args else None
+    if not isinstance(table, str):
+        return None
+
+    pattern = QueryPattern(table)
+    negate = False
+    for name, call in chain[start + 1:]:
+        args = call.args if call is not None else []
+        column = _constant(args[0]) if args else None
+        if name in ACTIONS:
+            pattern.action = name
+            if name == "select" and args:
+                if isinstance(column, str) and "(" not in column:
+                    pattern.columns = column
+                else:
+                    pattern.approximations.append(f"select({_source(args[0])}) audited as select *")
+        elif name == "not_":
+            negate = True
+            continue
+        elif name in COMPARISONS and isinstance(column, str):
+            operator = "<>" if negate and name == "eq" else COMPARISONS[name]
+            pattern.where.append(f"{column} {operator} {pattern.param()}")
+        elif name == "in_" and isinstance(column, str):
+            pattern.where.append(f"{column} {'<> all' if negate else '= any'}({pattern.param()})")
+        elif name == "is_" and isinstance(column, str):
+            pattern.where.append(f"{column} is {'not ' if negate else ''}null")
+        elif name == "order" and isinstance(column, str):
+            desc = any(keyword.arg == "desc" and _constant(keyword.value) for keyword in call.keywords)
+            pattern.order_by.append(f"{column} desc" if desc else column)
+        elif name in COMPARISONS or name in ("in_", "is_", "order"):
+            pattern.approximations.append(f".{name}({_source(args[0]) if args else ''}) left out: the column is not a literal")
+        elif name == "limit":
+            if args and isinstance(_constant(args[0]), int):
+                pattern.limit = _constant(args[0])
+            else:
+                pattern.limit = 100
+                pattern.approximations.append(f"limit({_source(args[0]) if args else ''}) audited as limit 100")
+        negate = False
+    return pattern
+
+def extract_patterns(sources: list[Path]) -> list[QueryPattern]:
+    """Distinct query patterns across the given files, each with every place it occurs."""
+    patterns: dict[str, QueryPattern] = {}
+    for path in sources:
+        tree = ast.parse(path.read_text(), filename=str(path))
+        inner = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call):
+                inner.add(id(node.func))
+            elif isinstance(node, ast.Attribute):
+                inner.add(id(node.value))
+        for node in ast.walk(tree):
+            if id(node) in inner or not isinstance(node, (ast.Call, ast.Attribute)):
+                continue
+            pattern = _pattern(_unwind(node))
+            if pattern is None or pattern.action in ("insert", "upsert") or not pattern.where:
+                continue
+            key = f"{pattern.action}:{pattern.sql()}"
+            location = f"{path.relative_to(ROOT)}:{node.lineno}"
+            known = patterns.setdefault(key, pattern)
+            if location not in known.locations:
+                known.locations.append(location)
+            for note in pattern.approximations:
+                if note not in known.approximations:
+                    known.approximations.append(note)
+    return list(patterns.values())
+
+def notes(pattern: QueryPattern, indent: str) -> str:
+    """Where the pattern's call sites are, and anything in the audited SQL that was approximated."""
+    lines = [f"{indent}at {', '.join(pattern.locations)}"]
+    lines += [f"{indent}approximated: {note}" for note in pattern.approximations]
+    return "\n".join(lines)
+
+def source_files(globs: list[str]) -> list[Path]:
+    return sorted({path for pattern in globs for path in ROOT.glob(pattern)})
+
+
+def _walk(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+def explain(conn, pattern: QueryPattern) -> list[dict]:
+    """Plan nodes of the generic plan (the one used for arbitrary parameter values)."""
+    with conn.cursor() as cur:
+        cur.execute("set local enable_seqscan = off")
+        if conn.info.server_version >= 160000:
+            cur.execute(f"explain (generic_plan, format json) {pattern.sql()}")
+        else:
+            cur.execute("set local plan_cache_mode = force_generic_plan")
+            cur.execute(f"prepare audit_query as {pattern.sql()}")
+            args = ", ".join(["null"] * pattern.params)
+            cur.execute(f"explain (format json) execute audit_query{f'({args})' if args else ''}")
+        plan = cur.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        if conn.info.server_version < 160000:
+            cur.execute("deallocate audit_query")
+    return list(_walk(plan[0]["Plan"]))
+
+def describe(nodes: list[dict]) -> str:
+    scans = []
+    for node in nodes:
+        if "Relation Name" in node or "Index Name" in node:
+            target = node.get("Index Name") or node["Relation Name"]
+            scans.append(f"{node['Node Type']} on {target}")
+    return "; ".join(scans) or nodes[0]["Node Type"]
+
+def apply_migrations(conn):
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        conn.execute(path.read_text())
+    conn.commit()
+
+def audit(dsn: str, patterns: list[QueryPattern], migrate: bool = False) -> int:
+    try:
+        import psycopg
+    except ImportError:
+        raise SystemExit('The audit needs psycopg: pip install "psycopg[binary]"')
+
+    flagged = 0
+    with psycopg.connect(dsn) as conn:
+        if migrate:
+            apply_migrations(conn)
+        for pattern in patterns:
+            try:
+                nodes = explain(conn, pattern)
+            except psycopg.Error as e:
+                conn.rollback()
+                print(f"ERROR  {pattern.sql()}\n       {str(e).strip()}\n{notes(pattern, ' ' * 7)}")
+                flagged += 1
+                continue
+            conn.rollback()
+            seq_scans = [node for node in nodes if node["Node Type"] == "Seq Scan"]
+            status = "SEQ" if seq_scans else "OK"
+            flagged += bool(seq_scans)
+            print(f"{status:<6} {pattern.sql()}{'' if pattern.action == 'select' else f'  [{pattern.action}]'}")
+            print(f"       {describe(nodes)}")
+            print(notes(pattern, " " * 7))
+    print(f"\n{len(patterns)} query patterns, {flagged} flagged")
+    return 1 if flagged else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL"), help="Postgres connection string (default $DATABASE_URL)")
+    parser.add_argument("--source", action="append", help=f"glob relative to the repo root (default {', '.join(DEFAULT_SOURCES)})")
+    parser.add_argument("--list", action="store_true", help="print the extracted query patterns without connecting")
+    parser.add_argument("--migrate", action="store_true", help="apply supabase/migrations/*.sql before auditing")
+    args = parser.parse_args()
+
+    patterns = extract_patterns(source_files(args.source or list(DEFAULT_SOURCES)))
+    if args.list:
+        for pattern in patterns:
+            print(f"{pattern.sql()}{'' if pattern.action == 'select' else f'  [{pattern.action}]'}\n{notes(pattern, ' ' * 4)}")
+        return
+    if not args.dsn:
+        parser.error("--dsn or DATABASE_URL is required")
+    sys.exit(audit(args.dsn, patterns, migrate=args.migrate))
+
+
+if __name__ == "__main__":
+    main()
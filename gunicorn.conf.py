@@ -0,0 +1,49 @@
+import math
+import os
+import tempfile
+from pathlib import Path
+
+
+def available_cpus() -> int:
+    """CPUs this container may actually use: the affinity mask, capped by a cgroup CPU quota."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+    except (OSError, ValueError):
+        try:
+            quota = Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text().strip()
+            period = Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text().strip()
+        except OSError:
+            return cpus
+    if quota in ("max", "-1"):
+        return cpus
+    return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# Handlers mix async code with blocking Supabase/Vapi/OpenAI calls, so run more workers than
+# cores, but each holds its own clients and question index, so never more than MAX_WORKERS
+# unless WEB_CONCURRENCY asks for it. The host's core count is not the instance's share.
+MAX_WORKERS = int(os.getenv("GUNICORN_MAX_WORKERS", "4"))
+workers = int(os.getenv("WEB_CONCURRENCY", min(available_cpus() * 2 + 1, MAX_WORKERS)))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = 200
+# Import the app once in the master so workers fork with modules already loaded. Clients are
+# created lazily and reset after fork, so no sockets are shared between workers.
+preload_app = True
+
+# Workers on the same host share caches through shared memory unless CACHE_URL says otherwise.
+_shm = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+os.environ.setdefault("CACHE_URL", f"sqlite:///{_shm}/yapply-cache.db")
+
+
+def post_fork(server, worker):
+    from db_functions.access_table import reset_supabase_client
+    from utils.cache import reset_cache
+
+    reset_supabase_client()
+    reset_cache()
@@ -1,29 +1,69 @@
 import os
-import dotenv
-import requests
-
-dotenv.load_dotenv()
+import re
+from functools import lru_cache
+from utils.cache import get_cache
 
 VAPI_BASE_URL = "https://api.vapi.ai"
+WORKFLOW_CHECK_TTL_SECONDS = int(os.getenv("WORKFLOW_CHECK_TTL_SECONDS", "3600"))
 
-def make_call(workflow_id: str, phone_number: str, name: str) -> str:
-    api_key = os.getenv("VAPI_API_KEY")
-    phone_number_id = os.getenv("VAPI_PHONE_NUMBER_ID")
+_PHONE_FORMATTING_RE = re.compile(r"[\s().\-/]")
 
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
+@lru_cache
+def _vapi_headers() -> dict:
+    return {
+        "Authorization": f"Bearer {os.getenv('VAPI_API_KEY')}",
         "Content-Type": "application/json",
     }
 
-    payload = {
+def normalize_phone(number: str, country_code: str | None = None) -> str:
+    """
+    E.164 form of a phone number (+ and 8-15 digits). Numbers without an international prefix
+    are only accepted with the company's country_code; without one there is no telling which
+    country they belong to. Raises ValueError when the number can't be made E.164.
+    """
+    raw = _PHONE_FORMATTING_RE.sub("", number or "")
+    if raw.startswith("00"):
+        raw = "+" + raw[2:]
+    if raw.startswith("+"):
+        digits = raw[1:]
+    elif country_code is None:
+        raise ValueError(f"Phone number {number!r} needs its country code, e.g. +44 7700 900123")
+    elif country_code == "1" and len(raw) == 11 and raw.startswith("1"):
+        digits = raw
+    else:
+        # A leading 0 is a national trunk prefix (e.g. 07700 900123) and is dropped.
+        digits = country_code + raw.lstrip("0")
+    if not digits.isdigit() or not 8 <= len(digits) <= 15 or digits.startswith("0"):
+        raise ValueError(f"Invalid phone number: {number!r}")
+    return f"+{digits}"
+
+def workflow_exists(workflow_id: str) -> bool:
+    """Whether Vapi has the workflow. Raises ValueError when Vapi can't be asked."""
+    cache_key = f"vapi:workflow:{workflow_id}"
+    if get_cache().get(cache_key):
+        return True
+    import requests
+
+    try:
+        resp = requests.get(f"{VAPI_BASE_URL}/workflow/{workflow_id}", headers=_vapi_headers(), timeout=10)
+        if resp.status_code == 404:
+            return False
+        resp.raise_for_status()
+    except requests.RequestException as e:
+        raise ValueError(f"Could not look up workflow {workflow_id} on Vapi: {e}") from e
+    get_cache().set(cache_key, True, ttl=WORKFLOW_CHECK_TTL_SECONDS)
+    return True
+
+def build_call_payload(workflow_id: str, phone_number: str, name: str) -> dict:
+    return {
         "customer": {
             "number": phone_number,
             "name": name
         },
         "workflowId": workflow_id,
         "name": f"{name}'s Interview",
-        "phoneNumberId": phone_number_id,
+        "phoneNumberId": os.getenv("VAPI_PHONE_NUMBER_ID"),
         "workflowOverrides": {
             "variableValues": {
                 "candidate_name": name
@@ -31,13 +71,38 @@ def make_call(workflow_id: str, phone_number: str, name: str) -> str:
         }
     }
 
+def prepare_call(workflow_id: str | None, phone_number: str, name: str) -> dict:
+    """Validated, ready-to-send call payload. Raises ValueError naming what is wrong."""
+    if not workflow_id:
+        raise ValueError("Interview has no workflow; create the role's workflow first")
+    number = normalize_phone(phone_number)
+    if not workflow_exists(workflow_id):
+        raise ValueError(f"Workflow {workflow_id} does not exist")
+    return build_call_payload(workflow_id, number, name)
 
-    resp = requests.post(f"{VAPI_BASE_URL}/call", headers=headers, json=payload, timeout=30)
+def prepare_interview_call(supabase, interview: dict) -> tuple[dict | None, str | None]:
+    """Precomputes and stores an interview's call payload, or the reason it can't be placed."""
+    try:
+        payload, error = prepare_call(interview.get("vapi_workflow_id"), interview["candidate_phone"], interview["candidate_name"]), None
+    except ValueError as e:
+        payload, error = None, str(e)
+    supabase.table("interviews").update({"call_payload": payload, "call_payload_error": error}).eq("id", interview["id"]).execute()
+    return payload, error
+
+def place_call(payload: dict) -> str:
+    import requests
+
+    resp = requests.post(f"{VAPI_BASE_URL}/call", headers=_vapi_headers(), json=payload, timeout=30)
     if resp.status_code >= 400:
         raise RuntimeError(f"Vapi call failed: {resp.status_code} - {resp.text}")
     return resp.json().get("id")
 
+def make_call(workflow_id: str, phone_number: str, name: str) -> str:
+    return place_call(prepare_call(workflow_id, phone_number, name))
+
 def retrive_transcript(call_id: str) -> str:
+    import requests
+
     headers = {
         "Authorization": f"Bearer {os.getenv('VAPI_API_KEY')}",
         "Content-Type": "application/json"
@@ -46,9 +111,11 @@ def retrive_transcript(call_id: str) -> str:
 
     if response.status_code == 200:
         return response.json().get("transcript")
-    
+
     return "Failed to retrieve transcript"
 
 
 if __name__ == "__main__":
+    import dotenv
+    dotenv.load_dotenv()
     print(retrive_transcript("1ba63891-d679-4074-8a1b-441933406601"))
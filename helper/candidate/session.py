@@ -0,0 +1,75 @@
+import hashlib
+import os
+import time
+import jwt
+from utils.cache import Generation, get_cache
+
+CANDIDATE_SESSION_TTL_SECONDS = int(os.getenv("CANDIDATE_SESSION_TTL_SECONDS", "300"))
+SESSION_COLUMNS = (
+    "id, company_id, candidate_name, candidate_email, candidate_phone, position, status, "
+    "interview_date, interview_time, vapi_workflow_id, candidate_auth, call_payload, call_status, "
+    "company(username)"
+)
+
+# Bumped per candidate email whenever that candidate's interviews are created, removed or
+# change state, so cached sessions are rebuilt on the next request.
+candidate_sessions = Generation("candidate_sessions")
+
+
+def load_candidate_interviews(supabase, email: str) -> list[dict]:
+    """Every interview for the email with its company's name, in one joined query."""
+    rows = supabase.table("interviews").select(SESSION_COLUMNS).eq("candidate_email", email).order("id").execute().data
+    for row in rows:
+        row["company_name"] = (row.pop("company", None) or {}).get("username")
+    return rows
+
+def _session_key(token: str) -> str:
+    return f"candidate_session:{hashlib.sha256(token.encode()).hexdigest()}"
+
+def _session_ttl(token: str) -> float:
+    """Never cache a session past the access token's own expiry."""
+    try:
+        expires_at = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.InvalidTokenError:
+        return 0
+    if not expires_at:
+        return CANDIDATE_SESSION_TTL_SECONDS
+    return min(CANDIDATE_SESSION_TTL_SECONDS, expires_at - time.time())
+
+def save_candidate_session(token: str, session: dict):
+    ttl = _session_ttl(token)
+    if ttl > 0:
+        get_cache().set(_session_key(token), session, ttl=ttl)
+
+def get_candidate_session(supabase, token: str) -> dict | None:
+    """
+    The candidate's identity and interviews for an access token. Verified with Supabase auth
+    and loaded once, then served from the cache until the token or the TTL expires or the
+    candidate's interviews change. Returns None for invalid tokens.
+    """
+    session = get_cache().get(_session_key(token))
+    if session is not None and session["generation"] == candidate_sessions.current(session["email"]):
+        return session
+
+    user = supabase.auth.get_user(token).user
+    if not user or not user.email:
+        return None
+    generation = candidate_sessions.current(user.email)
+    session = {
+        "email": user.email,
+        "auth_user_id": user.id,
+        "generation": generation,
+        "interviews": load_candidate_interviews(supabase, user.email),
+    }
+    save_candidate_session(token, session)
+    return session
+
+def select_interview(session: dict, interview_id: int | None = None) -> dict | None:
+    """The requested interview, or by default the oldest one not yet completed (else the latest)."""
+    interviews = session["interviews"]
+    if interview_id is not None:
+        return next((interview for interview in interviews if interview["id"] == interview_id), None)
+    pending = [interview for interview in interviews if interview.get("status") != "Completed"]
+    if pending:
+        return pending[0]
+    return interviews[-1] if interviews else None
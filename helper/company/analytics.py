@@ -0,0 +1,74 @@
+"""
+Evaluation score analytics, summarized from the histograms the database keeps per company,
+position and day (score_histograms and recommendation_rollups, maintained by triggers), so a
+request reads one bounded set of rows and no worker holds per-company state.
+"""
+from collections import Counter
+from datetime import date
+from helper.evaluation.rubrics import InterviewScores
+
+SCORE_FIELDS = [name for name in InterviewScores.model_fields if name.endswith("_score")]
+PERCENTILES = (25, 50, 75, 90)
+
+
+def _clamp(score) -> int:
+    return min(max(int(score), 0), 100)
+
+
+def load_evaluation_histograms(supabase, company_id: str, position: str | None = None, start: date | None = None, end: date | None = None) -> list[dict]:
+    """Score and recommendation counts for a company (optionally one position) between two days, inclusive."""
+    return supabase.rpc("evaluation_histograms", {
+        "p_company_id": company_id,
+        "p_position": position,
+        "p_start": start.isoformat() if start else None,
+        "p_end": end.isoformat() if end else None,
+    }).execute().data or []
+
+
+def _percentile(histogram: list[int], count: int, pct: int) -> int | None:
+    if count <= 0:
+        return None
+    rank = max(1, -(-pct * count // 100))
+    seen = 0
+    for value, n in enumerate(histogram):
+        seen += n
+        if seen >= rank:
+            return value
+    return 100
+
+def _summarize(histograms: dict[str, list[int]], recommendations: Counter) -> dict:
+    """Scores are integers in 0-100, so a 101-slot histogram per category gives exact averages and percentiles."""
+    categories = {}
+    for field in SCORE_FIELDS:
+        histogram = histograms.get(field) or [0] * 101
+        count = sum(histogram)
+        categories[field] = {
+            "average": round(sum(value * n for value, n in enumerate(histogram)) / count, 2) if count else None,
+            **{f"p{pct}": _percentile(histogram, count, pct) for pct in PERCENTILES},
+        }
+    return {
+        "count": sum(recommendations.values()),
+        "categories": categories,
+        "recommendations": dict(recommendations),
+    }
+
+def evaluation_summary(rows: list[dict]) -> dict:
+    """Overall and per-position summaries of evaluation_histograms rows."""
+    positions: dict[str, tuple[dict[str, list[int]], Counter]] = {}
+    for row in rows:
+        histograms, recommendations = positions.setdefault(row["position"], ({}, Counter()))
+        if row.get("recommendation") is not None:
+            recommendations[row["recommendation"]] += row["interviews"]
+        elif row.get("field") in SCORE_FIELDS:
+            histograms.setdefault(row["field"], [0] * 101)[_clamp(row["score"])] += row["interviews"]
+
+    overall_histograms: dict[str, list[int]] = {}
+    overall_recommendations = Counter()
+    for histograms, recommendations in positions.values():
+        for field, histogram in histograms.items():
+            overall_histograms[field] = [a + b for a, b in zip(overall_histograms.get(field) or [0] * 101, histogram)]
+        overall_recommendations.update(recommendations)
+    return {
+        "overall": _summarize(overall_histograms, overall_recommendations),
+        "positions": {name: _summarize(*positions[name]) for name in sorted(positions)},
+    }
@@ -0,0 +1,46 @@
+from collections import defaultdict
+from datetime import date
+
+# Running totals kept per (company, position, day) by the cost_rollups triggers.
+COST_FIELDS = (
+    "calls", "call_seconds", "call_cost", "grading_runs", "grading_input_tokens",
+    "grading_cached_input_tokens", "grading_output_tokens", "grading_cost",
+)
+ROLLUP_COLUMNS = ", ".join(("position", "day") + COST_FIELDS)
+
+
+def load_cost_rollups(supabase, company_id: str, start: date | None = None, end: date | None = None, position: str | None = None) -> list[dict]:
+    """Rollup rows for a company (optionally one position) between two days, inclusive."""
+    query = supabase.table("cost_rollups").select(ROLLUP_COLUMNS).eq("company_id", company_id)
+    if position is not None:
+        query = query.eq("position", position)
+    if start:
+        query = query.gte("day", start.isoformat())
+    if end:
+        query = query.lte("day", end.isoformat())
+    return query.order("day").execute().data
+
+def summarize_costs(rows: list[dict]) -> dict:
+    totals = {field: 0 for field in COST_FIELDS}
+    for row in rows:
+        for field in COST_FIELDS:
+            totals[field] += float(row.get(field) or 0)
+    for field in ("calls", "grading_runs", "grading_input_tokens", "grading_cached_input_tokens", "grading_output_tokens"):
+        totals[field] = int(totals[field])
+    totals["call_cost"] = round(totals["call_cost"], 6)
+    totals["grading_cost"] = round(totals["grading_cost"], 6)
+    totals["total_cost"] = round(totals["call_cost"] + totals["grading_cost"], 6)
+    totals["average_call_seconds"] = round(totals["call_seconds"] / totals["calls"], 1) if totals["calls"] else None
+    totals["cost_per_call"] = round(totals["total_cost"] / totals["calls"], 4) if totals["calls"] else None
+    return totals
+
+def cost_report(rows: list[dict], group_by: str) -> dict:
+    """Totals for all rows plus one summary per position or per day."""
+    groups = defaultdict(list)
+    for row in rows:
+        if any(row.get(field) for field in COST_FIELDS):
+            groups[row[group_by]].append(row)
+    return {
+        "totals": summarize_costs(rows),
+        "breakdown": [{group_by: key, **summarize_costs(group)} for key, group in sorted(groups.items())],
+    }
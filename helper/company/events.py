@@ -0,0 +1,141 @@
+import asyncio
+import os
+from utils.cache import get_cache
+from utils.etag import company_views
+
+SUBSCRIBER_QUEUE_SIZE = 100
+# Events reach subscribers on other workers through a short per-company log in the shared
+# cache (CACHE_URL), which each worker with open streams polls this often.
+EVENT_POLL_SECONDS = float(os.getenv("EVENT_POLL_SECONDS", "1"))
+EVENT_LOG_SIZE = 100
+EVENT_LOG_TTL_SECONDS = 60
+STATUS_FIELDS = ("magiclink_status", "status", "call_id", "call_status")
+
+
+def interview_status_event(interview: dict) -> dict:
+    return {
+        "type": "interview.updated",
+        "interview_id": interview["id"],
+        **{field: interview[field] for field in STATUS_FIELDS if field in interview},
+        **({"evaluation_ready": bool(interview["ai_evaluation"])} if "ai_evaluation" in interview else {}),
+    }
+
+
+class InterviewEventBus:
+    """
+    Fan-out of interview status changes to per-company subscribers (one bounded queue per open
+    stream). Route handlers publish after their writes: the event goes straight to this
+    worker's subscribers and onto the company's log in the shared cache, which the other
+    workers poll for their own subscribers. When the Supabase realtime bridge is running it
+    becomes the single source instead, so changes made directly in the database are pushed
+    too and nothing is delivered twice.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # company_id -> last sequence number of the shared log this worker has delivered
+        self._seen: dict[str, int] = {}
+        self._poller: asyncio.Task | None = None
+        self.realtime_active = False
+
+    @property
+    def _origin(self) -> str:
+        # Per process, since the bus is created before gunicorn forks its workers.
+        return f"{os.getpid()}:{id(self)}"
+
+    def subscribe(self, company_id: str) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        if company_id not in self._subscribers and not self.realtime_active:
+            log = get_cache().get(f"events:{company_id}")
+            self._seen[company_id] = log["seq"] if log else 0
+        self._subscribers.setdefault(company_id, set()).add(queue)
+        if not self.realtime_active and (self._poller is None or self._poller.done()):
+            self._poller = self._loop.create_task(self._poll())
+        return queue
+
+    def unsubscribe(self, company_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(company_id)
+        if queues:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[company_id]
+                self._seen.pop(company_id, None)
+
+    def _deliver(self, company_id: str, event: dict):
+        for queue in list(self._subscribers.get(company_id, ())):
+            if queue.full():
+                # A slow client loses its oldest update rather than blocking publishers.
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _append(self, company_id: str, event: dict):
+        origin = self._origin
+
+        def append(log):
+            log = log or {"seq": 0, "events": []}
+            seq = log["seq"] + 1
+            return {"seq": seq, "events": (log["events"] + [[seq, origin, event]])[-EVENT_LOG_SIZE:]}, None
+
+        get_cache().update(f"events:{company_id}", append, ttl=EVENT_LOG_TTL_SECONDS)
+
+    async def _poll(self):
+        """Delivers what other workers logged for the companies this worker has streams open for."""
+        origin = self._origin
+        while self._subscribers:
+            await asyncio.sleep(EVENT_POLL_SECONDS)
+            for company_id in list(self._subscribers):
+                log = await asyncio.to_thread(get_cache().get, f"events:{company_id}")
+                seen = self._seen.get(company_id, 0)
+                if not log or log["seq"] <= seen:
+                    continue
+                for seq, event_origin, event in log["events"]:
+                    if seq > seen and event_origin != origin:
+                        self._deliver(company_id, event)
+                if company_id in self._seen:
+                    self._seen[company_id] = log["seq"]
+
+    def publish(self, company_id: str, event: dict, from_realtime: bool = False):
+        if self.realtime_active and not from_realtime:
+            return
+        if not from_realtime:
+            self._append(company_id, event)
+        if company_id not in self._subscribers or self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._deliver(company_id, event)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver, company_id, event)
+
+    def publish_interview(self, interview: dict):
+        if interview.get("company_id"):
+            self.publish(interview["company_id"], interview_status_event(interview))
+
+    async def start_realtime_bridge(self):
+        """Subscribes to Supabase realtime changes on the interviews table. Enabled with SUPABASE_REALTIME=1."""
+        if os.getenv("SUPABASE_REALTIME") != "1":
+            return None
+        from supabase import acreate_client
+
+        client = await acreate_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY"))
+
+        def on_change(payload: dict):
+            data = payload.get("data", payload)
+            record = data.get("record") or {}
+            if record.get("company_id") and record.get("id") is not None:
+                # Changes made outside the API (other services, the SQL editor) still invalidate cached views.
+                company_views.bump(record["company_id"])
+                self.publish(record["company_id"], interview_status_event(record), from_realtime=True)
+
+        channel = client.channel("interview-status")
+        await channel.on_postgres_changes("*", schema="public", table="interviews", callback=on_change).subscribe()
+        self.realtime_active = True
+        return channel
+
+
+interview_events = InterviewEventBus()
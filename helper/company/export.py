@@ -0,0 +1,263 @@
+"""
+Streaming interview exports. Interviews are read in keyset pages of EXPORT_PAGE_SIZE rows,
+their ai_evaluation is flattened into one column per field of the default rubric's scores,
+and each page is written out as CSV or XLSX and compressed before the next is read, so an
+export of any size holds one page in memory.
+
+CSV is sent with a negotiated Content-Encoding (zstd or gzip). XLSX is already a deflated
+zip: the workbook parts are fixed and the sheet is written as a stream of inline-string
+rows, so no spreadsheet library or temporary file is needed.
+"""
+import csv
+import io
+import os
+import re
+import zipfile
+import zlib
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+import orjson
+from helper.evaluation.rubrics import get_rubric
+
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "500"))
+EXPORT_FORMATS = ("csv", "xlsx")
+# Preferred first when the client accepts several.
+CONTENT_ENCODINGS = ("zstd", "gzip")
+
+INTERVIEW_EXPORT_COLUMNS = (
+    "id", "created_at", "candidate_name", "candidate_email", "candidate_phone", "position", "status",
+    "interview_date", "interview_time", "call_status", "call_duration_seconds", "call_cost", "grading_cost",
+)
+EXPORT_SELECT = ", ".join(INTERVIEW_EXPORT_COLUMNS + ("ai_evaluation",))
+
+# Spreadsheet apps run cells starting with these as formulas.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# Characters XML 1.0 does not allow, even escaped.
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def export_columns(comments: bool = True) -> list[str]:
+    fields = [
+        name for name, info in get_rubric().schema.model_fields.items()
+        if comments or info.annotation is not str or not name.endswith("_comment")
+    ]
+    return list(INTERVIEW_EXPORT_COLUMNS) + fields
+
+
+def interview_pages(supabase, company_id: str, position: str | None = None, evaluated_only: bool = False):
+    """A company's interviews in id order, one page at a time."""
+    last_id = 0
+    while True:
+        query = supabase.table("interviews").select(EXPORT_SELECT).eq("company_id", company_id)
+        if position is not None:
+            query = query.eq("position", position)
+        if evaluated_only:
+            query = query.not_.is_("ai_evaluation", "null")
+        page = query.gt("id", last_id).order("id").limit(EXPORT_PAGE_SIZE).execute().data
+        if page:
+            yield page
+        if len(page) < EXPORT_PAGE_SIZE:
+            return
+        last_id = page[-1]["id"]
+
+def flatten(interview: dict, columns: list[str]) -> list:
+    scores = interview.get("ai_evaluation")
+    if isinstance(scores, str):
+        scores = orjson.loads(scores) if scores else None
+    if not isinstance(scores, dict):
+        scores = {}
+    return [interview[column] if column in interview else scores.get(column) for column in columns]
+
+
+class CsvWriter:
+    content_type = "text/csv; charset=utf-8"
+    extension = "csv"
+
+    def __init__(self, columns: list[str]):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._columns = columns
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def header(self) -> bytes:
+        # The BOM makes Excel read the file as UTF-8.
+        self._writer.writerow(self._columns)
+        return b"\xef\xbb\xbf" + self._drain()
+
+    def rows(self, rows) -> bytes:
+        self._writer.writerows(
+            [("'" + value if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES) else value) for value in row]
+            for row in rows
+        )
+        return self._drain()
+
+    def close(self) -> bytes:
+        return b""
+
+
+class _Chunks:
+    """Write-only file that collects what zipfile writes until the next drain."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Interviews" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+    '<sheetData>'
+)
+SHEET_END = "</sheetData></worksheet>"
+
+
+def _xlsx_cell(value) -> str:
+    if value is None:
+        return "<c/>"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = _XML_ILLEGAL.sub("", value if isinstance(value, str) else str(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+class XlsxWriter:
+    content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    extension = "xlsx"
+
+    def __init__(self, columns: list[str]):
+        self._columns = columns
+        self._out = _Chunks()
+        self._zip = zipfile.ZipFile(self._out, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6)
+        self._sheet = None
+
+    def header(self) -> bytes:
+        for name, xml in XLSX_PARTS.items():
+            self._zip.writestr(name, xml)
+        # The sheet's size isn't known up front, so it is written with a data descriptor.
+        self._sheet = self._zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self._sheet.write((SHEET_START + self._row(self._columns)).encode())
+        return self._out.drain()
+
+    def _row(self, row) -> str:
+        return "<row>" + "".join(map(_xlsx_cell, row)) + "</row>"
+
+    def rows(self, rows) -> bytes:
+        self._sheet.write("".join(map(self._row, rows)).encode())
+        return self._out.drain()
+
+    def close(self) -> bytes:
+        self._sheet.write(SHEET_END.encode())
+        self._sheet.close()
+        self._zip.close()
+        return self._out.drain()
+
+WRITERS = {"csv": CsvWriter, "xlsx": XlsxWriter}
+
+
+class _Identity:
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b""
+
+# Both flush at the end of every page, so the client receives each page as it is written.
+class _Gzip:
+    def __init__(self):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+class _Zstd:
+    def __init__(self):
+        import zstandard
+
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(self._flush_block)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+COMPRESSORS = {None: _Identity, "gzip": _Gzip, "zstd": _Zstd}
+
+def negotiate_encoding(export_format: str, accept_encoding: str | None) -> str | None:
+    """The Content-Encoding to send: none for XLSX (already compressed), else the best one accepted."""
+    if export_format != "csv" or not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name.strip().lower())
+    return next((encoding for encoding in CONTENT_ENCODINGS if encoding in accepted or "*" in accepted), None)
+
+
+def export_stream(pages, export_format: str = "csv", encoding: str | None = None, comments: bool = True):
+    """Yields the encoded export chunk by chunk, at most one page of rows per chunk."""
+    columns = export_columns(comments)
+    writer = WRITERS[export_format](columns)
+    compressor = COMPRESSORS[encoding]()
+    chunk = compressor.compress(writer.header())
+    if chunk:
+        yield chunk
+    for page in pages:
+        chunk = compressor.compress(writer.rows(flatten(interview, columns) for interview in page))
+        if chunk:
+            yield chunk
+    yield compressor.compress(writer.close()) + compressor.flush()
+
+def export_filename(export_format: str) -> str:
+    return f"interviews-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{WRITERS[export_format].extension}"
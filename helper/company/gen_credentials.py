@@ -1,16 +1,30 @@
+import asyncio
+import os
+from urllib.parse import urlparse
 from db_functions.access_table import supabase
+from utils.ratelimit import take_token
 
+MAGIC_LINK_REDIRECT_URL = "http://localhost:8080/candidate/dashboard"
+MAGIC_LINK_TTL_SECONDS = int(os.getenv("MAGIC_LINK_TTL_SECONDS", "3600"))
+MAGIC_LINK_CONCURRENCY = int(os.getenv("MAGIC_LINK_CONCURRENCY", "4"))
+# Supabase auth rate-limits OTP emails per project; keep bulk sends under it. The pace is one
+# token bucket in the shared cache (CACHE_URL), so it holds across requests and workers.
+MAGIC_LINK_RATE_PER_SECOND = float(os.getenv("MAGIC_LINK_RATE_PER_SECOND", "2"))
+MAGIC_LINK_MAX_RETRIES = 3
+
+
+def _sign_in_with_otp(email: str):
+    return supabase.auth.sign_in_with_otp({
+        "email": email,
+        "options": {
+            "emailRedirectTo": MAGIC_LINK_REDIRECT_URL,
+            "shouldCreateUser": True
+        }
+    })
 
 def gen_magic_link(email: str):
     try:
-        res = supabase.auth.sign_in_with_otp({
-            "email": email,
-            "options": {
-                "emailRedirectTo": "http://localhost:8080/candidate/dashboard",
-                "shouldCreateUser": True
-            }
-        })
-        return res
+        return _sign_in_with_otp(email)
     except Exception as e:
         print(f"Error type: {type(e).__name__}")
         print(f"Error message: {str(e)}")
@@ -19,5 +33,45 @@ def gen_magic_link(email: str):
             print(f"Response content: {e.response.text}")
         raise e
 
+
+async def _wait_for_send_slot():
+    """Waits for the project's magic-link bucket, which refills MAGIC_LINK_RATE_PER_SECOND times a second."""
+    if MAGIC_LINK_RATE_PER_SECOND <= 0:
+        return
+    key = f"magic_link:{urlparse(os.getenv('SUPABASE_URL') or '').netloc}"
+    while retry_after := take_token(key, 1, 1 / MAGIC_LINK_RATE_PER_SECOND):
+        await asyncio.sleep(retry_after)
+
+def _is_rate_limited(error: Exception) -> bool:
+    status = getattr(error, "status", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or "rate limit" in str(error).lower()
+
+async def send_magic_links(emails: list[str]) -> dict[str, str | None]:
+    """
+    Sends magic links to many candidates with at most MAGIC_LINK_CONCURRENCY requests in flight
+    per call, paced to MAGIC_LINK_RATE_PER_SECOND for the whole Supabase project and retried
+    with backoff when Supabase returns 429.
+
+    Returns:
+        {email: None on success, or the error message}
+    """
+    semaphore = asyncio.Semaphore(MAGIC_LINK_CONCURRENCY)
+
+    async def send(email: str) -> str | None:
+        async with semaphore:
+            for attempt in range(MAGIC_LINK_MAX_RETRIES + 1):
+                await _wait_for_send_slot()
+                try:
+                    await asyncio.to_thread(_sign_in_with_otp, email)
+                    return None
+                except Exception as e:
+                    if not _is_rate_limited(e) or attempt == MAGIC_LINK_MAX_RETRIES:
+                        return str(e)
+                    await asyncio.sleep(2 ** attempt)
+
+    unique = list(dict.fromkeys(emails))
+    errors = await asyncio.gather(*(send(email) for email in unique))
+    return dict(zip(unique, errors))
+
 if __name__ == "__main__":
-    print(gen_magic_link("itsmeo9806@gmail.com"))
\ No newline at end of file
+    print(gen_magic_link("itsmeo9806@gmail.com"))
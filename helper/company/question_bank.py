@@ -0,0 +1,251 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from utils.cache import Generation
+
+PUBLIC_DIR = Path(__file__).resolve().parents[2] / "public"
+DUPLICATE_THRESHOLD = float(os.getenv("QUESTION_DUPLICATE_THRESHOLD", "0.72"))
+# Terms present in more than this share of documents carry almost no signal; their postings
+# are only walked when the query has nothing more specific.
+MAX_DF_RATIO = 0.2
+RERANK_CANDIDATES = 50
+# Bigrams keep word order from counting for nothing, but at full weight a single reworded
+# phrase costs a paraphrase most of its score.
+BIGRAM_WEIGHT = 0.35
+WARM_PAGE_SIZE = 1000
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_VOWEL_RE = re.compile(r"[aeiouy]")
+_NUMBERING_RE = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s*")
+_STOPWORDS = frozenset("""
+a an and are as at be by can could did do does for from had has have how i if in into is it its
+me my of on or our so tell that the their them then there these they this to us was we were what
+when where which who why will with would you your
+s t d ll re ve m
+""".split())
+
+
+def _stem(token: str) -> str:
+    """
+    Light suffix stripping so inflections of a word share a term: plurals (-ies, -es after
+    s/x/ch/sh, -s), then -ing/-ed, then a final -e, with "-ise" spelled "-ize".
+    processes, processing and processed all become "process"; scale, scaled and scaling "scal".
+    """
+    token = token.rstrip(".")
+    if len(token) > 4 and token.endswith("ies"):
+        token = token[:-3] + "y"
+    elif len(token) > 4 and token.endswith(("sses", "xes", "ches", "shes")):
+        token = token[:-2]
+    elif len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        token = token[:-1]
+    for suffix in ("ing", "ed"):
+        stem = token[:-len(suffix)]
+        if token.endswith(suffix) and len(stem) >= 3 and _VOWEL_RE.search(stem):
+            # running -> run, debugged -> debug
+            if len(stem) > 3 and stem[-1] == stem[-2] and stem[-1] not in "lsz":
+                stem = stem[:-1]
+            token = stem
+            break
+    if len(token) > 5 and token.endswith("ise"):
+        token = token[:-3] + "ize"
+    if len(token) > 4 and token.endswith("e") and not token.endswith("ee"):
+        token = token[:-1]
+    return token
+
+def terms(text: str) -> Counter:
+    """Word unigrams and bigrams after stopword removal and light stemming."""
+    words = [_stem(token) for token in _TOKEN_RE.findall((text or "").lower()) if token not in _STOPWORDS]
+    words = [word for word in words if word]
+    return Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+def parse_question_file(text: str) -> list[str]:
+    """One question per non-empty line, with list numbering or bullets stripped."""
+    questions = []
+    for line in text.splitlines():
+        question = _NUMBERING_RE.sub("", line.lstrip("﻿")).strip()
+        if question:
+            questions.append(question)
+    return questions
+
+
+class QuestionBank:
+    """
+    In-memory TF-IDF index over question text with an inverted index for candidate retrieval.
+    Candidates are scored from postings, then the best few are re-ranked by exact cosine
+    similarity so scores stay comparable against DUPLICATE_THRESHOLD as the corpus grows.
+
+    Documents are owned by a company (its questions) or shared (company_id None, seeded from
+    files); searches only ever see the caller's own questions plus the shared bank.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bank_loaded = False
+        self._generation = Generation("question_bank")
+        # company_id -> shared generation the company's documents were loaded at
+        self._built_at: dict[str, int] = {}
+        self._docs: dict[object, dict] = {}
+        self._postings: dict[str, dict[object, float]] = {}
+        self._df: Counter = Counter()
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + len(self._docs)) / (1 + self._df.get(term, 0))) + 1
+
+    def _weights(self, tf: Counter) -> dict[str, float]:
+        weights = {
+            term: (1 + math.log(count)) * self._idf(term) * (BIGRAM_WEIGHT if " " in term else 1.0)
+            for term, count in tf.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        return {term: weight / norm for term, weight in weights.items()}
+
+    def _remove_locked(self, key):
+        doc = self._docs.pop(key, None)
+        if not doc:
+            return
+        for term in doc["tf"]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+            self._df[term] -= 1
+            if self._df[term] <= 0:
+                del self._df[term]
+
+    def _add_locked(self, key, text: str, company_id: str | None, role_id: int | None):
+        self._remove_locked(key)
+        tf = terms(text)
+        if not tf:
+            return
+        self._docs[key] = {"text": text, "company_id": company_id, "role_id": role_id, "tf": tf}
+        for term, count in tf.items():
+            self._df[term] += 1
+            self._postings.setdefault(term, {})[key] = 1 + math.log(count)
+
+    def _note_change(self, company_id: str | None):
+        if company_id is None:
+            return
+        generation = self._generation.bump(company_id)
+        with self._lock:
+            if self._built_at.get(company_id) == generation - 1:
+                self._built_at[company_id] = generation
+
+    def add(self, key, text: str, company_id: str | None = None, role_id: int | None = None):
+        with self._lock:
+            self._add_locked(key, text, company_id, role_id)
+        self._note_change(company_id)
+
+    def remove(self, key, company_id: str | None = None):
+        with self._lock:
+            self._remove_locked(key)
+        self._note_change(company_id)
+
+    def remove_role(self, role_id: int, company_id: str):
+        with self._lock:
+            for key in [key for key, doc in self._docs.items() if doc["role_id"] == role_id and doc["company_id"] == company_id]:
+                self._remove_locked(key)
+        self._note_change(company_id)
+
+    def search(self, text: str, company_id: str | None, limit: int = 10, role_id: int | None = None,
+               exclude_role_id: int | None = None, include_shared: bool = True) -> list[dict]:
+        with self._lock:
+            query_tf = terms(text)
+            if not query_tf or not self._docs:
+                return []
+            query = self._weights(query_tf)
+
+            def visible(doc: dict) -> bool:
+                if doc["company_id"] is None:
+                    return include_shared and role_id is None
+                if doc["company_id"] != company_id:
+                    return False
+                if role_id is not None and doc["role_id"] != role_id:
+                    return False
+                return exclude_role_id is None or doc["role_id"] != exclude_role_id
+
+            max_df = max(1, int(len(self._docs) * MAX_DF_RATIO))
+            ordered = sorted(query, key=lambda term: self._df.get(term, 0))
+            selective = [term for term in ordered if 0 < self._df.get(term, 0) <= max_df]
+            scan_terms = selective or [term for term in ordered if self._df.get(term, 0)]
+
+            candidates: Counter = Counter()
+            for term in scan_terms:
+                weight = query[term]
+                for key, tf_weight in self._postings.get(term, {}).items():
+                    candidates[key] += weight * tf_weight
+
+            results = []
+            for key, _ in candidates.most_common():
+                doc = self._docs[key]
+                if not visible(doc):
+                    continue
+                doc_weights = self._weights(doc["tf"])
+                score = sum(weight * doc_weights.get(term, 0.0) for term, weight in query.items())
+                results.append((score, key, doc))
+                if len(results) >= max(limit, RERANK_CANDIDATES):
+                    break
+            results.sort(key=lambda item: item[0], reverse=True)
+            return [
+                {
+                    "question_id": key if doc["company_id"] is not None else None,
+                    "question_text": doc["text"],
+                    "role_id": doc["role_id"],
+                    "source": "company" if doc["company_id"] is not None else "bank",
+                    "score": round(score, 4),
+                }
+                for score, key, doc in results[:limit]
+            ]
+
+    def find_duplicate(self, text: str, company_id: str, role_id: int | None = None,
+                       threshold: float = DUPLICATE_THRESHOLD) -> dict | None:
+        matches = self.search(text, company_id, limit=1, role_id=role_id, include_shared=False)
+        if matches and matches[0]["score"] >= threshold:
+            return matches[0]
+        return None
+
+    def seed_file(self, path: Path):
+        questions = parse_question_file(Path(path).read_text(encoding="utf-8-sig"))
+        with self._lock:
+            for idx, question in enumerate(questions):
+                self._add_locked(f"bank:{Path(path).stem}:{idx}", question, None, None)
+
+    def warm(self, supabase, company_id: str):
+        if not self._bank_loaded:
+            for path in sorted(PUBLIC_DIR.glob("*questions*.txt")):
+                self.seed_file(path)
+            self._bank_loaded = True
+        generation = self._generation.current(company_id)
+        if self._built_at.get(company_id) == generation:
+            return
+
+        roles = supabase.table("roles").select("id").eq("company_id", company_id).execute().data
+        role_ids = [role["id"] for role in roles]
+        rows = []
+        last_id = 0
+        while role_ids:
+            page = (
+                supabase.table("questions")
+                .select("id, role_id, question_text")
+                .in_("role_id", role_ids)
+                .gt("id", last_id)
+                .order("id")
+                .limit(WARM_PAGE_SIZE)
+                .execute().data
+            )
+            rows.extend(page)
+            if len(page) < WARM_PAGE_SIZE:
+                break
+            last_id = page[-1]["id"]
+        with self._lock:
+            for key in [key for key, doc in self._docs.items() if doc["company_id"] == company_id]:
+                self._remove_locked(key)
+            for row in rows:
+                self._add_locked(row["id"], row["question_text"], company_id, row["role_id"])
+            self._built_at[company_id] = generation
+
+
+question_bank = QuestionBank()
@@ -0,0 +1,61 @@
+# Higher is better for every tie-breaker; the interview id keeps the order total and stable.
+# The database packs them into interviews.shortlist_rank (see the shortlist_rank migration).
+TIE_BREAKERS = ("overall_score", "technical_score", "problem_solving_score", "communication_score")
+SHORTLIST_COLUMNS = "id, candidate_name, candidate_email, created_at, status, ai_evaluation, shortlist_rank"
+# "<rank of the last item>.<its shortlist_rank>.<its id>"
+SHORTLIST_CURSOR_PATTERN = r"^\d+\.\d+\.\d+$"
+
+
+def _entry(rank: int, interview: dict) -> dict:
+    scores = interview.get("ai_evaluation") or {}
+    return {
+        "rank": rank,
+        "interview_id": interview["id"],
+        "candidate_name": interview.get("candidate_name"),
+        "candidate_email": interview.get("candidate_email"),
+        "status": interview.get("status"),
+        "created_at": interview.get("created_at"),
+        "recommendation": scores.get("recommendation"),
+        **{field: scores.get(field) for field in TIE_BREAKERS},
+    }
+
+
+def shortlist(
+    supabase,
+    company_id: str,
+    position: str,
+    limit: int = 20,
+    offset: int = 0,
+    recommendation: str | None = None,
+    cursor: str | None = None,
+) -> dict:
+    """
+    One page of a position's graded candidates in rank order, read from the shortlist
+    indexes. A cursor (the previous page's next_cursor) continues after that page's last
+    candidate with a keyset read. An offset has the database skip that many index entries.
+    """
+    query = (
+        supabase.table("interviews")
+        .select(SHORTLIST_COLUMNS, count="exact")
+        .eq("company_id", company_id)
+        .eq("position", position)
+        .not_.is_("shortlist_rank", "null")
+    )
+    if recommendation is not None:
+        query = query.eq("ai_recommendation", recommendation)
+    if cursor is not None:
+        offset, last_rank, last_id = (int(part) for part in cursor.split("."))
+        # Written so the bound on shortlist_rank is an index condition and the scan stays in order.
+        query = query.lte("shortlist_rank", last_rank).or_(f"shortlist_rank.lt.{last_rank},id.gt.{last_id}")
+    else:
+        query = query.offset(offset)
+    result = query.order("shortlist_rank", desc=True).order("id").limit(limit).execute()
+
+    items = [_entry(offset + idx + 1, row) for idx, row in enumerate(result.data)]
+    # The count covers every row the filters match, which after a cursor is the rest of the list.
+    total = (offset if cursor is not None else 0) + (result.count or 0)
+    next_cursor = None
+    if items and items[-1]["rank"] < total:
+        last = result.data[-1]
+        next_cursor = f"{items[-1]['rank']}.{last['shortlist_rank']}.{last['id']}"
+    return {"total": total, "offset": offset, "limit": limit, "items": items, "next_cursor": next_cursor}
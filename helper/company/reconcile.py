@@ -0,0 +1,255 @@
+"""
+Reconciles interviews with Vapi. A pass pages through only the interviews that still owe
+something, in keyset order on the indexed call_status:
+
+    queued   the dispatch never finished (its worker restarted): failed after
+             RECONCILE_QUEUED_TIMEOUT_SECONDS so the candidate can call again
+    placed   fetched from Vapi; once the call has ended, ingest_call stores its transcript,
+             costs, recording and the interview's status. Calls that can't be fetched are
+             retried on later passes, up to RECONCILE_MAX_FETCH_ATTEMPTS times
+    ended    not graded yet: graded with the company's backend within the evaluation rate limit.
+             One with nothing to grade (no transcript, or no answers) gets an
+             evaluation_error and is not picked up again
+
+Vapi fetches and gradings run RECONCILE_CONCURRENCY at a time. Every worker runs the loop but
+a lease in the shared cache lets one of them make each pass; `python -m
+helper.company.reconcile` makes a single pass by hand.
+
+    RECONCILE_INTERVAL_SECONDS   between passes (default 300; 0 disables the loop)
+    RECONCILE_GRADING            0 to only sync calls
+"""
+import asyncio
+import os
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from helper.company.transcript import TRANSCRIPT_UNAVAILABLE, fetch_call, ingest_call, record_evaluation
+from helper.company.events import interview_events
+from helper.candidate.session import candidate_sessions
+from helper.evaluation.engine import evaluate
+from utils.cache import get_cache
+from utils.etag import company_views
+from utils.ratelimit import rate_limiter
+
+RECONCILE_INTERVAL_SECONDS = int(os.getenv("RECONCILE_INTERVAL_SECONDS", "300"))
+RECONCILE_PAGE_SIZE = int(os.getenv("RECONCILE_PAGE_SIZE", "100"))
+RECONCILE_CONCURRENCY = int(os.getenv("RECONCILE_CONCURRENCY", "4"))
+RECONCILE_QUEUED_TIMEOUT_SECONDS = int(os.getenv("RECONCILE_QUEUED_TIMEOUT_SECONDS", "600"))
+RECONCILE_MAX_FETCH_ATTEMPTS = int(os.getenv("RECONCILE_MAX_FETCH_ATTEMPTS", "24"))
+RECONCILE_GRADING = os.getenv("RECONCILE_GRADING", "1") == "1"
+# A pass still running after this long is presumed dead and no longer blocks the next one.
+RECONCILE_RUN_TIMEOUT_SECONDS = 30 * 60
+MAX_RECORDED_ERRORS = 10
+
+RECONCILE_COLUMNS = (
+    "id, company_id, candidate_name, candidate_email, position, status, interview_date, created_at, "
+    "call_id, call_status, call_sync_attempts, transcript, recording_path"
+)
+
+
+def _stale_queued_page(supabase, queued_before: str, last_id: int) -> list[dict]:
+    return (
+        supabase.table("interviews").select(RECONCILE_COLUMNS)
+        .eq("call_status", "queued").lt("call_queued_at", queued_before)
+        .gt("id", last_id).order("id").limit(RECONCILE_PAGE_SIZE)
+        .execute().data
+    )
+
+def _placed_page(supabase, last_id: int) -> list[dict]:
+    return (
+        supabase.table("interviews").select(RECONCILE_COLUMNS)
+        .eq("call_status", "placed")
+        .gt("id", last_id).order("id").limit(RECONCILE_PAGE_SIZE)
+        .execute().data
+    )
+
+def _ungraded_page(supabase, last_id: int) -> list[dict]:
+    return (
+        supabase.table("interviews").select(RECONCILE_COLUMNS)
+        .eq("call_status", "ended").is_("ai_evaluation", "null").is_("evaluation_error", "null")
+        .gt("id", last_id).order("id").limit(RECONCILE_PAGE_SIZE)
+        .execute().data
+    )
+
+def _update_call(supabase, interview: dict, update: dict, expected_status: str) -> bool:
+    """Applies update unless the call moved on meanwhile (e.g. the dispatcher just finished)."""
+    updated = (
+        supabase.table("interviews").update(update)
+        .eq("id", interview["id"]).eq("call_status", expected_status)
+        .execute().data
+    )
+    if updated:
+        interview.update(update)
+    return bool(updated)
+
+def _company_backend(supabase, company_id: str) -> str | None:
+    rows = supabase.table("company").select("grading_backend").eq("company_id", company_id).execute().data
+    return rows[0].get("grading_backend") if rows else None
+
+
+class Reconciler:
+    def __init__(self):
+        self._task = None
+
+    def _changed(self, interview: dict):
+        company_views.bump(interview["company_id"])
+        if interview.get("candidate_email"):
+            candidate_sessions.bump(interview["candidate_email"])
+        interview_events.publish_interview(interview)
+
+    async def _each(self, supabase, load_page, handle, stats: Counter, *args):
+        """Runs handle on every row of every page, RECONCILE_CONCURRENCY rows at a time."""
+        semaphore = asyncio.Semaphore(RECONCILE_CONCURRENCY)
+
+        async def bounded(interview: dict):
+            async with semaphore:
+                try:
+                    await handle(supabase, interview, stats)
+                except Exception as e:
+                    stats["errors"] += 1
+                    if len(stats.setdefault("error_messages", [])) < MAX_RECORDED_ERRORS:
+                        stats["error_messages"].append(f"interview {interview['id']}: {e}"[:300])
+
+        last_id = 0
+        while True:
+            page = await run_in_threadpool(load_page, supabase, *args, last_id)
+            stats["scanned"] += len(page)
+            await asyncio.gather(*(bounded(interview) for interview in page))
+            if len(page) < RECONCILE_PAGE_SIZE:
+                return
+            last_id = page[-1]["id"]
+
+    async def _expire_queued(self, supabase, interview: dict, stats: Counter):
+        update = {"call_status": "failed", "call_error": "The call was never placed; please try again"}
+        if await run_in_threadpool(_update_call, supabase, interview, update, "queued"):
+            stats["queued_expired"] += 1
+            self._changed(interview)
+
+    async def _sync_call(self, supabase, interview: dict, stats: Counter):
+        call = await run_in_threadpool(fetch_call, interview["call_id"]) if interview.get("call_id") else None
+        if call is None:
+            attempts = (interview.get("call_sync_attempts") or 0) + 1
+            update = {"call_sync_attempts": attempts}
+            if attempts >= RECONCILE_MAX_FETCH_ATTEMPTS or not interview.get("call_id"):
+                update.update(call_status="failed", status="Pending", call_error="The call could not be retrieved from Vapi")
+            if not await run_in_threadpool(_update_call, supabase, interview, update, "placed"):
+                # Settled elsewhere since the page was read; nothing left to retry.
+                stats["sync_superseded"] += 1
+            elif "call_status" in update:
+                stats["calls_abandoned"] += 1
+                self._changed(interview)
+            else:
+                stats["fetch_retries"] += 1
+            return
+        if call.get("status") != "ended":
+            stats["calls_in_progress"] += 1
+            return
+        await run_in_threadpool(ingest_call, supabase, interview, call)
+        stats["calls_ended"] += 1
+        self._changed(interview)
+
+    async def _give_up_grading(self, supabase, interview: dict, stats: Counter, error: str):
+        await run_in_threadpool(_update_call, supabase, interview, {"evaluation_error": error}, "ended")
+        stats["ungradable"] += 1
+
+    async def _grade(self, supabase, interview: dict, stats: Counter, backends: dict):
+        transcript = interview.get("transcript")
+        if not transcript or transcript == TRANSCRIPT_UNAVAILABLE:
+            await self._give_up_grading(supabase, interview, stats, "The call's transcript could not be retrieved")
+            return
+        company_id = interview["company_id"]
+        if company_id not in backends:
+            backends[company_id] = await run_in_threadpool(_company_backend, supabase, company_id)
+        try:
+            async with rate_limiter.limit("evaluation", company_id):
+                result = await run_in_threadpool(evaluate, transcript, backend=backends[company_id])
+        except HTTPException:
+            # Throttled: the interview is picked up again on a later pass.
+            stats["grading_deferred"] += 1
+            return
+        except ValueError as e:
+            # Nothing to grade (the candidate never answered); recorded, not an error.
+            await self._give_up_grading(supabase, interview, stats, str(e))
+            return
+        await run_in_threadpool(record_evaluation, supabase, interview, result)
+        stats["graded"] += 1
+
+    async def run_once(self, supabase) -> dict:
+        """One pass over stale queued calls, placed calls and ungraded interviews. Returns counts."""
+        started = time.monotonic()
+        stats = Counter()
+        queued_before = (datetime.now(timezone.utc) - timedelta(seconds=RECONCILE_QUEUED_TIMEOUT_SECONDS)).isoformat()
+        await self._each(supabase, _stale_queued_page, self._expire_queued, stats, queued_before)
+        await self._each(supabase, _placed_page, self._sync_call, stats)
+        if RECONCILE_GRADING:
+            backends = {}
+
+            async def grade(supabase, interview, stats):
+                await self._grade(supabase, interview, stats, backends)
+
+            await self._each(supabase, _ungraded_page, grade, stats)
+        summary = {
+            **dict(stats),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "duration_seconds": round(time.monotonic() - started, 3),
+        }
+        get_cache().set("reconcile:last_run", summary)
+        return summary
+
+    async def run_if_due(self, supabase) -> dict | None:
+        """Makes a pass unless another worker made or is making one within the interval."""
+        cache = get_cache()
+        if not cache.add("reconcile:lease", os.getpid(), ttl=RECONCILE_INTERVAL_SECONDS):
+            return None
+        if not cache.add("reconcile:running", os.getpid(), ttl=RECONCILE_RUN_TIMEOUT_SECONDS):
+            return None
+        try:
+            return await self.run_once(supabase)
+        finally:
+            cache.delete("reconcile:running")
+
+    async def _loop(self, supabase):
+        while True:
+            # Jittered so workers started together don't all race for the lease at once.
+            await asyncio.sleep(RECONCILE_INTERVAL_SECONDS * random.uniform(0.5, 1.0))
+            try:
+                await self.run_if_due(supabase)
+            except Exception as e:
+                get_cache().set("reconcile:last_error", {"at": datetime.now(timezone.utc).isoformat(), "error": str(e)[:500]})
+
+    def start(self, supabase):
+        if RECONCILE_INTERVAL_SECONDS > 0 and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop(supabase))
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> dict:
+        cache = get_cache()
+        return {
+            "interval_seconds": RECONCILE_INTERVAL_SECONDS,
+            "running": cache.get("reconcile:running") is not None,
+            "last_run": cache.get("reconcile:last_run"),
+            "last_error": cache.get("reconcile:last_error"),
+        }
+
+reconciler = Reconciler()
+
+
+if __name__ == "__main__":
+    import json
+    import dotenv
+    dotenv.load_dotenv()
+    from db_functions.access_table import supabase
+
+    print(json.dumps(asyncio.run(reconciler.run_once(supabase)), indent=2))
@@ -0,0 +1,227 @@
+"""
+Call recording archive. Recordings are streamed from Vapi in chunks, transcoded on the fly
+by ffmpeg when it is installed (24 kbps Opus in Ogg, a tenth or less of the l16 WAV Vapi
+records), and kept in a local directory or a Supabase Storage bucket. Neither the download
+nor the transcode ever holds a whole recording in memory.
+
+    RECORDINGS_BACKEND     local (default) or supabase
+    RECORDINGS_DIR         local backend directory (default ./recordings); must be on a
+                           persistent disk, which Render instances don't have by default
+    RECORDINGS_BUCKET      supabase backend bucket (default recordings)
+    RECORDING_CODEC        opus (default) or wav to keep the original
+    FFMPEG_BINARY          ffmpeg executable (default: ffmpeg on the PATH). Without one, opus
+                           recordings are stored as WAV and a warning is logged at startup
+"""
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from fastapi import HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from utils.cache import get_cache
+
+RECORDINGS_BACKEND = os.getenv("RECORDINGS_BACKEND", "local")
+RECORDINGS_DIR = Path(os.getenv("RECORDINGS_DIR", "recordings"))
+RECORDINGS_BUCKET = os.getenv("RECORDINGS_BUCKET", "recordings")
+RECORDING_CODEC = os.getenv("RECORDING_CODEC", "opus")
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+RECORDING_ARCHIVE_WORKERS = int(os.getenv("RECORDING_ARCHIVE_WORKERS", "2"))
+CHUNK_SIZE = 64 * 1024
+# Headers passed through when proxying a range request to storage.
+PROXIED_HEADERS = ("content-type", "content-length", "content-range", "accept-ranges", "etag", "last-modified")
+# Claim on an interview's archive job, so only one worker archives it at a time.
+ARCHIVE_CLAIM_TTL_SECONDS = 30 * 60
+
+OPUS_ARGS = ["-ac", "1", "-c:a", "libopus", "-b:a", "24k", "-application", "voip", "-f", "ogg"]
+
+
+def recording_url(call: dict) -> str | None:
+    return call.get("recordingUrl") or (call.get("artifact") or {}).get("recordingUrl")
+
+logger = logging.getLogger(__name__)
+
+def _ffmpeg() -> str | None:
+    return shutil.which(FFMPEG_BINARY) if RECORDING_CODEC == "opus" else None
+
+def check_transcoder() -> bool:
+    """Warns when recordings should be transcoded but ffmpeg can't be found. Run at startup."""
+    if RECORDING_CODEC == "opus" and _ffmpeg() is None:
+        logger.warning(
+            "RECORDING_CODEC=opus but %s was not found; call recordings will be archived as "
+            "uncompressed WAV (about ten times larger). Install ffmpeg or set FFMPEG_BINARY.",
+            FFMPEG_BINARY,
+        )
+        return False
+    return True
+
+def _download(url: str, destination, transcode: bool):
+    """Streams url into the open file `destination`, through ffmpeg when transcode is set."""
+    import requests
+
+    with requests.get(url, stream=True, timeout=(10, 60)) as response:
+        response.raise_for_status()
+        chunks = response.iter_content(CHUNK_SIZE)
+        if not transcode:
+            for chunk in chunks:
+                destination.write(chunk)
+            return
+
+        with tempfile.TemporaryFile() as errors:
+            proc = subprocess.Popen(
+                [_ffmpeg(), "-hide_banner", "-loglevel", "error", "-i", "pipe:0", *OPUS_ARGS, "pipe:1"],
+                stdin=subprocess.PIPE, stdout=destination, stderr=errors
+            )
+            try:
+                for chunk in chunks:
+                    proc.stdin.write(chunk)
+            except BrokenPipeError:
+                pass
+            finally:
+                proc.stdin.close()
+            if proc.wait() != 0:
+                errors.seek(0)
+                raise RuntimeError(f"ffmpeg failed ({proc.returncode}): {errors.read()[-500:].decode(errors='replace')}")
+
+
+class RecordingStore:
+    def __init__(self, backend: str = RECORDINGS_BACKEND):
+        self.backend = backend
+
+    def save(self, supabase, path: str, source: Path, content_type: str):
+        if self.backend == "supabase":
+            with open(source, "rb") as file:
+                supabase.storage.from_(RECORDINGS_BUCKET).upload(
+                    path, file, {"content-type": content_type, "upsert": "true"}
+                )
+        else:
+            target = RECORDINGS_DIR / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(source, target)
+
+    def local_path(self, path: str) -> Path:
+        return RECORDINGS_DIR / path
+
+    def signed_url(self, supabase, path: str, expires_in: int = 60) -> str:
+        signed = supabase.storage.from_(RECORDINGS_BUCKET).create_signed_url(path, expires_in)
+        return signed.get("signedURL") or signed.get("signedUrl")
+
+recording_store = RecordingStore()
+
+
+@lru_cache(maxsize=None)
+def _storage_client():
+    import httpx
+
+    return httpx.AsyncClient(timeout=httpx.Timeout(10, read=60))
+
+os.register_at_fork(after_in_child=_storage_client.cache_clear)
+
+async def recording_response(supabase, interview: dict, range_header: str | None):
+    """
+    Streams an archived recording in chunks. Range requests (seeking in an audio player) are
+    answered with 206 by FileResponse locally, and passed through to storage otherwise.
+    """
+    path, content_type = interview["recording_path"], interview.get("recording_content_type")
+    if recording_store.backend != "supabase":
+        local_path = recording_store.local_path(path)
+        if not local_path.is_file():
+            raise HTTPException(status_code=404, detail="Recording file is missing")
+        return FileResponse(local_path, media_type=content_type, headers={"Cache-Control": "private, max-age=3600"})
+
+    url = recording_store.signed_url(supabase, path)
+    request = _storage_client().build_request("GET", url, headers={"Range": range_header} if range_header else None)
+    upstream = await _storage_client().send(request, stream=True)
+    if upstream.status_code >= 400:
+        await upstream.aclose()
+        raise HTTPException(status_code=416 if upstream.status_code == 416 else 502, detail="Recording is unavailable")
+    headers = {name: upstream.headers[name] for name in PROXIED_HEADERS if name in upstream.headers}
+    headers["Cache-Control"] = "private, max-age=3600"
+    return StreamingResponse(
+        upstream.aiter_raw(CHUNK_SIZE),
+        status_code=upstream.status_code,
+        headers=headers,
+        media_type=headers.get("content-type", content_type),
+        background=BackgroundTask(upstream.aclose)
+    )
+
+
+def archive_recording(supabase, interview: dict, url: str) -> dict:
+    """Downloads, transcodes and stores one recording, then records where it lives on the interview."""
+    transcode = _ffmpeg() is not None
+    extension, content_type = ("ogg", "audio/ogg") if transcode else ("wav", "audio/wav")
+    path = f"{interview['company_id']}/{interview['id']}.{extension}"
+    # Written next to its destination so the local backend finishes with a rename.
+    staging = RECORDINGS_DIR if recording_store.backend == "local" else None
+    if staging:
+        staging.mkdir(parents=True, exist_ok=True)
+    file = tempfile.NamedTemporaryFile(dir=staging, suffix=f".{extension}.part", delete=False)
+    temp_path = Path(file.name)
+    try:
+        with file:
+            _download(url, file, transcode)
+        size = temp_path.stat().st_size
+        recording_store.save(supabase, path, temp_path, content_type)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+    update = {
+        "recording_path": path,
+        "recording_content_type": content_type,
+        "recording_size": size,
+        "recording_archived_at": datetime.now(timezone.utc).isoformat(),
+        "recording_error": None,
+    }
+    supabase.table("interviews").update(update).eq("id", interview["id"]).execute()
+    return update
+
+
+class RecordingArchiver:
+    """Archives recordings on a small thread pool, off the request path."""
+
+    def __init__(self, workers: int = RECORDING_ARCHIVE_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="recording-archiver")
+            return self._executor
+
+    def _reset(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, supabase, interview: dict, call: dict) -> bool:
+        """Queues the call's recording unless it is already archived, being archived, or absent."""
+        url = recording_url(call)
+        if not url or interview.get("recording_path"):
+            return False
+        claim = f"recording-archive:{interview['id']}"
+        if not get_cache().add(claim, 1, ttl=ARCHIVE_CLAIM_TTL_SECONDS):
+            return False
+        self._pool().submit(self._run, supabase, interview, url, claim)
+        return True
+
+    def pending(self, interview_id: int) -> bool:
+        return get_cache().get(f"recording-archive:{interview_id}") is not None
+
+    def _run(self, supabase, interview: dict, url: str, claim: str):
+        try:
+            archive_recording(supabase, interview, url)
+        except Exception as e:
+            supabase.table("interviews").update({"recording_error": str(e)[:500]}).eq("id", interview["id"]).execute()
+        finally:
+            get_cache().delete(claim)
+
+recording_archiver = RecordingArchiver()
+
+os.register_at_fork(after_in_child=recording_archiver._reset)
@@ -1,15 +1,20 @@
 import os
-import requests
-import dotenv
-import json
-import langchain_openai
-from langchain_core.prompts import ChatPromptTemplate
-from pydantic import BaseModel
 import json
+from datetime import datetime
+from helper.evaluation.engine import evaluate, store_evaluation
+from helper.company.recordings import recording_archiver
+from helper.company.events import interview_events
+from helper.candidate.session import candidate_sessions
+from utils.etag import company_views
+from helper.evaluation.rubrics import InterviewScores as Scores
 
-dotenv.load_dotenv()
+TRANSCRIPT_UNAVAILABLE = "Failed to retrieve transcript"
+
+
+def fetch_call(call_id: str) -> dict | None:
+    """The Vapi call object (transcript, timings, cost and its breakdown), or None if unavailable."""
+    import requests
 
-def retrive_transcript(call_id: str) -> str:
     headers = {
         "Authorization": f"Bearer {os.getenv('VAPI_API_KEY')}",
         "Content-Type": "application/json"
@@ -17,136 +22,87 @@ def retrive_transcript(call_id: str) -> str:
     response = requests.get(f"https://api.vapi.ai/call/{call_id}", headers=headers)
 
     if response.status_code == 200:
-        return response.json().get("transcript")
-    
-    return "Failed to retrieve transcript"
-
-
-class Scores(BaseModel):
-    technical_score: int
-    technical_comment: str
-    communication_score: int
-    communication_comment: str
-    problem_solving_score: int
-    problem_solving_comment: str
-    experience_score: int
-    experience_comment: str
-    leadership_score: int
-    leadership_comment: str
-    adaptability_score: int
-    adaptability_comment: str
-    overall_score: int
-    overall_comment: str
-    recommendation: str
-    key_strengths: str
-
-def grade_transcript(transcript: str) -> str:
-    llm = langchain_openai.ChatOpenAI(model="gpt-4o-mini", api_key=os.getenv("OPENAI_API_KEY"))
-    strucuted_llm = llm.with_structured_output(Scores)
-    system_prompt = """
-You are a senior technical interviewer with extensive experience evaluating candidates for CS/tech positions. 
-Analyze the interview transcript and provide scores (0-100) and detailed comments for each category.
-
-**SCORING GUIDELINES:**
-Use the full 0-100 range with these benchmarks:
-- 90-100: Exceptional performance, top-tier candidate
-- 80-89: Strong performance, clearly above average
-- 70-79: Good performance, meets role expectations
-- 60-69: Adequate performance, some areas of concern
-- 50-59: Below average, notable gaps or weaknesses
-- 0-49: Poor performance, significant deficiencies
-
-**EVALUATION CATEGORIES:**
-
-1. **TECHNICAL_SCORE & TECHNICAL_COMMENT:**
-   - Technical knowledge depth and accuracy
-   - Understanding of relevant technologies, frameworks, and tools
-   - Coding ability, algorithm knowledge, system design concepts
-   - Best practices and engineering fundamentals
-   - Comment should include specific examples from the transcript
-
-2. **COMMUNICATION_SCORE & COMMUNICATION_COMMENT:**
-   - Clarity in explaining technical concepts
-   - Active listening and question comprehension
-   - Ability to articulate thought processes
-   - Professional communication style and engagement
-   - Comment should highlight communication strengths/weaknesses with examples
+        return response.json()
+    return None
 
-3. **PROBLEM_SOLVING_SCORE & PROBLEM_SOLVING_COMMENT:**
-   - Approach to analyzing and breaking down problems
-   - Logical reasoning and structured thinking
-   - Creativity and efficiency in finding solutions
-   - Handling of edge cases and constraints
-   - Comment should describe their problem-solving methodology with specific instances
-
-4. **EXPERIENCE_SCORE & EXPERIENCE_COMMENT:**
-   - Relevance and depth of past work experience
-   - Demonstrated impact and ownership in previous roles
-   - Learning from challenges and applying lessons
-   - Industry knowledge and practical application
-   - Comment should reference specific projects or experiences mentioned
-
-5. **LEADERSHIP_SCORE & LEADERSHIP_COMMENT:**
-   - Examples of leading projects, teams, or initiatives
-   - Mentoring, teaching, or knowledge-sharing experiences
-   - Decision-making and taking ownership
-   - Influence and collaboration across teams
-   - Comment should cite specific leadership examples or assess leadership potential
-
-6. **ADAPTABILITY_SCORE & ADAPTABILITY_COMMENT:**
-   - Learning new technologies, frameworks, or domains
-   - Handling change, ambiguity, and uncertainty
-   - Flexibility in approach and openness to feedback
-   - Growth mindset and continuous improvement
-   - Comment should include examples of adaptation or learning agility
-
-7. **OVERALL_SCORE & OVERALL_COMMENT:**
-   - Holistic assessment considering all factors
-   - Hiring recommendation (Strong Hire/Hire/No Hire/Strong No Hire)
-   - Key strengths and primary concerns
-   - Fit for the specific role and team
-   - Comment should provide hiring recommendation with 2-3 key supporting points
-
-**RESPONSE FORMAT:**
-You must respond with a JSON object that exactly matches the Scores model structure. 
-Ensure all comments are specific, evidence-based, and reference concrete examples from the interview transcript. 
-Comments should be 2-4 sentences each, providing clear justification for the assigned scores.
-
-Example format:
-{{
-    "technical_score": 85,
-    "technical_comment": "Candidate demonstrated strong knowledge of...",
-    "communication_score": 78,
-    "communication_comment": "Explained concepts clearly but...",
-    "problem_solving_score": 90,
-    "problem_solving_comment": "Logical reasoning and structured thinking...",
-    "experience_score": 85,
-    "experience_comment": "Relevant experience and practical application...",
-    "leadership_score": 75,
-    "leadership_comment": "Examples of leading projects or teams...",
-    "adaptability_score": 88,
-    "adaptability_comment": "Learning new technologies and adapting to changes...",
-    "overall_score": 85,
-    "overall_comment": "Holistic assessment considering all factors...",
-    "recommendation": "Strong Hire",
-    "key_strengths": "Strong technical knowledge and problem-solving skills..."
-}}
-"""
-
-    user_prompt = """
-Evaluate this interview transcript and provide scores with detailed comments:
-
-**Interview Transcript:**
-{transcript}
-"""
+def retrive_transcript(call_id: str) -> str:
+    call = fetch_call(call_id)
+    if call is not None:
+        return call.get("transcript")
+
+    return TRANSCRIPT_UNAVAILABLE
+
+def call_accounting(call: dict) -> dict:
+    """Duration and spend of a call, as the interview columns that store them."""
+    duration = None
+    if call.get("startedAt") and call.get("endedAt"):
+        started = datetime.fromisoformat(call["startedAt"])
+        ended = datetime.fromisoformat(call["endedAt"])
+        duration = round((ended - started).total_seconds(), 3)
+    return {
+        "call_duration_seconds": duration,
+        "call_cost": call.get("cost"),
+        "call_cost_breakdown": call.get("costBreakdown"),
+        "call_ended_reason": call.get("endedReason"),
+    }
 
-    prompt_template = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("user", user_prompt)
-    ])
-    result = strucuted_llm.invoke(prompt_template.invoke({"transcript": transcript}))
-    return json.dumps(result.model_dump(), indent=2)
+def call_outcome(call: dict) -> dict:
+    """
+    Interview state once Vapi reports the call ended: completed if a conversation took place,
+    otherwise back to pending with the call failed, so the candidate can call again.
+    """
+    if call.get("transcript"):
+        return {"call_status": "ended", "status": "Completed", "call_error": None}
+    return {"call_status": "failed", "status": "Pending", "call_error": call.get("endedReason") or "Call ended without a conversation"}
+
+def ingest_call(supabase, interview: dict, call: dict | None = None) -> str:
+    """
+    Fetches an interview's call once (unless the caller already has it) and stores its
+    transcript along with its duration and cost (rolled up per company, position and day by
+    the database), then queues its recording for archiving. An ended call also settles the
+    interview's status and clears any earlier evaluation_error; a call that can't be fetched
+    is left `placed` for the reconciler to retry, without overwriting a transcript stored
+    earlier. `interview` is updated in place.
+    Returns the transcript.
+    """
+    if call is None:
+        call = fetch_call(interview["call_id"])
+    if call is None:
+        stored = interview.get("transcript")
+        if stored and stored != TRANSCRIPT_UNAVAILABLE:
+            return stored
+        update = {"transcript": TRANSCRIPT_UNAVAILABLE}
+        if interview.get("call_id"):
+            update["call_status"] = "placed"
+    else:
+        update = {"transcript": call.get("transcript"), "evaluation_error": None, **call_accounting(call)}
+        if call.get("status") == "ended":
+            update.update(call_outcome(call))
+    supabase.table("interviews").update(update).eq("id", interview["id"]).execute()
+    company_views.bump(interview["company_id"])
+    state_changed = any(key in update and update[key] != interview.get(key) for key in ("status", "call_status"))
+    if state_changed and interview.get("candidate_email"):
+        candidate_sessions.bump(interview["candidate_email"])
+    interview.update(update)
+    if call is not None:
+        recording_archiver.submit(supabase, interview, call)
+    return update["transcript"]
+
+def record_evaluation(supabase, interview: dict, result: dict, make_current: bool = True):
+    """Stores a grading result and brings every cached view of the interview up to date."""
+    store_evaluation(supabase, interview["id"], result, make_current=make_current)
+    company_views.bump(interview["company_id"])
+    if make_current:
+        interview_events.publish_interview({**interview, "ai_evaluation": result["scores"]})
+
+
+def grade_transcript(transcript: str, backend: str | None = None) -> str:
+    result = evaluate(transcript, "interview", backend=backend)
+    return json.dumps(result["scores"], indent=2)
 
 if __name__ == "__main__":
-    transcript = retrive_transcript("5d8231e3-20fd-4503-8304-fb5b1ab07918")
-    print(grade_transcript(transcript))
\ No newline at end of file
+    import dotenv
+    dotenv.load_dotenv()
+    call = fetch_call("5d8231e3-20fd-4503-8304-fb5b1ab07918")
+    print(json.dumps(call_accounting(call), indent=2))
+    print(grade_transcript(call.get("transcript")))
@@ -0,0 +1,352 @@
+"""
+Offline checks for Vapi workflows before they are posted.
+
+WorkflowGraph validates the graph (one start node, edges between known nodes, every node
+reachable and able to reach an endCall node, no cycles, and every {$[node].variable} in an
+edge condition naming a variable that node extracts and that is always set before the edge
+is taken), measures the shortest and longest conversations it allows, and simulates calls
+with scripted candidate answers.
+
+Edge conditions are AI prompts; the simulator evaluates the comparisons in them
+({$[question_1].quality_1} < 6, joined by "and"/"or") and treats a condition without any as
+the fallback taken when no other edge matches. Every visit to a node refreshes the variables
+its outgoing conditions read from the script, so a retry node consumes the next answer to the
+question it retries.
+
+    python -m helper.company.workflow_check workflow.json ...
+    python -m helper.company.workflow_check --template standard --questions 5
+"""
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Any, Iterator
+
+# Rough per-turn figures for estimates: one question and answer, including speech synthesis.
+TURN_SECONDS = float(os.getenv("WORKFLOW_TURN_SECONDS", "45"))
+CALL_COST_PER_MINUTE = float(os.getenv("CALL_COST_PER_MINUTE", "0.15"))
+
+_COMPARISON_RE = re.compile(r"\{\$\[(\w+)\]\.(\w+)\}\s*(==|!=|>=|<=|<|>)\s*(true|false|-?\d+(?:\.\d+)?)")
+_REFERENCE_RE = re.compile(r"\{\$\[(\w+)\]\.(\w+)\}")
+_OR_RE = re.compile(r"\bor\b", re.IGNORECASE)
+_OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">=": lambda a, b: a >= b,
+    "<=": lambda a, b: a <= b,
+    "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b,
+}
+
+# (node, variable, operator, value)
+Clause = tuple[str, str, str, Any]
+
+
+@lru_cache(maxsize=8192)
+def _parse_condition(prompt: str) -> tuple[list[tuple[str, str]], list[list[Clause]]]:
+    """
+    The variables a condition prompt reads, and its comparisons as OR-ed groups of AND-ed
+    clauses. Cached: generated workflows repeat the same prompts, and callers don't mutate them.
+    """
+    groups: list[list[Clause]] = []
+    previous_end = None
+    for match in _COMPARISON_RE.finditer(prompt):
+        node, variable, operator, literal = match.groups()
+        value = literal == "true" if literal in ("true", "false") else float(literal)
+        if previous_end is None or _OR_RE.search(prompt, previous_end, match.start()):
+            groups.append([])
+        groups[-1].append((node, variable, operator, value))
+        previous_end = match.end()
+    return _REFERENCE_RE.findall(prompt), groups
+
+def _holds(groups: list[list[Clause]], state: dict) -> bool:
+    for clauses in groups:
+        try:
+            if all(_OPERATORS[op](state[node][variable], value) for node, variable, op, value in clauses):
+                return True
+        except (KeyError, TypeError):
+            continue
+    return False
+
+
+@dataclass
+class Simulation:
+    path: list[str]
+    turns: int
+    terminated: bool
+    reason: str | None = None
+
+@dataclass
+class WorkflowReport:
+    name: str | None
+    nodes: int
+    edges: int
+    problems: list[str] = field(default_factory=list)
+    min_turns: int | None = None
+    max_turns: int | None = None
+    min_duration_seconds: float | None = None
+    max_duration_seconds: float | None = None
+    min_cost: float | None = None
+    max_cost: float | None = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "ok": self.ok}
+
+
+class WorkflowGraph:
+    def __init__(self, workflow: dict):
+        self.name = workflow.get("name")
+        self.nodes: dict[str, dict] = {}
+        self.problems: list[str] = []
+        for node in workflow.get("nodes", []):
+            name = node.get("name")
+            if not name:
+                self.problems.append("node without a name")
+            elif name in self.nodes:
+                self.problems.append(f"duplicate node {name}")
+            else:
+                self.nodes[name] = node
+
+        starts = [name for name, node in self.nodes.items() if node.get("isStart")]
+        if len(starts) != 1:
+            self.problems.append(f"expected one start node, found {len(starts)}")
+        self.start = starts[0] if starts else None
+
+        self.edge_count = len(workflow.get("edges", []))
+        self.out: dict[str, list[tuple[str, list[list[Clause]] | None]]] = {name: [] for name in self.nodes}
+        self.preds: dict[str, list[str]] = {name: [] for name in self.nodes}
+        # Nodes whose variables each node's outgoing conditions read.
+        self.reads: dict[str, list[str]] = {name: [] for name in self.nodes}
+        self.references: dict[tuple[str, str, str], None] = {}
+        for edge in workflow.get("edges", []):
+            source, target = edge.get("from"), edge.get("to")
+            if source not in self.nodes or target not in self.nodes:
+                self.problems.append(f"edge {source} -> {target} references an unknown node")
+                continue
+            references, groups = _parse_condition((edge.get("condition") or {}).get("prompt") or "")
+            for node, variable in references:
+                self.references[(source, node, variable)] = None
+                if node not in self.reads[source]:
+                    self.reads[source].append(node)
+            self.out[source].append((target, groups or None))
+            self.preds[target].append(source)
+
+        self.ends = {
+            name for name, node in self.nodes.items()
+            if node.get("type") == "tool" and (node.get("tool") or {}).get("type") == "endCall"
+        }
+        self.order = self._topological_order()
+
+    def _reachable(self, roots: list[str], neighbours) -> set[str]:
+        seen, stack = set(roots), list(roots)
+        while stack:
+            for following in neighbours(stack.pop()):
+                if following not in seen:
+                    seen.add(following)
+                    stack.append(following)
+        return seen
+
+    def _topological_order(self) -> list[str] | None:
+        indegree = {name: len(preds) for name, preds in self.preds.items()}
+        ready = [name for name, degree in indegree.items() if degree == 0]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for target, _ in self.out[name]:
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    ready.append(target)
+        return order if len(order) == len(self.nodes) else None
+
+    def is_end(self, name: str) -> bool:
+        return name in self.ends
+
+    def _extracted(self, name: str) -> set[str]:
+        plan = self.nodes[name].get("variableExtractionPlan") or {}
+        return {output.get("title") for output in plan.get("output", [])}
+
+    def _dominance(self) -> tuple[dict[str, int], dict[str, int]]:
+        """Pre/post numbers of the dominator tree (DAGs only), for O(1) dominance checks."""
+        index = {name: idx for idx, name in enumerate(self.order)}
+        idom = {self.start: self.start}
+
+        def intersect(a, b):
+            while a != b:
+                while index[a] > index[b]:
+                    a = idom[a]
+                while index[b] > index[a]:
+                    b = idom[b]
+            return a
+
+        for name in self.order:
+            if name == self.start:
+                continue
+            preds = [pred for pred in self.preds[name] if pred in idom]
+            if preds:
+                dominator = preds[0]
+                for pred in preds[1:]:
+                    dominator = intersect(dominator, pred)
+                idom[name] = dominator
+
+        children: dict[str, list[str]] = {}
+        for name, parent in idom.items():
+            if name != self.start:
+                children.setdefault(parent, []).append(name)
+        pre, post, clock = {}, {}, 0
+        stack: list[tuple[str, Iterator[str]]] = [(self.start, iter(children.get(self.start, [])))]
+        pre[self.start] = clock
+        while stack:
+            name, pending = stack[-1]
+            child = next(pending, None)
+            clock += 1
+            if child is None:
+                post[name] = clock
+                stack.pop()
+            else:
+                pre[child] = clock
+                stack.append((child, iter(children.get(child, []))))
+        return pre, post
+
+    def validate(self) -> list[str]:
+        problems = list(self.problems)
+        if self.start is None:
+            return problems
+
+        reachable = self._reachable([self.start], lambda name: (target for target, _ in self.out[name]))
+        problems += [f"node {name} is unreachable" for name in self.nodes if name not in reachable]
+        ends = list(self.ends)
+        if not ends:
+            problems.append("no endCall node")
+        for name in self.nodes:
+            if not self.out[name] and not self.is_end(name):
+                problems.append(f"node {name} has no outgoing edges and does not end the call")
+            elif self.out[name] and self.is_end(name):
+                problems.append(f"endCall node {name} has outgoing edges")
+        finishing = self._reachable(ends, lambda name: self.preds[name])
+        problems += [f"node {name} can never reach the end of the call" for name in reachable if name not in finishing]
+        if self.order is None:
+            problems.append("the graph has a cycle, so calls may not terminate")
+
+        dominance = self._dominance() if self.order is not None else None
+        for source, node, variable in self.references:
+            if node not in self.nodes:
+                problems.append(f"edge from {source} reads {variable} from unknown node {node}")
+            elif variable not in self._extracted(node):
+                problems.append(f"edge from {source} reads {variable}, which {node} does not extract")
+            elif dominance is not None and source in dominance[0] and node in dominance[0]:
+                pre, post = dominance
+                if not (pre[node] <= pre[source] and post[source] <= post[node]):
+                    problems.append(f"edge from {source} reads {node}.{variable} on a path that skips {node}")
+        return problems
+
+    def turn_range(self) -> tuple[int, int] | None:
+        """Fewest and most conversation turns on any path from the start to an end (DAGs only)."""
+        if self.order is None or self.start is None:
+            return None
+        shortest, longest = {self.start: 0}, {self.start: 0}
+        for name in self.order:
+            if name not in shortest:
+                continue
+            turns = 1 if self.nodes[name].get("type") == "conversation" else 0
+            for target, _ in self.out[name]:
+                low, high = shortest[name] + turns, longest[name] + turns
+                shortest[target] = min(shortest.get(target, low), low)
+                longest[target] = max(longest.get(target, high), high)
+        ends = [name for name in shortest if self.is_end(name)]
+        if not ends:
+            return None
+        return min(shortest[name] for name in ends), max(longest[name] for name in ends)
+
+    def simulate(self, script: dict[str, list[dict]], max_steps: int = 10_000) -> Simulation:
+        """
+        Walks the graph from the start node. script maps a node to the successive values of the
+        variables it extracts, consumed one entry per visit to a node whose conditions read it.
+        """
+        if self.start is None:
+            return Simulation([], 0, False, "no start node")
+        answers = {node: iter(values) for node, values in script.items()}
+        state: dict[str, dict] = {}
+        path, turns, name = [], 0, self.start
+        for _ in range(max_steps):
+            path.append(name)
+            if self.nodes[name].get("type") == "conversation":
+                turns += 1
+            if not self.out[name]:
+                return Simulation(path, turns, self.is_end(name), None if self.is_end(name) else f"stuck at {name}")
+            for node in self.reads[name]:
+                values = next(answers.get(node, iter(())), None)
+                if values is not None:
+                    state.setdefault(node, {}).update(values)
+
+            following = fallback = None
+            for target, groups in self.out[name]:
+                if groups is None:
+                    fallback = fallback or target
+                elif _holds(groups, state):
+                    following = target
+                    break
+            name = following or fallback
+            if name is None:
+                return Simulation(path, turns, False, f"no edge from {path[-1]} matches")
+        return Simulation(path, turns, False, f"no end after {max_steps} steps")
+
+
+def question_script(attempts: list[list[int | dict]]) -> dict[str, list[dict]]:
+    """
+    Script for workflows built by create_automated_interview_workflow: attempts[i] are the
+    answers to question i + 1 in order, each a quality score (understood when above 0) or
+    the extracted variables themselves.
+    """
+    script = {}
+    for idx, answers in enumerate(attempts):
+        n = idx + 1
+        script[f"question_{n}"] = [
+            answer if isinstance(answer, dict) else {f"quality_{n}": answer, f"understood_{n}": answer > 0}
+            for answer in answers
+        ]
+    return script
+
+def estimate(turns: int) -> tuple[float, float]:
+    """Call duration in seconds and cost for a number of conversation turns."""
+    seconds = turns * TURN_SECONDS
+    return seconds, round(seconds / 60 * CALL_COST_PER_MINUTE, 4)
+
+def check_workflow(workflow: dict) -> WorkflowReport:
+    graph = WorkflowGraph(workflow)
+    report = WorkflowReport(graph.name, len(graph.nodes), graph.edge_count, graph.validate())
+    turn_range = graph.turn_range()
+    if turn_range:
+        report.min_turns, report.max_turns = turn_range
+        report.min_duration_seconds, report.min_cost = estimate(report.min_turns)
+        report.max_duration_seconds, report.max_cost = estimate(report.max_turns)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Validate Vapi workflows offline")
+    parser.add_argument("files", nargs="*", help="workflow JSON files")
+    parser.add_argument("--template", help="render this workflow template instead of reading files")
+    parser.add_argument("--questions", type=int, default=5, help="questions to render the template with")
+    args = parser.parse_args()
+
+    workflows = [json.load(open(path)) for path in args.files]
+    if args.template:
+        from helper.company.workflow_templates import get_workflow_template
+
+        questions = [f"Question {idx + 1}" for idx in range(args.questions)]
+        workflows.append(get_workflow_template(args.template).render(questions))
+    failed = False
+    for workflow in workflows:
+        report = check_workflow(workflow)
+        failed |= not report.ok
+        print(json.dumps(report.to_dict(), indent=2))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,208 @@
+"""
+Declarative interview workflow templates, compiled once and rendered into Vapi workflow JSON.
+
+A template (public/workflow_templates/<name>.json) describes the stages of an interview:
+
+    intro        node the call starts on
+    question     {"step": {...}, "nodes": [...], "edges": [...]} repeated for every question;
+                 the first node asks it and the rest are its retries. Node positions are the
+                 first question's, shifted by `step` for each following one.
+    progression  optional node after the last question (left out when there are none)
+    conclusion   node before the call ends
+    end          the node that ends the call
+    workflow     the top-level workflow object
+
+Strings may reference ${variable}; a string that is only a reference is replaced by the
+value itself (a number, or the node and edge lists in `workflow`). Question nodes and edges
+also see ${n}, ${question} and ${next}, the name of the node after this question.
+{"$fragment": "name"} is replaced by the template's fragment of that name. Consecutive
+stages are joined by unconditional edges; within a question the template's edges apply.
+"""
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
+
+TEMPLATES_DIR = Path(__file__).resolve().parents[2] / "public" / "workflow_templates"
+DEFAULT_WORKFLOW_TEMPLATE = os.getenv("DEFAULT_WORKFLOW_TEMPLATE", "standard")
+
+STAGES = ("intro", "question", "progression", "conclusion", "end", "workflow")
+WORKFLOW_VARIABLES = {"company_name", "name", "nodes", "edges"}
+QUESTION_VARIABLES = {"n", "question", "next"}
+
+_PLACEHOLDER_RE = re.compile(r"\$\{(\w+)\}")
+_POSITION = "__position__"
+
+Renderer = Callable[[dict], Any]
+
+
+_DYNAMIC = object()
+
+def _constant(value) -> Renderer:
+    # Scalars are immutable, so every render can return the same one.
+    def render(v):
+        return value
+    render.constant = value
+    return render
+
+def _text(parts: list[str]) -> Renderer:
+    # parts alternates literal text and variable names, as split by _PLACEHOLDER_RE.
+    if len(parts) == 3 and not parts[0] and not parts[2]:
+        name = parts[1]
+        return lambda v: v[name]
+    pieces = tuple((part, bool(idx % 2)) for idx, part in enumerate(parts) if idx % 2 or part)
+    return lambda v: "".join(str(v[part]) if variable else part for part, variable in pieces)
+
+def _compile(value, fragments: dict, used: set) -> Renderer:
+    """
+    Compiles value into a tree of renderers that build a fresh copy of it, with references read
+    from the variables `v`. Template values are only ever copied, never evaluated. A dict or
+    list is rendered as a copy of its constant scalars with the rest filled in, so rendering
+    a node costs about as much as writing it out by hand.
+    """
+    if isinstance(value, dict):
+        if set(value) == {"$fragment"}:
+            if value["$fragment"] not in fragments:
+                raise ValueError(f"Unknown fragment: {value['$fragment']}")
+            return _compile(fragments[value["$fragment"]], fragments, used)
+        base, dynamic = {}, []
+        for key, child in value.items():
+            render = _compile(child, fragments, used)
+            constant = getattr(render, "constant", _DYNAMIC)
+            # Dynamic keys hold their place in base, so rendered dicts keep the template's key order.
+            base[str(key)] = None if constant is _DYNAMIC else constant
+            if constant is _DYNAMIC:
+                dynamic.append((str(key), render))
+        if not dynamic:
+            return lambda v: base.copy()
+
+        def render_dict(v):
+            rendered = base.copy()
+            for key, render in dynamic:
+                rendered[key] = render(v)
+            return rendered
+        return render_dict
+    if isinstance(value, list):
+        renders = [_compile(child, fragments, used) for child in value]
+        if all(hasattr(render, "constant") for render in renders):
+            constants = [render.constant for render in renders]
+            return lambda v: constants.copy()
+        return lambda v: [render(v) for render in renders]
+    if not isinstance(value, str) or "${" not in value:
+        return _constant(value)
+
+    parts = _PLACEHOLDER_RE.split(value)
+    used.update(parts[1::2])
+    return _text(parts)
+
+
+@dataclass(frozen=True)
+class WorkflowTemplate:
+    name: str
+    description: str
+    variables: dict
+    intro: Renderer
+    question_name: Renderer
+    question_nodes: tuple[tuple[Renderer, tuple[int, int] | None], ...]
+    question_edges: tuple[Renderer, ...]
+    step: tuple[int, int]
+    progression: Renderer | None
+    conclusion: Renderer
+    end: Renderer
+    workflow: Renderer
+
+    def render(self, questions: list[str], **variables) -> dict[str, Any]:
+        """Vapi workflow asking the questions; variables override the template's defaults."""
+        variables = {**self.variables, **variables}
+        tail = [self.progression(variables)] if questions and self.progression else []
+        tail += [self.conclusion(variables), self.end(variables)]
+        entries = [self.question_name({**variables, "n": idx + 1}) for idx in range(len(questions))]
+        entries.append(tail[0]["name"])
+
+        intro = self.intro(variables)
+        nodes = [intro]
+        edges = [{"from": intro["name"], "to": entries[0]}]
+        step_x, step_y = self.step
+        for idx, question in enumerate(questions):
+            scope = {**variables, "n": idx + 1, "question": question, "next": entries[idx + 1]}
+            for render, position in self.question_nodes:
+                if position is not None:
+                    scope[_POSITION] = {"x": position[0] + idx * step_x, "y": position[1] + idx * step_y}
+                nodes.append(render(scope))
+            edges.extend(render(scope) for render in self.question_edges)
+
+        nodes.extend(tail)
+        edges.extend({"from": node["name"], "to": following["name"]} for node, following in zip(tail, tail[1:]))
+        return self.workflow({**variables, "nodes": nodes, "edges": edges})
+
+
+def compile_template(spec: dict, name: str) -> WorkflowTemplate:
+    """Compiles a template definition, raising ValueError for anything it can't render."""
+    missing = [stage for stage in STAGES if stage != "progression" and stage not in spec]
+    if missing:
+        raise ValueError(f"Workflow template {name} is missing {', '.join(missing)}")
+    question = spec["question"]
+    if not question.get("nodes"):
+        raise ValueError(f"Workflow template {name} has no question nodes")
+
+    fragments = spec.get("fragments", {})
+    variables = spec.get("variables", {})
+    used, question_used = set(), set()
+    stages = {
+        stage: _compile(spec[stage], fragments, used)
+        for stage in ("intro", "progression", "conclusion", "end", "workflow") if stage in spec
+    }
+
+    question_nodes = []
+    for node in question["nodes"]:
+        # Positions are laid out per question by render().
+        position = node.get("metadata", {}).get("position")
+        if isinstance(position, dict):
+            node = {**node, "metadata": {**node["metadata"], "position": f"${{{_POSITION}}}"}}
+            position = (position.get("x", 0), position.get("y", 0))
+        question_nodes.append((_compile(node, fragments, question_used), position))
+    question_edges = tuple(_compile(edge, fragments, question_used) for edge in question.get("edges", []))
+    question_name = _compile(question["nodes"][0]["name"], fragments, question_used)
+    step = question.get("step", {})
+
+    unknown = (used - WORKFLOW_VARIABLES) | (question_used - WORKFLOW_VARIABLES - QUESTION_VARIABLES - {_POSITION})
+    unknown -= set(variables)
+    if unknown:
+        raise ValueError(f"Workflow template {name} references undefined ${{{', '.join(sorted(unknown))}}}")
+
+    return WorkflowTemplate(
+        name=name,
+        description=spec.get("description", ""),
+        variables=variables,
+        intro=stages["intro"],
+        question_name=question_name,
+        question_nodes=tuple(question_nodes),
+        question_edges=question_edges,
+        step=(step.get("x", 0), step.get("y", 0)),
+        progression=stages.get("progression"),
+        conclusion=stages["conclusion"],
+        end=stages["end"],
+        workflow=stages["workflow"],
+    )
+
+
+@lru_cache(maxsize=64)
+def _load(path: Path, mtime_ns: int) -> WorkflowTemplate:
+    # Keyed by modification time, so an edited template file is recompiled on next use.
+    return compile_template(json.loads(path.read_text()), path.stem)
+
+def _template_paths() -> dict[str, Path]:
+    return {path.stem: path for path in TEMPLATES_DIR.glob("*.json")}
+
+def get_workflow_template(name: str | None = None) -> WorkflowTemplate:
+    name = name or DEFAULT_WORKFLOW_TEMPLATE
+    path = _template_paths().get(name)
+    if path is None:
+        raise ValueError(f"Unknown workflow template: {name}")
+    return _load(path, path.stat().st_mtime_ns)
+
+def list_workflow_templates() -> list[WorkflowTemplate]:
+    return [get_workflow_template(name) for name in sorted(_template_paths())]
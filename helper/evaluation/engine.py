@@ -0,0 +1,257 @@
+import os
+import json
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from helper.evaluation.rubrics import Rubric, get_rubric
+from helper.evaluation.heuristic import HeuristicGrader
+
+if TYPE_CHECKING:
+    import langchain_openai
+
+GRADING_MODEL = "gpt-4o-mini"
+# Used for companies that have not chosen one (company.grading_backend).
+DEFAULT_GRADING_BACKEND = os.getenv("GRADING_BACKEND", "openai")
+TRANSCRIPT_TOKEN_BUDGET = int(os.getenv("GRADING_TRANSCRIPT_TOKEN_BUDGET", "12000"))
+LLM_MAX_CONNECTIONS = int(os.getenv("GRADING_MAX_CONNECTIONS", "20"))
+
+# USD per 1M tokens
+MODEL_PRICING = {
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+}
+
+
+@lru_cache(maxsize=None)
+def get_llm(model: str = GRADING_MODEL) -> "langchain_openai.ChatOpenAI":
+    """
+    Returns the long-lived chat client for a model. Sync and async calls share pooled
+    keep-alive connections instead of opening a new client per evaluation. The LangChain/OpenAI
+    stack is imported here, on the first evaluation, rather than at app startup.
+    """
+    import httpx
+    import langchain_openai
+
+    limits = httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+    return langchain_openai.ChatOpenAI(
+        model=model,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        stream_usage=True,
+        http_client=httpx.Client(limits=limits),
+        http_async_client=httpx.AsyncClient(limits=limits)
+    )
+
+@lru_cache(maxsize=None)
+def _structured_llm(rubric: Rubric, model: str):
+    return get_llm(model).with_structured_output(rubric.schema, include_raw=True)
+
+@lru_cache(maxsize=None)
+def _tool_llm(rubric: Rubric, model: str):
+    return get_llm(model).bind_tools([rubric.schema], tool_choice=rubric.schema.__name__)
+
+def _reset_llm_clients():
+    get_llm.cache_clear()
+    _structured_llm.cache_clear()
+    _tool_llm.cache_clear()
+
+os.register_at_fork(after_in_child=_reset_llm_clients)
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(GRADING_MODEL)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+def fit_transcript_to_budget(transcript: str, budget: int = TRANSCRIPT_TOKEN_BUDGET) -> tuple[str, int, bool]:
+    """
+    Trims a transcript to at most `budget` tokens, keeping the opening and the end of the
+    interview and dropping the middle. Returns (transcript, token_count, truncated).
+    """
+    encoding = _get_encoding()
+    tokens = encoding.encode(transcript or "")
+    if len(tokens) <= budget:
+        return transcript, len(tokens), False
+
+    head = budget // 2
+    tail = budget - head
+    omitted = len(tokens) - budget
+    trimmed = (
+        encoding.decode(tokens[:head])
+        + f"\n\n[... {omitted} tokens of transcript omitted ...]\n\n"
+        + encoding.decode(tokens[-tail:])
+    )
+    return trimmed, budget, True
+
+def estimate_cost(model: str, input_tokens: int, cached_input_tokens: int, output_tokens: int) -> float | None:
+    pricing = MODEL_PRICING.get(model)
+    if not pricing:
+        return None
+    uncached = max(input_tokens - cached_input_tokens, 0)
+    cost = (
+        uncached * pricing["input"]
+        + cached_input_tokens * pricing["cached_input"]
+        + output_tokens * pricing["output"]
+    ) / 1_000_000
+    return round(cost, 6)
+
+def _build_usage(model: str, usage_metadata: dict | None, transcript_tokens: int, truncated: bool) -> dict:
+    usage_metadata = usage_metadata or {}
+    input_tokens = usage_metadata.get("input_tokens", 0)
+    output_tokens = usage_metadata.get("output_tokens", 0)
+    cached_input_tokens = (usage_metadata.get("input_token_details") or {}).get("cache_read", 0) or 0
+    return {
+        "model": model,
+        "transcript_tokens": transcript_tokens,
+        "transcript_truncated": truncated,
+        "input_tokens": input_tokens,
+        "cached_input_tokens": cached_input_tokens,
+        "output_tokens": output_tokens,
+        "cost_usd": estimate_cost(model, input_tokens, cached_input_tokens, output_tokens),
+    }
+
+def _result(rubric: Rubric, scores: dict, usage: dict) -> dict:
+    return {
+        "rubric": rubric.name,
+        "rubric_version": rubric.version,
+        "scores": scores,
+        "usage": usage,
+    }
+
+
+class OpenAIGrader:
+    """Grades with an OpenAI chat model through LangChain structured output."""
+
+    name = "openai"
+
+    def grade(self, rubric: Rubric, transcript: str, model: str | None = None) -> tuple[dict, dict]:
+        model = model or GRADING_MODEL
+        transcript, transcript_tokens, truncated = fit_transcript_to_budget(transcript)
+        result = _structured_llm(rubric, model).invoke(rubric.prompt.invoke({"transcript": transcript}))
+        if result.get("parsing_error"):
+            raise result["parsing_error"]
+        usage = _build_usage(model, getattr(result["raw"], "usage_metadata", None), transcript_tokens, truncated)
+        return result["parsed"].model_dump(), usage
+
+    async def astream(self, rubric: Rubric, transcript: str, model: str | None = None):
+        from langchain_core.utils.json import parse_partial_json
+
+        model = model or GRADING_MODEL
+        transcript, transcript_tokens, truncated = fit_transcript_to_budget(transcript)
+        messages = rubric.prompt.invoke({"transcript": transcript})
+
+        aggregate = None
+        emitted: set[str] = set()
+        async for chunk in _tool_llm(rubric, model).astream(messages):
+            aggregate = chunk if aggregate is None else aggregate + chunk
+            if not aggregate.tool_call_chunks:
+                continue
+            partial = parse_partial_json(aggregate.tool_call_chunks[0].get("args") or "")
+            if not isinstance(partial, dict):
+                continue
+            # The last key may still be mid-value; every key before it is complete.
+            completed = {key: partial[key] for key in list(partial)[:-1] if key not in emitted and key in rubric.schema.model_fields}
+            if completed:
+                emitted.update(completed)
+                yield "partial", completed
+
+        if aggregate is None or not aggregate.tool_call_chunks:
+            raise RuntimeError("Grading model returned no output")
+        scores = rubric.schema.model_validate_json(aggregate.tool_call_chunks[0]["args"]).model_dump()
+        remaining = {key: value for key, value in scores.items() if key not in emitted}
+        if remaining:
+            yield "partial", remaining
+        yield "result", (scores, _build_usage(model, aggregate.usage_metadata, transcript_tokens, truncated))
+
+
+# Grading backends by name. Each offers grade(rubric, transcript, model) -> (scores, usage)
+# and astream(...), which yields ("partial", fields) and finally ("result", (scores, usage)).
+_GRADING_BACKENDS = {}
+
+def register_grading_backend(backend):
+    _GRADING_BACKENDS[backend.name] = backend
+    return backend
+
+def get_grading_backend(name: str | None = None):
+    name = name or DEFAULT_GRADING_BACKEND
+    if name not in _GRADING_BACKENDS:
+        raise ValueError(f"Unknown grading backend: {name}")
+    return _GRADING_BACKENDS[name]
+
+def list_grading_backends() -> list[str]:
+    return list(_GRADING_BACKENDS)
+
+register_grading_backend(OpenAIGrader())
+register_grading_backend(HeuristicGrader())
+
+
+def evaluate(transcript: str, rubric_name: str | None = None, version: int | None = None, model: str | None = None, backend: str | None = None) -> dict:
+    """
+    Grades a transcript against a registered rubric with a grading backend (the default
+    unless named; see DEFAULT_GRADING_BACKEND). Every backend returns the rubric's scores.
+    Raises ValueError for an unknown rubric or backend, or a transcript the backend refuses
+    to grade (e.g. one without any answers from the candidate).
+
+    Returns:
+        {"rubric", "rubric_version", "scores", "usage"}
+    """
+    rubric = get_rubric(rubric_name, version)
+    grader = get_grading_backend(backend)
+    scores, usage = grader.grade(rubric, transcript, model)
+    return _result(rubric, scores, {"backend": grader.name, **usage})
+
+async def astream_evaluate(transcript: str, rubric_name: str | None = None, version: int | None = None, model: str | None = None, backend: str | None = None):
+    """
+    Streams the grading of a transcript. Yields ("partial", {field: value}) whenever the
+    backend finishes one or more rubric fields, then a single ("result", result) shaped like
+    the return value of evaluate() once the full answer has been validated.
+    """
+    rubric = get_rubric(rubric_name, version)
+    grader = get_grading_backend(backend)
+    async for kind, payload in grader.astream(rubric, transcript, model):
+        if kind == "partial":
+            yield kind, payload
+        else:
+            scores, usage = payload
+            yield "result", _result(rubric, scores, {"backend": grader.name, **usage})
+
+
+def evaluation_row(interview_id: int, result: dict) -> dict:
+    return {
+        "interview_id": interview_id,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "rubric": result["rubric"],
+        "rubric_version": result["rubric_version"],
+        "scores": result["scores"],
+        "usage": result["usage"],
+    }
+
+def interview_evaluation_update(result: dict) -> dict:
+    return {
+        "ai_evaluation": result["scores"],
+        "evaluation_usage": result["usage"],
+        "evaluation_rubric": result["rubric"],
+        "evaluation_rubric_version": result["rubric_version"],
+    }
+
+def store_evaluation(supabase, interview_id: int, result: dict, make_current: bool = True) -> None:
+    """
+    Persists a result in the evaluations history (one row per interview and rubric version)
+    and, unless make_current is False, makes it the interview's current ai_evaluation.
+    """
+    supabase.table("evaluations").upsert(
+        evaluation_row(interview_id, result),
+        on_conflict="interview_id,rubric,rubric_version"
+    ).execute()
+    if make_current:
+        supabase.table("interviews").update(interview_evaluation_update(result)).eq("id", interview_id).execute()
+
+
+if __name__ == "__main__":
+    import dotenv
+    dotenv.load_dotenv()
+    from helper.company.transcript import retrive_transcript
+    print(json.dumps(evaluate(retrive_transcript("5d8231e3-20fd-4503-8304-fb5b1ab07918")), indent=2))
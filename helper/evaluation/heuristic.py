@@ -0,0 +1,356 @@
+"""
+Deterministic, CPU-only grading. Scores come from what the candidate says in the transcript:
+how much evidence each skill area gets (distinct signal phrases, saturating so repetition
+does not pay), how substantive the answers are, and how much they hedge. It needs no network
+or model weights, so it grades air-gapped and scales with worker processes, and it fills
+every field of any rubric schema: int fields are 0-100 scores, *_comment fields explain
+them, and recommendation, key_strengths and areas_for_improvement summarise the result.
+"""
+import math
+import re
+from functools import lru_cache
+from helper.evaluation.rubrics import Rubric
+
+HEURISTIC_VERSION = "heuristic-v2"
+
+# Speaker prefixes Vapi and the web transcripts use for the candidate's turns.
+CANDIDATE_SPEAKERS = ("user", "candidate", "customer", "human")
+INTERVIEWER_SPEAKERS = ("ai", "assistant", "bot", "interviewer", "agent")
+
+SIGNALS = {
+    "technical": (
+        "python", "java", "javascript", "typescript", "c++", "golang", "rust", "sql", "api", "rest",
+        "graphql", "database", "index", "cache", "caching", "algorithm", "complexity", "big o",
+        "hash", "tree", "graph", "recursion", "concurrency", "thread", "async", "memory",
+        "framework", "library", "compiler", "linux", "protocol", "http", "latency", "throughput",
+    ),
+    "system_design": (
+        "architecture", "scalability", "scale", "distributed", "microservice", "load balancer",
+        "queue", "sharding", "replication", "consistency", "availability", "partition",
+        "cache", "throughput", "latency", "bottleneck", "design",
+    ),
+    "algorithms": (
+        "algorithm", "complexity", "big o", "o(n", "binary search", "sort", "hash map", "hashmap",
+        "heap", "stack", "queue", "tree", "graph", "dynamic programming", "recursion", "bfs", "dfs",
+        "linked list", "array",
+    ),
+    "database": (
+        "sql", "postgres", "mysql", "mongodb", "redis", "database", "query", "index", "schema",
+        "transaction", "join", "normalization", "nosql", "orm", "migration",
+    ),
+    "engineering": (
+        "test", "testing", "unit test", "code review", "refactor", "ci", "deploy", "deployment",
+        "git", "version control", "documentation", "maintainable", "clean code", "monitoring",
+        "logging", "agile", "design pattern",
+    ),
+    "web": (
+        "react", "angular", "vue", "html", "css", "frontend", "front end", "backend", "node",
+        "django", "flask", "fastapi", "rest", "browser", "web", "next.js",
+    ),
+    "cloud": (
+        "aws", "azure", "gcp", "google cloud", "cloud", "docker", "kubernetes", "lambda",
+        "serverless", "terraform", "s3", "ec2", "container",
+    ),
+    "machine_learning": (
+        "machine learning", "model", "training", "neural", "pytorch", "tensorflow", "dataset",
+        "classification", "regression", "llm", "embedding", "inference", "feature", "accuracy",
+    ),
+    "security": (
+        "security", "authentication", "authorization", "encryption", "vulnerability", "oauth",
+        "xss", "injection", "firewall", "tls", "ssl", "penetration",
+    ),
+    "mobile": ("ios", "android", "swift", "kotlin", "flutter", "react native", "mobile", "app store"),
+    "problem_solving": (
+        "because", "approach", "trade-off", "tradeoff", "debug", "root cause", "optimize",
+        "constraint", "edge case", "hypothesis", "measure", "step by step", "first", "then",
+        "alternatively", "instead", "broke it down", "narrowed", "figured out", "solution",
+        "profiled", "investigated", "noticed", "identified", "found", "fixed", "fix", "rewrote",
+        "tried", "tested", "compared", "benchmark",
+    ),
+    "experience": (
+        "years", "project", "built", "shipped", "launched", "production", "internship", "intern",
+        "company", "customers", "users", "client", "startup", "role", "worked on", "responsible",
+    ),
+    "impact": (
+        "percent", "reduced", "increased", "improved", "saved", "faster", "revenue",
+        "million", "thousand", "users", "metric", "result", "impact",
+    ),
+    "leadership": (
+        "led", "lead", "mentor", "mentored", "owned", "ownership", "organized", "coordinated",
+        "initiative", "decided", "drove", "managed", "team lead", "delegated", "onboarded",
+    ),
+    "collaboration": (
+        "team", "we", "together", "collaborated", "pair", "stakeholder", "cross-functional",
+        "communicated", "aligned", "helped", "designer", "product manager",
+    ),
+    "adaptability": (
+        "learned", "learn", "new to", "picked up", "adapt", "adapted", "changed", "feedback",
+        "pivot", "quickly", "unfamiliar", "ramp up", "self-taught", "challenge",
+    ),
+}
+
+FILLERS = ("um", "uh", "erm", "hmm", "you know", "i guess", "kind of", "sort of", "i don't know", "not sure")
+
+# Signal groups behind each rubric field, by field name without its _score suffix. Fields
+# not listed are matched against groups by their own words, then fall back to the overall score.
+FIELD_SIGNALS = {
+    "technical": ("technical", "algorithms", "engineering", "database", "web", "cloud", "system_design"),
+    "problem_solving": ("problem_solving",),
+    "experience": ("experience", "impact"),
+    "leadership": ("leadership",),
+    "adaptability": ("adaptability",),
+    "programming_skills": ("technical", "engineering"),
+    "system_design": ("system_design",),
+    "algorithms_data_structures": ("algorithms",),
+    "database_knowledge": ("database",),
+    "software_engineering": ("engineering",),
+    "web_development": ("web",),
+    "cloud_platforms": ("cloud",),
+    "machine_learning": ("machine_learning",),
+    "cybersecurity": ("security",),
+    "mobile_development": ("mobile",),
+    "collaboration": ("collaboration",),
+    "leadership_potential": ("leadership",),
+    "project_complexity": ("experience", "system_design"),
+    "impact_results": ("impact",),
+    "technical_depth": ("technical", "system_design", "algorithms"),
+    "industry_experience": ("experience",),
+    "technical_accuracy": ("technical", "algorithms"),
+    "code_quality": ("engineering",),
+    "thought_process": ("problem_solving",),
+}
+# Fields that summarise the others instead of measuring one area.
+OVERALL_FIELDS = ("overall", "fit_for_role")
+# Core areas averaged into the overall score; domain specialisms only count where shown.
+CORE_FIELDS = ("technical", "communication", "problem_solving", "experience", "leadership", "adaptability")
+
+RECOMMENDATIONS = ((80, "Strong Hire"), (65, "Hire"), (50, "No Hire"), (0, "Strong No Hire"))
+
+# A score with no evidence at all, and how many distinct signals close half the gap to 100.
+# Calibrated so a substantive, relevant answer lands in the hire bands and an interview of
+# vague or evasive answers below them; tests/test_heuristic_grading.py pins the anchors.
+FLOOR = 45
+HALF_SATURATION = 2
+# Words the candidate says in total before the length of the interview stops mattering.
+FULL_ENGAGEMENT_WORDS = 150
+
+
+def _compile(phrases) -> re.Pattern:
+    alternatives = sorted((re.escape(phrase) for phrase in phrases), key=len, reverse=True)
+    return re.compile(r"(?<![\w])(" + "|".join(alternatives) + r")(?![\w])")
+
+# One pass over the answers finds every phrase; each phrase then counts for all its groups.
+_SIGNAL_PATTERN = _compile({phrase for phrases in SIGNALS.values() for phrase in phrases})
+_PHRASE_GROUPS = {}
+for _group, _phrases in SIGNALS.items():
+    for _phrase in _phrases:
+        _PHRASE_GROUPS.setdefault(_phrase, []).append(_group)
+_FILLER_PATTERN = _compile(FILLERS)
+_SPEAKER = re.compile(r"^\s*([A-Za-z]+)\s*:\s*(.*)$")
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def candidate_answers(transcript: str) -> list[str]:
+    """
+    The candidate's turns, lowercased. Text outside a labelled candidate turn (including a
+    transcript without speaker labels, such as a fetch-failure placeholder) is not an answer.
+    """
+    answers, current = [], None
+    for line in (transcript or "").splitlines():
+        match = _SPEAKER.match(line)
+        if match and match.group(1).lower() in CANDIDATE_SPEAKERS + INTERVIEWER_SPEAKERS:
+            current = [] if match.group(1).lower() in CANDIDATE_SPEAKERS else None
+            if current is not None:
+                answers.append(current)
+            line = match.group(2)
+        if current is not None:
+            current.append(line)
+    return [" ".join(answer).strip().lower() for answer in answers if any(part.strip() for part in answer)]
+
+
+def transcript_features(transcript: str) -> dict:
+    answers = candidate_answers(transcript)
+    text = "\n".join(answers)
+    words = _WORD.findall(text)
+    signals = {group: [] for group in SIGNALS}
+    for phrase in sorted(set(_SIGNAL_PATTERN.findall(text))):
+        for group in _PHRASE_GROUPS[phrase]:
+            signals[group].append(phrase)
+    return {
+        "answers": len(answers),
+        "words": len(words),
+        "unique_words": len(set(words)),
+        "fillers": len(_FILLER_PATTERN.findall(text)),
+        "questions": sum(answer.count("?") for answer in answers),
+        "signals": signals,
+    }
+
+
+def _clamp(score: float) -> int:
+    return max(0, min(100, round(score)))
+
+def _engagement(features: dict) -> float:
+    """0-1: how much the candidate said. Full credit from FULL_ENGAGEMENT_WORDS."""
+    return min(1.0, features["words"] / FULL_ENGAGEMENT_WORDS)
+
+def _signal_score(features: dict, groups) -> tuple[int, list[str]]:
+    found = sorted({signal for group in groups for signal in features["signals"].get(group, ())})
+    strength = 1 - math.exp(-len(found) * math.log(2) / HALF_SATURATION)
+    return _clamp(FLOOR + (100 - FLOOR) * strength * (0.6 + 0.4 * _engagement(features))), found
+
+def _communication_score(features: dict) -> int:
+    if not features["answers"]:
+        return 0
+    words_per_answer = features["words"] / features["answers"]
+    # Answers of 25-120 words read as complete without rambling.
+    if words_per_answer < 25:
+        length = words_per_answer / 25
+    elif words_per_answer > 120:
+        length = max(0.5, 120 / words_per_answer)
+    else:
+        length = 1.0
+    variety = min(1.0, features["unique_words"] / max(features["words"], 1) / 0.45)
+    filler_rate = features["fillers"] / max(features["words"], 1)
+    # Measured from the answers themselves rather than from the floor, so terse ones score low.
+    score = 100 * (0.5 * length + 0.3 * variety + 0.2 * _engagement(features)) - 400 * filler_rate
+    return _clamp(score)
+
+def _groups_for(field: str) -> tuple[str, ...] | None:
+    if field in FIELD_SIGNALS:
+        return FIELD_SIGNALS[field]
+    parts = set(field.split("_"))
+    return tuple(group for group in SIGNALS if parts & set(group.split("_"))) or None
+
+def _label(field: str) -> str:
+    return field.replace("_", " ")
+
+def _recommendation(overall: int) -> str:
+    return next(label for threshold, label in RECOMMENDATIONS if overall >= threshold)
+
+
+@lru_cache(maxsize=64)
+def _score_fields(rubric: Rubric) -> tuple[tuple[str, str], ...]:
+    """(field, kind) per rubric field: kind is score, comment or text."""
+    fields = []
+    for name, info in rubric.schema.model_fields.items():
+        if info.annotation is int:
+            fields.append((name, "score"))
+        elif name.endswith("_comment"):
+            fields.append((name, "comment"))
+        else:
+            fields.append((name, "text"))
+    return tuple(fields)
+
+
+def heuristic_scores(rubric: Rubric, transcript: str) -> dict:
+    """Scores for every rubric field. Raises ValueError when the candidate never answered."""
+    features = transcript_features(transcript)
+    if not features["answers"]:
+        raise ValueError("The transcript has no answers from the candidate to grade")
+    fields = _score_fields(rubric)
+    scores, evidence = {}, {}
+
+    for name, kind in fields:
+        area = name.removesuffix("_score")
+        if kind != "score" or area in OVERALL_FIELDS:
+            continue
+        if area == "communication":
+            scores[name], evidence[name] = _communication_score(features), []
+            continue
+        if area == "questions_asked":
+            # Two or three thoughtful questions back to the interviewer earn full credit.
+            scores[name], evidence[name] = _clamp(FLOOR + (100 - FLOOR) * min(1.0, features["questions"] / 3)), []
+            continue
+        groups = _groups_for(area)
+        if groups is not None:
+            scores[name], evidence[name] = _signal_score(features, groups)
+
+    core = [scores[name] for name in scores if name.removesuffix("_score") in CORE_FIELDS]
+    measured = core or list(scores.values())
+    shown = [
+        score for name, score in scores.items()
+        if evidence.get(name) or name.removesuffix("_score") == "communication"
+    ] or measured
+    # Mostly what the candidate showed: one interview rarely touches every area, and an area
+    # never asked about is no evidence against them.
+    overall = _clamp(0.4 * sum(measured) / len(measured) + 0.6 * sum(shown) / len(shown)) if measured else 0
+    for name, kind in fields:
+        if kind == "score" and name not in scores:
+            scores[name], evidence[name] = overall, []
+
+    areas = sorted((name for name in evidence if name.removesuffix("_score") not in OVERALL_FIELDS), key=lambda name: (-scores[name], name))
+    strongest = [name.removesuffix("_score") for name in areas[:3] if scores[name] > FLOOR]
+    weakest = [name.removesuffix("_score") for name in reversed(areas[-3:])]
+
+    for name, kind in fields:
+        if kind == "comment":
+            scores[name] = _comment(name.removesuffix("_comment"), scores, evidence, features, overall, strongest, weakest)
+        elif kind == "text":
+            scores[name] = _text(name, overall, strongest, weakest)
+    return rubric.schema.model_validate(scores).model_dump()
+
+
+def _comment(area: str, scores: dict, evidence: dict, features: dict, overall: int, strongest, weakest) -> str:
+    if area == "overall":
+        return (
+            f"{_recommendation(overall)} on transcript evidence across {features['answers']} answers "
+            f"({features['words']} words). Strongest: {', '.join(map(_label, strongest)) or 'none'}; "
+            f"weakest: {', '.join(map(_label, weakest)) or 'none'}."
+        )
+    score_field = f"{area}_score"
+    if area == "communication":
+        words_per_answer = round(features["words"] / features["answers"]) if features["answers"] else 0
+        return (
+            f"{features['answers']} answers averaging {words_per_answer} words, "
+            f"with {features['fillers']} filler or hedging phrases."
+        )
+    if area == "questions_asked":
+        return f"Asked {features['questions']} questions."
+    found = evidence.get(score_field, [])
+    if not found:
+        return f"No specific evidence of {_label(area)} in the candidate's answers; scored conservatively."
+    return f"Mentioned {len(found)} relevant {_label(area)} signals, including {', '.join(found[:5])}."
+
+def _text(field: str, overall: int, strongest, weakest) -> str:
+    if field == "recommendation":
+        return _recommendation(overall)
+    if field == "key_strengths":
+        return ", ".join(map(_label, strongest)).capitalize() or "None evident"
+    if field == "areas_for_improvement":
+        return ", ".join(map(_label, weakest)).capitalize() or "None evident"
+    return ""
+
+
+class HeuristicGrader:
+    """The local backend: deterministic, free and offline."""
+
+    name = "heuristic"
+
+    def grade(self, rubric: Rubric, transcript: str, model: str | None = None) -> tuple[dict, dict]:
+        scores = heuristic_scores(rubric, transcript)
+        usage = {
+            "model": HEURISTIC_VERSION,
+            "input_tokens": 0,
+            "cached_input_tokens": 0,
+            "output_tokens": 0,
+            "transcript_tokens": 0,
+            "transcript_truncated": False,
+            "cost_usd": 0.0,
+        }
+        return scores, usage
+
+    async def astream(self, rubric: Rubric, transcript: str, model: str | None = None):
+        scores, usage = self.grade(rubric, transcript, model)
+        yield "partial", scores
+        yield "result", (scores, usage)
+
+
+if __name__ == "__main__":
+    from helper.evaluation.rubrics import get_rubric
+
+    sample = """AI: Tell me about a project you are proud of.
+User: I led a team of three building a FastAPI service on AWS. We cached hot queries in Redis, which reduced p99 latency by 40 percent, and I mentored an intern through the Postgres migration.
+AI: How did you debug the slow endpoint?
+User: First I measured where time went, found the root cause was a missing index, and weighed the trade-off against write throughput before adding it."""
+    for name in ("interview", "candidate_profile"):
+        print(name, heuristic_scores(get_rubric(name), sample))
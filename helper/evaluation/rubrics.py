@@ -0,0 +1,246 @@
+from dataclasses import dataclass
+from functools import cached_property
+from pydantic import BaseModel
+
+
+@dataclass(frozen=True)
+class Rubric:
+    name: str
+    version: int
+    schema: type[BaseModel]
+    system_prompt: str
+    user_prompt: str
+
+    @cached_property
+    def prompt(self):
+        # Built once per rubric, by main.py's background warm-up so langchain is not imported
+        # while the app starts (or on first use outside the app). The static system prompt
+        # comes first and the transcript last so the shared prefix stays byte-identical across
+        # calls and qualifies for provider prompt caching.
+        from langchain_core.prompts import ChatPromptTemplate
+
+        return ChatPromptTemplate.from_messages([
+            ("system", self.system_prompt),
+            ("user", self.user_prompt)
+        ])
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@v{self.version}"
+
+
+_RUBRICS: dict[str, dict[int, Rubric]] = {}
+
+def register_rubric(rubric: Rubric) -> Rubric:
+    versions = _RUBRICS.setdefault(rubric.name, {})
+    if rubric.version in versions:
+        raise ValueError(f"Rubric {rubric.key} is already registered")
+    versions[rubric.version] = rubric
+    return rubric
+
+def get_rubric(name: str | None = None, version: int | None = None) -> Rubric:
+    name = name or DEFAULT_RUBRIC
+    versions = _RUBRICS.get(name)
+    if not versions:
+        raise ValueError(f"Unknown rubric: {name}")
+    if version is None:
+        return versions[max(versions)]
+    if version not in versions:
+        raise ValueError(f"Unknown rubric version: {name}@v{version}")
+    return versions[version]
+
+def list_rubrics() -> list[Rubric]:
+    return [rubric for versions in _RUBRICS.values() for _, rubric in sorted(versions.items())]
+
+
+class InterviewScores(BaseModel):
+    technical_score: int
+    technical_comment: str
+    communication_score: int
+    communication_comment: str
+    problem_solving_score: int
+    problem_solving_comment: str
+    experience_score: int
+    experience_comment: str
+    leadership_score: int
+    leadership_comment: str
+    adaptability_score: int
+    adaptability_comment: str
+    overall_score: int
+    overall_comment: str
+    recommendation: str
+    key_strengths: str
+
+INTERVIEW_SYSTEM_PROMPT = """
+You are a senior technical interviewer with extensive experience evaluating candidates for CS/tech positions. 
+Analyze the interview transcript and provide scores (0-100) and detailed comments for each category.
+
+**SCORING GUIDELINES:**
+Use the full 0-100 range with these benchmarks:
+- 90-100: Exceptional performance, top-tier candidate
+- 80-89: Strong performance, clearly above average
+- 70-79: Good performance, meets role expectations
+- 60-69: Adequate performance, some areas of concern
+- 50-59: Below average, notable gaps or weaknesses
+- 0-49: Poor performance, significant deficiencies
+
+**EVALUATION CATEGORIES:**
+
+1. **TECHNICAL_SCORE & TECHNICAL_COMMENT:**
+   - Technical knowledge depth and accuracy
+   - Understanding of relevant technologies, frameworks, and tools
+   - Coding ability, algorithm knowledge, system design concepts
+   - Best practices and engineering fundamentals
+   - Comment should include specific examples from the transcript
+
+2. **COMMUNICATION_SCORE & COMMUNICATION_COMMENT:**
+   - Clarity in explaining technical concepts
+   - Active listening and question comprehension
+   - Ability to articulate thought processes
+   - Professional communication style and engagement
+   - Comment should highlight communication strengths/weaknesses with examples
+
+3. **PROBLEM_SOLVING_SCORE & PROBLEM_SOLVING_COMMENT:**
+   - Approach to analyzing and breaking down problems
+   - Logical reasoning and structured thinking
+   - Creativity and efficiency in finding solutions
+   - Handling of edge cases and constraints
+   - Comment should describe their problem-solving methodology with specific instances
+
+4. **EXPERIENCE_SCORE & EXPERIENCE_COMMENT:**
+   - Relevance and depth of past work experience
+   - Demonstrated impact and ownership in previous roles
+   - Learning from challenges and applying lessons
+   - Industry knowledge and practical application
+   - Comment should reference specific projects or experiences mentioned
+
+5. **LEADERSHIP_SCORE & LEADERSHIP_COMMENT:**
+   - Examples of leading projects, teams, or initiatives
+   - Mentoring, teaching, or knowledge-sharing experiences
+   - Decision-making and taking ownership
+   - Influence and collaboration across teams
+   - Comment should cite specific leadership examples or assess leadership potential
+
+6. **ADAPTABILITY_SCORE & ADAPTABILITY_COMMENT:**
+   - Learning new technologies, frameworks, or domains
+   - Handling change, ambiguity, and uncertainty
+   - Flexibility in approach and openness to feedback
+   - Growth mindset and continuous improvement
+   - Comment should include examples of adaptation or learning agility
+
+7. **OVERALL_SCORE & OVERALL_COMMENT:**
+   - Holistic assessment considering all factors
+   - Hiring recommendation (Strong Hire/Hire/No Hire/Strong No Hire)
+   - Key strengths and primary concerns
+   - Fit for the specific role and team
+   - Comment should provide hiring recommendation with 2-3 key supporting points
+
+**RESPONSE FORMAT:**
+You must respond with a JSON object that exactly matches the Scores model structure. 
+Ensure all comments are specific, evidence-based, and reference concrete examples from the interview transcript. 
+Comments should be 2-4 sentences each, providing clear justification for the assigned scores.
+
+Example format:
+{{
+    "technical_score": 85,
+    "technical_comment": "Candidate demonstrated strong knowledge of...",
+    "communication_score": 78,
+    "communication_comment": "Explained concepts clearly but...",
+    "problem_solving_score": 90,
+    "problem_solving_comment": "Logical reasoning and structured thinking...",
+    "experience_score": 85,
+    "experience_comment": "Relevant experience and practical application...",
+    "leadership_score": 75,
+    "leadership_comment": "Examples of leading projects or teams...",
+    "adaptability_score": 88,
+    "adaptability_comment": "Learning new technologies and adapting to changes...",
+    "overall_score": 85,
+    "overall_comment": "Holistic assessment considering all factors...",
+    "recommendation": "Strong Hire",
+    "key_strengths": "Strong technical knowledge and problem-solving skills..."
+}}
+"""
+
+INTERVIEW_USER_PROMPT = """
+Evaluate this interview transcript and provide scores with detailed comments:
+
+**Interview Transcript:**
+{transcript}
+"""
+
+
+class CandidateProfileScores(BaseModel):
+    programming_skills: int
+    system_design: int
+    algorithms_data_structures: int
+    database_knowledge: int
+    software_engineering: int
+    
+    # Domain-Specific Technical Skills (0-100)
+    web_development: int
+    cloud_platforms: int
+    machine_learning: int
+    cybersecurity: int
+    mobile_development: int
+    
+    # Soft Skills & Professional Qualities (0-100)
+    communication: int
+    problem_solving: int
+    collaboration: int
+    adaptability: int
+    leadership_potential: int
+    
+    # Experience & Project Quality (0-100)
+    project_complexity: int
+    impact_results: int
+    technical_depth: int
+    industry_experience: int
+    
+    # Interview Performance (0-100)
+    technical_accuracy: int
+    code_quality: int
+    thought_process: int
+    questions_asked: int
+    
+    # Overall Assessment
+    overall_score: int
+    recommendation: str
+    key_strengths: str
+    areas_for_improvement: str
+    fit_for_role: int
+
+CANDIDATE_PROFILE_SYSTEM_PROMPT = """You are an expert technical interviewer evaluating candidates for CS/tech positions. 
+        Analyze the interview transcript and provide scores (0-100) for each category based on the candidate's responses.
+        
+        Scoring Categories:
+        - Technical Knowledge: programming_skills, system_design, algorithms_data_structures, database_knowledge, software_engineering
+        - Domain-Specific Skills: web_development, cloud_platforms, machine_learning, cybersecurity, mobile_development  
+        - Soft Skills: communication, problem_solving, collaboration, adaptability, leadership_potential
+        - Experience: project_complexity, impact_results, technical_depth, industry_experience
+        - Interview Performance: technical_accuracy, code_quality, thought_process, questions_asked
+        - Overall Assessment: overall_score (0-100), recommendation ("Strong Hire"/"Hire"/"No Hire"/"Strong No Hire"), 
+          key_strengths, areas_for_improvement, fit_for_role (0-100)
+        
+        Score based on evidence in the transcript. If a category isn't demonstrated, score conservatively.
+        Be specific in your key_strengths and areas_for_improvement fields."""
+
+CANDIDATE_PROFILE_USER_PROMPT = "Please evaluate this interview transcript:\n\n{transcript}"
+
+
+DEFAULT_RUBRIC = "interview"
+
+register_rubric(Rubric(
+    name="interview",
+    version=1,
+    schema=InterviewScores,
+    system_prompt=INTERVIEW_SYSTEM_PROMPT,
+    user_prompt=INTERVIEW_USER_PROMPT
+))
+
+register_rubric(Rubric(
+    name="candidate_profile",
+    version=1,
+    schema=CandidateProfileScores,
+    system_prompt=CANDIDATE_PROFILE_SYSTEM_PROMPT,
+    user_prompt=CANDIDATE_PROFILE_USER_PROMPT
+))
@@ -1,15 +1,47 @@
+import dotenv
+
+# Loaded once, before any module reads its settings from the environment.
+dotenv.load_dotenv()
+
+import asyncio
+import os
 from fastapi import FastAPI, HTTPException, Depends
 from routes.jwttoken import router as auth_router, get_current_active_user
 from typing import Annotated
-import dotenv
 from routes.company import router as company_router
 from routes.candidate import router as candidate_router
-import uvicorn
+from helper.company.events import interview_events
+from db_functions.access_table import get_supabase_client, supabase
+from helper.company.reconcile import reconciler
+from helper.company.recordings import check_transcoder
+from helper.evaluation.rubrics import list_rubrics
+from utils.ratelimit import rate_limiter
+from utils.security import require_metrics_token
+from contextlib import asynccontextmanager
 
-dotenv.load_dotenv()
 
+def _warm_clients():
+    if os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_KEY"):
+        get_supabase_client()
+    for rubric in list_rubrics():
+        rubric.prompt
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start serving immediately; the Supabase stack and the rubric prompts load in the
+    # background so the first request usually finds them ready.
+    asyncio.get_running_loop().run_in_executor(None, _warm_clients)
+    check_transcoder()
+    realtime_channel = await interview_events.start_realtime_bridge()
+    reconciler.start(supabase)
+    yield
+    await reconciler.stop()
+    if realtime_channel is not None:
+        await realtime_channel.unsubscribe()
+
+
+app = FastAPI(lifespan=lifespan)
 
 UNAUTHORIZED_USER = HTTPException(status_code=401, detail="Unauthorized")
  
@@ -26,4 +58,12 @@ async def read_root():
 async def get_company(current_user: Annotated[str, Depends(get_current_active_user)]):
     if current_user is None:
         raise UNAUTHORIZED_USER
-    return {"message": "Hello World"}
\ No newline at end of file
+    return {"message": "Hello World"}
+
+@app.get("/metrics/rate-limits", dependencies=[Depends(require_metrics_token)])
+async def get_rate_limit_metrics():
+    return rate_limiter.metrics()
+
+@app.get("/metrics/reconciler", dependencies=[Depends(require_metrics_token)])
+async def get_reconciler_metrics():
+    return reconciler.status()
@@ -1,15 +1,19 @@
 from typing import Optional, Annotated
-from fastapi import APIRouter, HTTPException, Request, Depends, status
+from fastapi import APIRouter, HTTPException, Request, Depends, status, Response, Header, Query, BackgroundTasks
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from datetime import date, time
 import os
-import dotenv
-from db_functions.access_table import get_supabase_client
-from helper.candidate.create_call import make_call, retrive_transcript
-dotenv.load_dotenv()
+from db_functions.access_table import supabase
+from helper.candidate.create_call import place_call, prepare_interview_call, retrive_transcript
+from helper.candidate.session import get_candidate_session, save_candidate_session, select_interview, candidate_sessions
+from helper.company.events import interview_events
+from utils.ratelimit import rate_limiter
+from utils.idempotency import idempotent
+from utils.etag import company_views
 
 router = APIRouter(prefix="/candidate", tags=["candidate"])
-supabase = get_supabase_client()
 
 security = HTTPBearer()
 
@@ -20,62 +24,72 @@ class Candidate(BaseModel):
     candidate_phone: str
 
 class CandidateInDB(Candidate):
+    id: int | None = None
     company_id: str
+    company_name: str | None = None
+    status: str | None = None
+    interview_date: date | None = None
+    interview_time: time | None = None
     vapi_workflow_id: str | None = None
+    candidate_auth: str | None = None
+    call_payload: dict | None = None
+    call_status: str | None = None
 
+class CandidateInterview(BaseModel):
+    id: int
+    company_name: str | None = None
+    position: str | None = None
+    status: str | None = None
+    interview_date: date | None = None
+    interview_time: time | None = None
 
-def verify_candidate(email: str):
-    try:
-        candidate_dict = supabase.table("interviews").select("*").eq("candidate_email", email).execute().data
-        
-        if candidate_dict and len(candidate_dict) > 0:
-            return CandidateInDB(**candidate_dict[0])
-    except Exception:
-        pass
-    return None
 
-async def get_current_candidate(credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)]):
+async def get_candidate_session_for_token(credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)]) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
     try:
-        token = credentials.credentials
-        
-
-        user_response = supabase.auth.get_user(token)
-        
-        if not user_response.user:
-            raise credentials_exception
-            
-        candidate_email = user_response.user.email
-        auth_user_id = user_response.user.id
-        
-        if not candidate_email:
-            raise credentials_exception
-            
-        candidate = verify_candidate(candidate_email)
-        
-        if not candidate:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Candidate not found in interviews"
-            )
-        
+        session = get_candidate_session(supabase, credentials.credentials)
+    except Exception:
+        raise credentials_exception
+    if session is None:
+        raise credentials_exception
+    if not session["interviews"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Candidate not found in interviews"
+        )
+    return session
+
+async def get_current_candidate(
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+    session: Annotated[dict, Depends(get_candidate_session_for_token)],
+    interview_id: Annotated[int | None, Query(description="Interview to act on when the candidate has several")] = None,
+    x_interview_id: Annotated[int | None, Header()] = None,
+):
+    interview = select_interview(session, interview_id if interview_id is not None else x_interview_id)
+    if interview is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+
+    if interview.get("candidate_auth") != session["auth_user_id"]:
         try:
-            supabase.table("interviews").update({
-                "candidate_auth": auth_user_id
-            }).eq("candidate_email", candidate_email).execute()
+            supabase.rpc("transition_interview", {
+                "p_interview_id": interview["id"],
+                "p_candidate_auth": session["auth_user_id"]
+            }).execute()
+            interview["candidate_auth"] = session["auth_user_id"]
+            save_candidate_session(credentials.credentials, session)
         except Exception:
             pass
-            
-        return candidate
-        
-    except Exception:
-        raise credentials_exception
 
+    return CandidateInDB(**interview)
+
+
+@router.get("/interviews", summary="List the candidate's interviews", response_model=list[CandidateInterview])
+async def get_candidate_interviews(session: Annotated[dict, Depends(get_candidate_session_for_token)]):
+    return [CandidateInterview(**interview) for interview in session["interviews"]]
 
 @router.get("/dashboard", summary="Get candidate dashboard", response_model=Candidate)
 async def get_candidate_dashboard(current_candidate: Annotated[Candidate, Depends(get_current_candidate)]):
@@ -86,21 +100,69 @@ async def get_candidate_profile(current_candidate: Annotated[Candidate, Depends(
     return current_candidate
 
 @router.get("/company", summary="Get company name", response_model=str)
-async def get_company_name(current_candidate: Annotated[Candidate, Depends(get_current_candidate)]):
-    company_uid = verify_candidate(current_candidate.candidate_email).company_id
-    company = supabase.table("company").select("*").eq("company_id", company_uid).execute().data[0]
-    return company["username"]
+async def get_company_name(current_candidate: Annotated[CandidateInDB, Depends(get_current_candidate)]):
+    return current_candidate.company_name
 
 @router.get("/call", summary="Get phone call", response_model=str)
 async def get_phone_call(current_candidate: Annotated[Candidate, Depends(get_current_candidate)]):
     return "phone call"
 
-@router.get("/createcall", summary="Create phone call", response_model=str)
-async def get_vapi_workflow_id(current_candidate: Annotated[Candidate, Depends(get_current_candidate)]):
-    workflow_id = current_candidate.vapi_workflow_id
-    call_id = make_call(workflow_id, current_candidate.candidate_phone, current_candidate.candidate_name)
-    supabase.table("interviews").update({"call_id": call_id, "status": "Completed"}).eq("candidate_email", current_candidate.candidate_email).execute()
-    return call_id
-
+class CallStatus(BaseModel):
+    interview_id: int
+    call_status: str | None = None
+    call_id: str | None = None
+    call_error: str | None = None
 
+def _dispatch_call(candidate: CandidateInDB, payload: dict):
+    """Runs after the response is sent: places the queued call and records the outcome."""
+    try:
+        call_id = place_call(payload)
+        update = {"p_status": "In Progress", "p_call_id": call_id, "p_call_status": "placed"}
+    except Exception as e:
+        call_id = None
+        update = {"p_call_status": "failed", "p_call_error": str(e)}
+    supabase.rpc("transition_interview", {"p_interview_id": candidate.id, **update}).execute()
+    company_views.bump(candidate.company_id)
+    candidate_sessions.bump(candidate.candidate_email)
+    interview_events.publish_interview({
+        "id": candidate.id,
+        "company_id": candidate.company_id,
+        "call_id": call_id,
+        "call_status": update["p_call_status"],
+        **({"status": "In Progress"} if call_id else {})
+    })
+
+@router.get("/createcall", summary="Create phone call", response_model=CallStatus)
+async def get_vapi_workflow_id(
+    response: Response,
+    background_tasks: BackgroundTasks,
+    current_candidate: Annotated[CandidateInDB, Depends(get_current_candidate)],
+    idempotency_key: Annotated[str | None, Header()] = None,
+):
+    async def create():
+        rate_limiter.check("call", current_candidate.company_id, current_candidate.candidate_email)
+        payload = current_candidate.call_payload
+        if payload is None:
+            # Normally built when the interview was created; covers interviews from before that.
+            payload, error = await run_in_threadpool(prepare_interview_call, supabase, current_candidate.model_dump())
+            if payload is None:
+                raise HTTPException(status_code=422, detail=error)
+        queued = supabase.rpc("queue_call", {"p_interview_id": current_candidate.id}).execute().data
+        if not queued:
+            raise HTTPException(status_code=409, detail="A call for this interview is already queued or in progress")
+        background_tasks.add_task(_dispatch_call, current_candidate, payload)
+        candidate_sessions.bump(current_candidate.candidate_email)
+        interview_events.publish_interview({"id": current_candidate.id, "company_id": current_candidate.company_id, "call_status": "queued"})
+        return {"interview_id": current_candidate.id, "call_status": "queued"}
+
+    return await idempotent(
+        f"createcall:{current_candidate.candidate_email}", idempotency_key,
+        f"interview:{current_candidate.id}", create, response
+    )
 
+@router.get("/call-status", summary="Get phone call status", response_model=CallStatus)
+async def get_call_status(current_candidate: Annotated[CandidateInDB, Depends(get_current_candidate)]):
+    interview = supabase.table("interviews").select("call_status, call_id, call_error").eq("id", current_candidate.id).execute().data
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    return {"interview_id": current_candidate.id, **interview[0]}
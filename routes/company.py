@@ -1,22 +1,41 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Form
-from typing import Annotated
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, status, Form, Query, UploadFile, File, Request, Response, Header, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool, iterate_in_threadpool
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from typing import Annotated, Literal
+from pydantic import BaseModel, Field
 from datetime import datetime, date, time
 from utils.security import verify_password
 import os
-import dotenv
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from datetime import timedelta, timezone
 import jwt
 from jwt.exceptions import InvalidTokenError
-from db_functions.access_table import get_supabase_client
-from helper.company.gen_credentials import gen_magic_link
+from db_functions.access_table import supabase
+from utils.cache import get_cache
+from utils.ratelimit import rate_limiter
+from utils.idempotency import idempotent
+from utils.etag import cached_view, company_views
+from helper.company.gen_credentials import gen_magic_link, send_magic_links, MAGIC_LINK_TTL_SECONDS
 import uuid
-from helper.company.genworkflow import create_automated_interview_workflow, post_workflow
-from helper.company.transcript import retrive_transcript, grade_transcript
+from helper.company.genworkflow import post_workflow
+from helper.company.workflow_templates import get_workflow_template, list_workflow_templates
+from helper.company.workflow_check import check_workflow
+from helper.company.transcript import TRANSCRIPT_UNAVAILABLE, ingest_call, fetch_call, record_evaluation
+from helper.company.recordings import recording_archiver, recording_response
+from helper.company.costs import load_cost_rollups, cost_report
+from helper.company.export import WRITERS, interview_pages, export_stream, export_filename, negotiate_encoding
+from helper.evaluation.engine import evaluate, astream_evaluate, evaluation_row, get_grading_backend, list_grading_backends, DEFAULT_GRADING_BACKEND
+from helper.evaluation.rubrics import get_rubric, list_rubrics
+from helper.company.analytics import evaluation_summary, load_evaluation_histograms
+from helper.company.ranking import SHORTLIST_CURSOR_PATTERN, shortlist
+from helper.company.question_bank import question_bank, parse_question_file
+from helper.company.events import interview_events
+from helper.candidate.session import candidate_sessions
+from helper.candidate.create_call import normalize_phone, prepare_interview_call
 import json
+import asyncio
+import orjson
 
-dotenv.load_dotenv()
 
 router = APIRouter(prefix="/company", tags=["company"])
 
@@ -38,6 +57,17 @@ class Company(BaseModel):
 class CompanyInDB(Company):
     company_id: str
     hashed_password: str
+    grading_backend: str | None = None
+    phone_country_code: str | None = None
+
+class GradingBackendSelection(BaseModel):
+    # null returns the company to the deployment default (GRADING_BACKEND).
+    grading_backend: str | None = None
+
+class PhoneCountrySelection(BaseModel):
+    # Calling code (e.g. "44") for candidate numbers entered without one; null requires a
+    # leading + on every number.
+    phone_country_code: str | None = Field(default=None, pattern=r"^[1-9][0-9]{0,2}$")
 
 class InterviewBasic(BaseModel):
     id: int
@@ -52,7 +82,7 @@ class InterviewBasic(BaseModel):
     interview_time: time | None = None
     call_id: str | None = None
     transcript: str | None = None
-    ai_evaluation: str | None = None
+    ai_evaluation: dict | None = None
 
 class InterviewCredentials(BaseModel):
     candidate_name: str
@@ -64,18 +94,40 @@ class CompanyRole(BaseModel):
     department: str | None = None
     description: str | None = None
     requirements: str | None = None
+    workflow_template: str | None = None
 
 class CompanyRoleOut(CompanyRole):
     id: int
     created_at: datetime
     vapi_workflow_id: str | None = None
 
+# Rows are selected with exactly the response model's columns and sent straight to orjson;
+# the database already guarantees their shape, so they skip model construction and the
+# response_model re-validation.
+INTERVIEW_COLUMNS = ", ".join(InterviewBasic.model_fields)
+ROLE_COLUMNS = ", ".join(CompanyRoleOut.model_fields)
+
+def _interview_out(interview: dict) -> dict:
+    evaluation = interview.get("ai_evaluation")
+    if isinstance(evaluation, str):
+        interview["ai_evaluation"] = orjson.loads(evaluation) if evaluation else None
+    return interview
+
 
 company_oatuh2_scheme = OAuth2PasswordBearer(tokenUrl="company/token")
-supabase = get_supabase_client()
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+COMPANY_CACHE_TTL_SECONDS = int(os.getenv("COMPANY_CACHE_TTL_SECONDS", "60"))
 
 def get_company(username: str):
-    company_dict = supabase.table("company").select("*").eq("username", username).execute().data[0]
+    # Looked up on every authenticated request; shared across workers when CACHE_URL is set.
+    cache_key = f"company:{username}"
+    company_dict = get_cache().get(cache_key)
+    if company_dict is None:
+        company_dict = supabase.table("company").select("*").eq("username", username).execute().data[0]
+        get_cache().set(cache_key, company_dict, ttl=COMPANY_CACHE_TTL_SECONDS)
     if company_dict:
         return CompanyInDB(**company_dict)
     return None
@@ -119,10 +171,16 @@ async def get_current_company(token: Annotated[str, Depends(company_oatuh2_schem
         raise credentials_exception
     return company
 
-async def get_current_active_company(current_company: Annotated[Company, Depends(get_current_company)]):
+async def get_enabled_company(current_company: Annotated[Company, Depends(get_current_company)]):
     if current_company.disabled:
         raise HTTPException(status_code=400, detail="Inactive company")
-    supabase.rpc("set_company_session", {"company_id": current_company.company_id}).execute()
+    return current_company
+
+def set_company_session(company_id: str):
+    supabase.rpc("set_company_session", {"company_id": company_id}).execute()
+
+async def get_current_active_company(current_company: Annotated[Company, Depends(get_enabled_company)]):
+    set_company_session(current_company.company_id)
     return current_company
 
 @router.post("/token")
@@ -137,32 +195,93 @@ async def login_for_access_token(form_data: Annotated[OAuth2PasswordRequestForm,
     access_token = create_access_token(data=data, expires_delta=access_token_expires)
     return {"access_token": access_token, "token_type": "bearer"}
 
+# The cached read endpoints authenticate without the session RPC, which only runs on a cache
+# miss, so a 304 costs no database round trip.
 @router.get("/", summary="Get company info", response_model=Company)
-async def get_company_info(current_company: Annotated[Company, Depends(get_current_active_company)]):
-    return current_company
+async def get_company_info(
+    request: Request,
+    current_company: Annotated[Company, Depends(get_enabled_company)],
+):
+    return cached_view(request, current_company.company_id, "company", lambda: current_company.model_dump(mode="json", include=set(Company.model_fields)))
 
 @router.get("/interviews", summary="Get company interviews", response_model=list[InterviewBasic])
 async def get_company_interviews(current_company: Annotated[Company, Depends(get_current_active_company)]):
-    interviews = supabase.table("interviews").select("*").eq("company_id", current_company.company_id).execute().data
-    
-    # Convert ai_evaluation from dict to JSON string if it exists
-    for interview_dict in interviews:
-        if interview_dict.get("ai_evaluation") and isinstance(interview_dict["ai_evaluation"], dict):
-            import json
-            interview_dict["ai_evaluation"] = json.dumps(interview_dict["ai_evaluation"])
-    
-    return [InterviewBasic(**interview_dict) for interview_dict in interviews]
+    interviews = supabase.table("interviews").select(INTERVIEW_COLUMNS).eq("company_id", current_company.company_id).execute().data
+    return ORJSONResponse([_interview_out(interview) for interview in interviews])
+
+@router.get("/interviews/events", summary="Stream interview status changes")
+async def stream_company_interview_events(
+    request: Request,
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+):
+    company_id = current_company.company_id
+    queue = interview_events.subscribe(company_id)
+
+    async def event_stream():
+        try:
+            yield _sse("ready", {"company_id": company_id})
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(event["type"], event)
+        finally:
+            interview_events.unsubscribe(company_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/interviews/export", summary="Export interviews with their evaluation scores")
+async def export_company_interviews(
+    request: Request,
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+    export_format: Annotated[Literal["csv", "xlsx"], Query(alias="format")] = "csv",
+    position: str | None = None,
+    evaluated_only: bool = False,
+    comments: bool = True,
+):
+    company_id = current_company.company_id
+    rate_limiter.check("export", company_id)
+    encoding = negotiate_encoding(export_format, request.headers.get("accept-encoding"))
+    pages = interview_pages(supabase, company_id, position, evaluated_only)
+
+    async def body():
+        # Held while streaming; pages are fetched and encoded off the event loop one at a time.
+        async with rate_limiter.slot("export", company_id):
+            async for chunk in iterate_in_threadpool(export_stream(pages, export_format, encoding, comments)):
+                yield chunk
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{export_filename(export_format)}"',
+        "Cache-Control": "no-store",
+        "Vary": "Accept-Encoding",
+        "X-Accel-Buffering": "no",
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(body(), media_type=WRITERS[export_format].content_type, headers=headers)
 
 @router.get("/interviews/{interview_id}", summary="Get company interview", response_model=InterviewBasic)
-async def get_company_interview(interview_id: int, current_company: Annotated[Company, Depends(get_current_active_company)]):
-    interview = supabase.table("interviews").select("*").eq("id", interview_id).execute().data[0]
-    
-    # Convert ai_evaluation from dict to JSON string if it exists
-    if interview.get("ai_evaluation") and isinstance(interview["ai_evaluation"], dict):
-        import json
-        interview["ai_evaluation"] = json.dumps(interview["ai_evaluation"])
-    
-    return InterviewBasic(**interview)
+async def get_company_interview(
+    interview_id: int,
+    request: Request,
+    current_company: Annotated[Company, Depends(get_enabled_company)],
+):
+    def load():
+        set_company_session(current_company.company_id)
+        interview = supabase.table("interviews").select(INTERVIEW_COLUMNS).eq("id", interview_id).execute().data
+        if not interview:
+            raise HTTPException(status_code=404, detail="Interview not found")
+        if interview[0]["company_id"] != current_company.company_id:
+            raise HTTPException(status_code=403, detail="Not authorized for this interview")
+        return _interview_out(interview[0])
+
+    return cached_view(request, current_company.company_id, f"interview:{interview_id}", load)
 
 @router.get("/interviews/{interview_id}/send-link", summary="Create company interview link")
 async def create_company_interview_link(interview_id: int, current_company: Annotated[Company, Depends(get_current_active_company)]):
@@ -171,17 +290,118 @@ async def create_company_interview_link(interview_id: int, current_company: Anno
             raise HTTPException(status_code=404, detail="Interview not found")
         candidate_email = interview["candidate_email"]
         gen_magic_link(candidate_email)
-        supabase.table("interviews").update({"magiclink_status": True}).eq("id", interview_id).execute()
+        supabase.table("interviews").update({
+            "magiclink_status": True,
+            "magiclink_sent_at": datetime.now(timezone.utc).isoformat()
+        }).eq("id", interview_id).execute()
+        company_views.bump(current_company.company_id)
+        interview_events.publish_interview({**interview, "magiclink_status": True})
         return {"message": "Magic link sent to candidate"}
 
+class BulkLinkRequest(BaseModel):
+    interview_ids: list[int]
+    force: bool = False
+
+def _magic_link_still_valid(interview: dict, now: datetime) -> bool:
+    sent_at = interview.get("magiclink_sent_at")
+    if not interview.get("magiclink_status") or not sent_at:
+        return False
+    return now - datetime.fromisoformat(sent_at) < timedelta(seconds=MAGIC_LINK_TTL_SECONDS)
+
+@router.post("/interviews/send-links", summary="Send magic links to many candidates")
+async def send_company_interview_links(
+    request: BulkLinkRequest,
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+):
+    interview_ids = list(dict.fromkeys(request.interview_ids))
+    interviews = (
+        supabase.table("interviews")
+        .select("id, candidate_email, magiclink_status, magiclink_sent_at")
+        .in_("id", interview_ids)
+        .eq("company_id", current_company.company_id)
+        .execute().data
+    ) if interview_ids else []
+    by_id = {interview["id"]: interview for interview in interviews}
+
+    now = datetime.now(timezone.utc)
+    results = {}
+    pending = []
+    for interview_id in interview_ids:
+        interview = by_id.get(interview_id)
+        if not interview:
+            results[interview_id] = {"status": "not_found"}
+        elif not interview.get("candidate_email"):
+            results[interview_id] = {"status": "failed", "detail": "Candidate has no email"}
+        elif not request.force and _magic_link_still_valid(interview, now):
+            results[interview_id] = {"status": "skipped", "detail": "Magic link still valid"}
+        else:
+            pending.append(interview)
+
+    errors = await send_magic_links([interview["candidate_email"] for interview in pending])
+    sent_ids = []
+    for interview in pending:
+        error = errors[interview["candidate_email"]]
+        if error:
+            results[interview["id"]] = {"status": "failed", "detail": error}
+        else:
+            results[interview["id"]] = {"status": "sent"}
+            sent_ids.append(interview["id"])
+
+    if sent_ids:
+        supabase.table("interviews").update({
+            "magiclink_status": True,
+            "magiclink_sent_at": now.isoformat()
+        }).in_("id", sent_ids).execute()
+        company_views.bump(current_company.company_id)
+        for interview_id in sent_ids:
+            interview_events.publish_interview({"id": interview_id, "company_id": current_company.company_id, "magiclink_status": True})
+
+    return {
+        "sent": len(sent_ids),
+        "results": [
+            {"interview_id": interview_id, "candidate_email": by_id.get(interview_id, {}).get("candidate_email"), **results[interview_id]}
+            for interview_id in interview_ids
+        ]
+    }
+
 @router.get("/interviews/{interview_id}/link-status", summary="Get company interview link")
 async def get_company_interview_link(interview_id: int, current_company: Annotated[Company, Depends(get_current_active_company)]):
     interview = supabase.table("interviews").select("*").eq("id", interview_id).execute().data[0]
     return {"magiclink_status": interview["magiclink_status"]}
 
+@router.get("/interviews/{interview_id}/recording", summary="Stream interview call recording")
+async def get_company_interview_recording(
+    interview_id: int,
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+    range_header: Annotated[str | None, Header(alias="range")] = None,
+):
+    interview = (
+        supabase.table("interviews").select("id, company_id, call_id, recording_path, recording_content_type, recording_error")
+        .eq("id", interview_id).execute().data
+    )
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    interview = interview[0]
+    if interview["company_id"] != current_company.company_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this interview")
+
+    if not interview.get("recording_path"):
+        call = await run_in_threadpool(fetch_call, interview["call_id"]) if interview.get("call_id") else None
+        queued = call is not None and (recording_archiver.submit(supabase, interview, call) or recording_archiver.pending(interview_id))
+        if not queued:
+            raise HTTPException(status_code=404, detail=interview.get("recording_error") or "No recording for this interview")
+        return ORJSONResponse({"detail": "Recording is being archived"}, status_code=202, headers={"Retry-After": "30"})
+    return await recording_response(supabase, interview, range_header)
+
+def _prepare_call_payload(interview: dict):
+    prepare_interview_call(supabase, interview)
+    if interview.get("candidate_email"):
+        candidate_sessions.bump(interview["candidate_email"])
+
 @router.post("/interviews", summary="Create company interview", response_model=InterviewBasic)
 async def create_company_interview(
     current_company: Annotated[Company, Depends(get_current_active_company)],
+    background_tasks: BackgroundTasks,
     candidate_name: Annotated[str, Form()],
     candidate_phone: Annotated[str, Form()],
     candidate_email: Annotated[str, Form()] = "",
@@ -189,20 +409,27 @@ async def create_company_interview(
     date: Annotated[date, Form()] = None,
     time: Annotated[time, Form()] = None
 ):
-    interview_data = {
-        "company_id": str(uuid.UUID(current_company.company_id)),
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "status": "Pending",
-        "candidate_name": candidate_name,
-        "candidate_email": candidate_email,
-        "candidate_phone": candidate_phone,
-        "position": position if position else None,
-        "interview_date": date.isoformat() if date else None,
-        "interview_time": time.isoformat() if time else None,
-        "vapi_workflow_id": supabase.table("roles").select("vapi_workflow_id").eq("company_id", current_company.company_id).eq("title", position).execute().data[0]["vapi_workflow_id"] if supabase.table("roles").select("vapi_workflow_id").eq("company_id", current_company.company_id).eq("title", position).execute().data else None
-    }
-    interview_result = supabase.table("interviews").insert(interview_data).execute().data
+    try:
+        candidate_phone = normalize_phone(candidate_phone, current_company.phone_country_code)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    # Insert and workflow resolution (the role with this title) run as one statement.
+    interview_result = supabase.rpc("create_interview", {
+        "p_company_id": current_company.company_id,
+        "p_candidate_name": candidate_name,
+        "p_candidate_phone": candidate_phone,
+        "p_candidate_email": candidate_email,
+        "p_position": position if position else None,
+        "p_interview_date": date.isoformat() if date else None,
+        "p_interview_time": time.isoformat() if time else None,
+    }).execute().data
     if interview_result:
+        company_views.bump(current_company.company_id)
+        if candidate_email:
+            candidate_sessions.bump(candidate_email)
+        # The call payload (workflow check included) is ready before the candidate clicks.
+        background_tasks.add_task(_prepare_call_payload, interview_result[0])
+        interview_events.publish_interview(interview_result[0])
         return InterviewBasic(**interview_result[0])
     else:
         raise HTTPException(status_code=400, detail="Failed to create interview")
@@ -210,33 +437,75 @@ async def create_company_interview(
 @router.delete("/interviews/{interview_id}", summary="Delete company interview")
 async def delete_company_interview(interview_id: int, current_company: Annotated[Company, Depends(get_current_active_company)]):
     interview = supabase.table("interviews").delete().eq("id", interview_id).execute()
+    company_views.bump(current_company.company_id)
+    for deleted in interview.data or []:
+        if deleted.get("candidate_email"):
+            candidate_sessions.bump(deleted["candidate_email"])
     if interview:
         return {"message": "Interview deleted successfully"}
     else:
         raise HTTPException(status_code=404, detail="Interview not found")
 
+def _check_workflow_template(name: str | None):
+    if name is None:
+        return
+    try:
+        get_workflow_template(name)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
 @router.get("/roles", summary="Get company roles", response_model=list[CompanyRoleOut])
-async def get_company_roles(current_company: Annotated[Company, Depends(get_current_active_company)]):
-    roles = supabase.table("roles").select("*").eq("company_id", current_company.company_id).not_.is_("vapi_workflow_id", "null").execute().data
-    return [CompanyRoleOut(**role_dict) for role_dict in roles]
+async def get_company_roles(
+    request: Request,
+    current_company: Annotated[Company, Depends(get_enabled_company)],
+):
+    def load():
+        set_company_session(current_company.company_id)
+        return supabase.table("roles").select(ROLE_COLUMNS).eq("company_id", current_company.company_id).not_.is_("vapi_workflow_id", "null").execute().data
+
+    return cached_view(request, current_company.company_id, "roles", load)
 
 @router.get("/roles/{role_id}", summary="Get company role by ID", response_model=CompanyRoleOut)
 async def get_company_role(
     role_id: int,
-    current_company: Annotated[Company, Depends(get_current_active_company)]
+    request: Request,
+    current_company: Annotated[Company, Depends(get_enabled_company)]
 ):
-    role_record = supabase.table("roles").select("*").eq("id", role_id).execute().data
+    def load():
+        set_company_session(current_company.company_id)
+        role_record = supabase.table("roles").select(f"{ROLE_COLUMNS}, company_id").eq("id", role_id).execute().data
+        if not role_record:
+            raise HTTPException(status_code=404, detail="Role not found")
+        role = role_record[0]
+        if role.pop("company_id") != current_company.company_id:
+            raise HTTPException(status_code=403, detail="Not authorized for this role")
+        return role
+
+    return cached_view(request, current_company.company_id, f"role:{role_id}", load)
+
+@router.get("/roles/{role_id}/shortlist", summary="Get ranked candidate shortlist for role")
+async def get_company_role_shortlist(
+    role_id: int,
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    recommendation: str | None = None,
+    cursor: Annotated[str | None, Query(pattern=SHORTLIST_CURSOR_PATTERN)] = None,
+):
+    role_record = supabase.table("roles").select("company_id, title").eq("id", role_id).execute().data
     if not role_record:
         raise HTTPException(status_code=404, detail="Role not found")
     if role_record[0]["company_id"] != current_company.company_id:
         raise HTTPException(status_code=403, detail="Not authorized for this role")
-    return CompanyRoleOut(**role_record[0])
+    page = await run_in_threadpool(shortlist, supabase, current_company.company_id, role_record[0]["title"], limit, offset, recommendation, cursor)
+    return {"role_id": role_id, **page}
 
 @router.post("/roles", summary="Create company role", response_model=CompanyRoleOut)
 async def create_company_role(
     current_company: Annotated[Company, Depends(get_current_active_company)],
     role: CompanyRole
 ):
+    _check_workflow_template(role.workflow_template)
     role_data = {
         "company_id": str(uuid.UUID(current_company.company_id)),
         "created_at": datetime.now(timezone.utc).isoformat(),
@@ -244,10 +513,12 @@ async def create_company_role(
         "description": role.description,
         "requirements": role.requirements,
         "department": role.department,
+        "workflow_template": role.workflow_template,
         "vapi_workflow_id": None
     }
     role_result = supabase.table("roles").insert(role_data).execute().data
     if role_result:
+        company_views.bump(current_company.company_id)
         return CompanyRoleOut(**role_result[0])
     else:
         raise HTTPException(status_code=400, detail="Failed to create role")
@@ -265,18 +536,21 @@ async def update_company_role(
         raise HTTPException(status_code=404, detail="Role not found")
     if role_record[0]["company_id"] != current_company.company_id:
         raise HTTPException(status_code=403, detail="Not authorized for this role")
+    _check_workflow_template(role.workflow_template)
 
     update_data = {
         "title": role.title,
         "description": role.description,
         "requirements": role.requirements,
         "department": role.department,
+        "workflow_template": role.workflow_template,
     }
     updated = (
         supabase.table("roles").update(update_data).eq("id", role_id).execute().data
     )
     if not updated:
         raise HTTPException(status_code=400, detail="Failed to update role")
+    company_views.bump(current_company.company_id)
     return CompanyRoleOut(**updated[0])
 
 @router.delete("/roles/{role_id}", summary="Delete company role")
@@ -294,8 +568,10 @@ async def delete_company_role(
         raise HTTPException(status_code=403, detail="Not authorized for this role")
 
     q_del_resp = supabase.table("questions").delete().eq("role_id", role_id).execute()
+    question_bank.remove_role(role_id, current_company.company_id)
 
     del_resp = supabase.table("roles").delete().eq("id", role_id).execute()
+    company_views.bump(current_company.company_id)
     if del_resp.data and len(del_resp.data) > 0:
         return {"message": "Role deleted successfully"}
     else:
@@ -304,29 +580,50 @@ async def delete_company_role(
 @router.post("/roles/{role_id}/create-workflow", summary="Create workflow for role")
 async def create_workflow_for_company_role(
     role_id: int,
+    response: Response,
     current_company: Annotated[Company, Depends(get_current_active_company)],
+    idempotency_key: Annotated[str | None, Header()] = None,
 ):
     role_record = supabase.table("roles").select("*").eq("id", role_id).execute().data
     if not role_record:
         raise HTTPException(status_code=404, detail="Role not found")
     if role_record[0]["company_id"] != current_company.company_id:
         raise HTTPException(status_code=403, detail="Not authorized for this role")
-    questions = supabase.table("questions").select("question_text").eq("role_id", role_id).execute().data
-    if not questions:
-        raise HTTPException(status_code=404, detail="Questions not found")
-    questions = [question["question_text"] for question in questions]
-    workflow = create_automated_interview_workflow(
-        questions=questions,
-        company_name=current_company.username,
-        interviewer_name="Alex",
-        name=f"{current_company.username}_{role_record[0]['title']}_Interview_Workflow",
-        voice="andrew",
-        model="gpt-4o",
-        timeout_seconds=45
+
+    async def create():
+        questions = supabase.table("questions").select("question_text").eq("role_id", role_id).execute().data
+        if not questions:
+            raise HTTPException(status_code=404, detail="Questions not found")
+        questions = [question["question_text"] for question in questions]
+        async with rate_limiter.limit("workflow", current_company.company_id):
+            try:
+                template = get_workflow_template(role_record[0].get("workflow_template"))
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=str(e))
+            workflow = template.render(
+                questions,
+                company_name=current_company.username,
+                name=f"{current_company.username}_{role_record[0]['title']}_Interview_Workflow"
+            )
+            # Broken graphs are rejected here instead of failing on a live call.
+            report = check_workflow(workflow)
+            if not report.ok:
+                raise HTTPException(status_code=422, detail={"message": "Workflow failed validation", "problems": report.problems})
+            workflow_id = await run_in_threadpool(post_workflow, workflow)
+        supabase.table("roles").update({"vapi_workflow_id": workflow_id}).eq("id", role_id).execute()
+        company_views.bump(current_company.company_id)
+        return {
+            "vapi_workflow_id": workflow_id,
+            "estimate": {
+                "turns": [report.min_turns, report.max_turns],
+                "duration_seconds": [report.min_duration_seconds, report.max_duration_seconds],
+                "cost": [report.min_cost, report.max_cost]
+            }
+        }
+
+    return await idempotent(
+        f"create-workflow:{current_company.company_id}", idempotency_key, f"role:{role_id}", create, response
     )
-    workflow_id = post_workflow(workflow)
-    supabase.table("roles").update({"vapi_workflow_id": workflow_id}).eq("id", role_id).execute()
-    return {"vapi_workflow_id": workflow_id}
 
 class QuestionBase(BaseModel):
     question_text: str
@@ -345,6 +642,7 @@ class QuestionOut(QuestionBase):
 async def create_question(
     current_company: Annotated[Company, Depends(get_current_active_company)],
     question: QuestionCreate,
+    allow_duplicate: bool = False,
 ):
     role_record = (
         supabase.table("roles").select("*").eq("id", question.role_id).execute().data
@@ -354,6 +652,15 @@ async def create_question(
     if role_record[0]["company_id"] != current_company.company_id:
         raise HTTPException(status_code=403, detail="Not authorized for this role")
 
+    if not allow_duplicate:
+        await run_in_threadpool(question_bank.warm, supabase, current_company.company_id)
+        duplicate = await run_in_threadpool(question_bank.find_duplicate, question.question_text, current_company.company_id, role_id=question.role_id)
+        if duplicate:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "A similar question already exists for this role", "duplicate": duplicate}
+            )
+
     data = {
         "created_at": datetime.now(timezone.utc).isoformat(),
         "role_id": question.role_id,
@@ -364,6 +671,8 @@ async def create_question(
     inserted = supabase.table("questions").insert(data).execute().data
     if not inserted:
         raise HTTPException(status_code=400, detail="Failed to create question")
+    company_views.bump(current_company.company_id)
+    question_bank.add(inserted[0]["id"], inserted[0]["question_text"], current_company.company_id, inserted[0]["role_id"])
     return QuestionOut(**inserted[0])
 
 @router.put("/questions/{question_id}", summary="Update question", response_model=QuestionOut)
@@ -392,6 +701,8 @@ async def update_question(
     )
     if not updated:
         raise HTTPException(status_code=400, detail="Failed to update question")
+    company_views.bump(current_company.company_id)
+    question_bank.add(question_id, updated[0]["question_text"], current_company.company_id, role_id)
     return QuestionOut(**updated[0])
 
 @router.delete("/questions/{question_id}", summary="Delete question")
@@ -410,11 +721,101 @@ async def delete_question(
         raise HTTPException(status_code=403, detail="Not authorized for this question")
 
     deleted = supabase.table("questions").delete().eq("id", question_id).execute()
+    company_views.bump(current_company.company_id)
+    question_bank.remove(question_id, current_company.company_id)
     if deleted:
         return {"message": "Question deleted successfully"}
     else:
         raise HTTPException(status_code=400, detail="Failed to delete question")
 
+@router.get("/questions/search", summary="Search the question bank")
+async def search_questions(
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+    q: Annotated[str, Query(min_length=1)],
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+):
+    await run_in_threadpool(question_bank.warm, supabase, current_company.company_id)
+    return await run_in_threadpool(question_bank.search, q, current_company.company_id, limit=limit)
+
+@router.get("/roles/{role_id}/question-suggestions", summary="Suggest existing questions for a role")
+async def suggest_role_questions(
+    role_id: int,
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+):
+    role_record = supabase.table("roles").select("*").eq("id", role_id).execute().data
+    if not role_record:
+        raise HTTPException(status_code=404, detail="Role not found")
+    if role_record[0]["company_id"] != current_company.company_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this role")
+    await run_in_threadpool(question_bank.warm, supabase, current_company.company_id)
+    role = role_record[0]
+    query = " ".join(filter(None, [role.get("title"), role.get("department"), role.get("description"), role.get("requirements")]))
+    return await run_in_threadpool(question_bank.search, query, current_company.company_id, limit=limit, exclude_role_id=role_id)
+
+@router.post("/roles/{role_id}/questions/seed", summary="Seed role questions from a text file")
+async def seed_role_questions(
+    role_id: int,
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+    file: Annotated[UploadFile, File()],
+    question_type: Annotated[str, Form()] = "general",
+    difficulty: Annotated[str, Form()] = "medium",
+):
+    role_record = supabase.table("roles").select("company_id").eq("id", role_id).execute().data
+    if not role_record:
+        raise HTTPException(status_code=404, detail="Role not found")
+    if role_record[0]["company_id"] != current_company.company_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this role")
+    await run_in_threadpool(question_bank.warm, supabase, current_company.company_id)
+
+    questions = parse_question_file((await file.read()).decode("utf-8-sig"))
+    rows, skipped, pending = [], [], []
+    # Unique per request, so concurrent seeds of the same role don't replace or remove each other's pending rows.
+    batch = uuid.uuid4().hex
+    try:
+        for question_text in questions:
+            duplicate = await run_in_threadpool(question_bank.find_duplicate, question_text, current_company.company_id, role_id=role_id)
+            if duplicate:
+                skipped.append({"question_text": question_text, "duplicate": duplicate})
+                continue
+            # Index pending rows too so near-duplicates within the same file are caught.
+            pending.append(f"pending:{batch}:{len(rows)}")
+            question_bank.add(pending[-1], question_text, current_company.company_id, role_id)
+            rows.append({
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "role_id": role_id,
+                "question_text": question_text,
+                "question_type": question_type,
+                "difficulty": difficulty,
+            })
+        inserted = supabase.table("questions").insert(rows).execute().data if rows else []
+    finally:
+        for key in pending:
+            question_bank.remove(key)
+    if inserted:
+        company_views.bump(current_company.company_id)
+    for row in inserted:
+        question_bank.add(row["id"], row["question_text"], current_company.company_id, role_id)
+    return {"inserted": [QuestionOut(**row) for row in inserted], "skipped": skipped}
+
+def _gradable_transcript(transcript: str | None) -> str:
+    # Nothing is stored for these, so the reconciler still picks the interview up later.
+    if transcript == TRANSCRIPT_UNAVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="The call's transcript could not be retrieved yet; it will be graded once it is",
+            headers={"Retry-After": "60"},
+        )
+    if not transcript:
+        raise HTTPException(status_code=409, detail="The interview has no transcript to grade")
+    return transcript
+
+def _grade(transcript: str, *rubric, backend: str | None) -> dict:
+    try:
+        return evaluate(transcript, *rubric, backend=backend)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
 @router.get("/interviews/{interview_id}/evaluate-transcript", summary="Evaluate interview transcript")
 async def evaluate_interview_transcript(
     interview_id: int,
@@ -425,14 +826,228 @@ async def evaluate_interview_transcript(
         raise HTTPException(status_code=404, detail="Interview not found")
     
     interview_data = interview[0]
+    if interview_data["company_id"] != current_company.company_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this interview")
     evaluation = interview_data.get("ai_evaluation")
     
     if not evaluation:
-        transcript = retrive_transcript(interview_data["call_id"])
-        supabase.table("interviews").update({"transcript": transcript}).eq("id", interview_id).execute()
-        evaluation = grade_transcript(transcript)
-        supabase.table("interviews").update({"ai_evaluation": json.loads(evaluation)}).eq("id", interview_id).execute()
+        async with rate_limiter.limit("evaluation", current_company.company_id):
+            transcript = _gradable_transcript(await run_in_threadpool(ingest_call, supabase, interview_data))
+            result = await run_in_threadpool(_grade, transcript, backend=current_company.grading_backend)
+        await run_in_threadpool(record_evaluation, supabase, interview_data, result)
+        evaluation = result["scores"]
+        usage = result["usage"]
     else:
         transcript = interview_data.get("transcript", "")
+        usage = interview_data.get("evaluation_usage")
     
-    return {"transcript": transcript, "evaluation": evaluation}
+    return {"transcript": transcript, "evaluation": evaluation, "usage": usage}
+
+@router.get("/interviews/{interview_id}/evaluate-transcript/stream", summary="Stream interview transcript evaluation")
+async def stream_interview_transcript_evaluation(
+    interview_id: int,
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+):
+    interview = supabase.table("interviews").select("*").eq("id", interview_id).execute().data
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    interview_data = interview[0]
+    if interview_data["company_id"] != current_company.company_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this interview")
+    if not interview_data.get("ai_evaluation"):
+        rate_limiter.check("evaluation", current_company.company_id)
+
+    async def event_stream():
+        total_fields = len(get_rubric().schema.model_fields)
+        yield _sse("status", {"stage": "started"})
+
+        evaluation = interview_data.get("ai_evaluation")
+        if evaluation:
+            yield _sse("result", {
+                "transcript": interview_data.get("transcript", ""),
+                "evaluation": evaluation,
+                "usage": interview_data.get("evaluation_usage")
+            })
+            return
+
+        try:
+            # The slot is held inside the stream because grading happens after the response starts.
+            async with rate_limiter.slot("evaluation", current_company.company_id):
+                yield _sse("status", {"stage": "retrieving_transcript"})
+                transcript = _gradable_transcript(await run_in_threadpool(ingest_call, supabase, interview_data))
+
+                yield _sse("status", {"stage": "grading"})
+                completed = 0
+                async for kind, payload in astream_evaluate(transcript, backend=current_company.grading_backend):
+                    if kind == "partial":
+                        completed += len(payload)
+                        yield _sse("scores", payload)
+                        yield _sse("progress", {"completed": completed, "total": total_fields})
+                    else:
+                        result = payload
+
+            await run_in_threadpool(record_evaluation, supabase, interview_data, result)
+            yield _sse("result", {
+                "transcript": transcript,
+                "evaluation": result["scores"],
+                "usage": result["usage"]
+            })
+        except HTTPException as e:
+            yield _sse("error", {"detail": e.detail, "status": e.status_code})
+        except ValueError as e:
+            yield _sse("error", {"detail": str(e), "status": 422})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/rubrics", summary="List evaluation rubrics")
+async def get_evaluation_rubrics(current_company: Annotated[Company, Depends(get_current_active_company)]):
+    return [
+        {
+            "name": rubric.name,
+            "version": rubric.version,
+            "fields": list(rubric.schema.model_fields)
+        }
+        for rubric in list_rubrics()
+    ]
+
+@router.get("/grading-backends", summary="List grading backends")
+async def get_grading_backends(current_company: Annotated[Company, Depends(get_current_active_company)]):
+    return {
+        "backends": list_grading_backends(),
+        "default": DEFAULT_GRADING_BACKEND,
+        "selected": current_company.grading_backend,
+    }
+
+@router.put("/grading-backend", summary="Choose the grading backend for this company")
+async def set_grading_backend(
+    selection: GradingBackendSelection,
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+):
+    if selection.grading_backend is not None:
+        try:
+            get_grading_backend(selection.grading_backend)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    supabase.table("company").update({"grading_backend": selection.grading_backend}).eq("company_id", current_company.company_id).execute()
+    get_cache().delete(f"company:{current_company.username}")
+    return {"grading_backend": selection.grading_backend or DEFAULT_GRADING_BACKEND}
+
+@router.put("/phone-country-code", summary="Set the country code for candidate numbers entered without one")
+async def set_phone_country_code(
+    selection: PhoneCountrySelection,
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+):
+    supabase.table("company").update({"phone_country_code": selection.phone_country_code}).eq("company_id", current_company.company_id).execute()
+    get_cache().delete(f"company:{current_company.username}")
+    return {"phone_country_code": selection.phone_country_code}
+
+@router.get("/workflow-templates", summary="List interview workflow templates")
+async def get_workflow_templates(current_company: Annotated[Company, Depends(get_current_active_company)]):
+    return [
+        {
+            "name": template.name,
+            "description": template.description,
+            "variables": template.variables
+        }
+        for template in list_workflow_templates()
+    ]
+
+@router.get("/interviews/{interview_id}/evaluations", summary="Get interview evaluations for every rubric")
+async def get_interview_evaluations(
+    interview_id: int,
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+):
+    interview = supabase.table("interviews").select("company_id").eq("id", interview_id).execute().data
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    if interview[0]["company_id"] != current_company.company_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this interview")
+    return supabase.table("evaluations").select("*").eq("interview_id", interview_id).order("created_at").execute().data
+
+@router.post("/interviews/{interview_id}/regrade", summary="Grade interview transcript with a specific rubric")
+async def regrade_interview_transcript(
+    interview_id: int,
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+    rubric: str | None = None,
+    version: int | None = None,
+    force: bool = False,
+):
+    try:
+        selected = get_rubric(rubric, version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    interview = supabase.table("interviews").select("*").eq("id", interview_id).execute().data
+    if not interview:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    interview_data = interview[0]
+    if interview_data["company_id"] != current_company.company_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this interview")
+
+    existing = (
+        supabase.table("evaluations").select("*")
+        .eq("interview_id", interview_id).eq("rubric", selected.name).eq("rubric_version", selected.version)
+        .execute().data
+    )
+    if existing and not force:
+        return existing[0]
+
+    async with rate_limiter.limit("evaluation", current_company.company_id):
+        transcript = interview_data.get("transcript")
+        if not transcript or transcript == TRANSCRIPT_UNAVAILABLE:
+            transcript = await run_in_threadpool(ingest_call, supabase, interview_data)
+        transcript = _gradable_transcript(transcript)
+        result = await run_in_threadpool(_grade, transcript, selected.name, selected.version, backend=current_company.grading_backend)
+    # Only the latest default rubric replaces ai_evaluation; other rubrics are kept for comparison.
+    await run_in_threadpool(record_evaluation, supabase, interview_data, result, make_current=selected is get_rubric())
+    return evaluation_row(interview_id, result)
+
+@router.get("/analytics", summary="Get evaluation score analytics")
+async def get_evaluation_analytics(
+    current_company: Annotated[Company, Depends(get_current_active_company)],
+    position: str | None = None,
+    start_date: date | None = None,
+    end_date: date | None = None,
+):
+    rows = await run_in_threadpool(load_evaluation_histograms, supabase, current_company.company_id, position, start_date, end_date)
+    return evaluation_summary(rows)
+
+@router.get("/costs", summary="Get call and grading costs by role")
+async def get_company_costs(
+    request: Request,
+    current_company: Annotated[Company, Depends(get_enabled_company)],
+    start_date: date | None = None,
+    end_date: date | None = None,
+):
+    def load():
+        set_company_session(current_company.company_id)
+        rows = load_cost_rollups(supabase, current_company.company_id, start_date, end_date)
+        return cost_report(rows, "position")
+
+    return cached_view(request, current_company.company_id, f"costs:{start_date}:{end_date}", load)
+
+@router.get("/roles/{role_id}/costs", summary="Get daily call and grading costs for role")
+async def get_company_role_costs(
+    role_id: int,
+    request: Request,
+    current_company: Annotated[Company, Depends(get_enabled_company)],
+    start_date: date | None = None,
+    end_date: date | None = None,
+):
+    def load():
+        set_company_session(current_company.company_id)
+        role_record = supabase.table("roles").select("company_id, title").eq("id", role_id).execute().data
+        if not role_record:
+            raise HTTPException(status_code=404, detail="Role not found")
+        if role_record[0]["company_id"] != current_company.company_id:
+            raise HTTPException(status_code=403, detail="Not authorized for this role")
+        rows = load_cost_rollups(supabase, current_company.company_id, start_date, end_date, position=role_record[0]["title"])
+        return {"role_id": role_id, **cost_report(rows, "day")}
+
+    return cached_view(request, current_company.company_id, f"role-costs:{role_id}:{start_date}:{end_date}", load)
@@ -0,0 +1,61 @@
+-- Baseline schema as the API uses it. Written with IF NOT EXISTS so it is a no-op on the
+-- existing project database and creates everything on a fresh local Postgres.
+
+create table if not exists public.company (
+    id bigint generated by default as identity primary key,
+    created_at timestamptz not null default now(),
+    company_id uuid not null default gen_random_uuid(),
+    username text not null,
+    email text not null,
+    hashed_password text not null,
+    disabled boolean not null default false,
+    constraint company_company_id_key unique (company_id),
+    constraint company_username_key unique (username)
+);
+
+create table if not exists public.roles (
+    id bigint generated by default as identity primary key,
+    created_at timestamptz not null default now(),
+    company_id uuid not null references public.company (company_id) on delete cascade,
+    title text not null,
+    department text,
+    description text,
+    requirements text,
+    vapi_workflow_id text
+);
+
+create table if not exists public.questions (
+    id bigint generated by default as identity primary key,
+    created_at timestamptz not null default now(),
+    role_id bigint not null references public.roles (id) on delete cascade,
+    question_text text not null,
+    question_type text,
+    difficulty text
+);
+
+create table if not exists public.interviews (
+    id bigint generated by default as identity primary key,
+    created_at timestamptz not null default now(),
+    company_id uuid not null references public.company (company_id) on delete cascade,
+    candidate_name text not null,
+    candidate_email text,
+    candidate_phone text not null,
+    position text,
+    status text not null default 'Pending',
+    interview_date date,
+    interview_time time,
+    call_id text,
+    transcript text,
+    ai_evaluation jsonb,
+    vapi_workflow_id text,
+    candidate_auth uuid,
+    magiclink_status boolean not null default false
+);
+
+-- Called by the company auth dependency before it queries on the company's behalf.
+create or replace function public.set_company_session(company_id uuid)
+returns void
+language sql
+as $$
+    select set_config('app.company_id', company_id::text, false);
+$$;
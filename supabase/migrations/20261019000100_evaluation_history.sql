@@ -0,0 +1,20 @@
+-- Columns written by the evaluation engine and magic-link sending, and the per-rubric
+-- evaluation history (helper/evaluation/engine.py: store_evaluation).
+
+alter table public.interviews
+    add column if not exists magiclink_sent_at timestamptz,
+    add column if not exists evaluation_usage jsonb,
+    add column if not exists evaluation_rubric text,
+    add column if not exists evaluation_rubric_version integer;
+
+create table if not exists public.evaluations (
+    id bigint generated by default as identity primary key,
+    created_at timestamptz not null default now(),
+    interview_id bigint not null references public.interviews (id) on delete cascade,
+    rubric text not null,
+    rubric_version integer not null check (rubric_version > 0),
+    scores jsonb not null,
+    usage jsonb,
+    -- Target of the upsert's on_conflict; also serves lookups by interview.
+    constraint evaluations_interview_rubric_version_key unique (interview_id, rubric, rubric_version)
+);
@@ -0,0 +1,29 @@
+-- Indexes for every lookup the API makes (see db_functions/explain_audit.py, which checks
+-- that none of them falls back to a sequential scan). Primary keys and the unique
+-- constraints above already cover interviews.id, roles.id, questions.id,
+-- company.username and company.company_id.
+
+-- Company interview lists and keyset pagination (where company_id = ? and id > ? order by id).
+create index if not exists interviews_company_id_id_idx
+    on public.interviews (company_id, id);
+
+-- Analytics and shortlist warm-up only read graded interviews.
+create index if not exists interviews_company_id_id_evaluated_idx
+    on public.interviews (company_id, id)
+    where ai_evaluation is not null;
+
+-- Candidate authentication and call creation look interviews up by email.
+create index if not exists interviews_candidate_email_idx
+    on public.interviews (candidate_email);
+
+-- Role listing per company and workflow resolution by (company_id, title).
+create index if not exists roles_company_id_title_idx
+    on public.roles (company_id, title);
+
+-- Questions per role, including the question bank's keyset warm-up (role_id in (...) and id > ?).
+create index if not exists questions_role_id_id_idx
+    on public.questions (role_id, id);
+
+-- Evaluation history per interview, ordered by creation.
+create index if not exists evaluations_interview_id_created_at_idx
+    on public.evaluations (interview_id, created_at);
@@ -0,0 +1,54 @@
+-- Single-round-trip write paths for interviews, called through supabase.rpc.
+
+-- Creates an interview and resolves its workflow from the company's role with the same
+-- title in the same statement.
+create or replace function public.create_interview(
+    p_company_id uuid,
+    p_candidate_name text,
+    p_candidate_phone text,
+    p_candidate_email text default null,
+    p_position text default null,
+    p_interview_date date default null,
+    p_interview_time time default null
+)
+returns setof public.interviews
+language sql
+as $$
+    insert into public.interviews (
+        company_id, status, candidate_name, candidate_email, candidate_phone,
+        position, interview_date, interview_time, vapi_workflow_id
+    )
+    values (
+        p_company_id, 'Pending', p_candidate_name, p_candidate_email, p_candidate_phone,
+        p_position, p_interview_date, p_interview_time,
+        (
+            select r.vapi_workflow_id from public.roles r
+            where r.company_id = p_company_id and r.title = p_position
+            order by r.id
+            limit 1
+        )
+    )
+    returning *;
+$$;
+
+-- Candidate-side state change for one interview. Null arguments leave the column as is.
+-- When p_from_status is given the update only applies if the interview is currently in
+-- one of those statuses; no row is returned otherwise.
+create or replace function public.transition_interview(
+    p_interview_id bigint,
+    p_status text default null,
+    p_call_id text default null,
+    p_candidate_auth uuid default null,
+    p_from_status text[] default null
+)
+returns setof public.interviews
+language sql
+as $$
+    update public.interviews
+    set status = coalesce(p_status, status),
+        call_id = coalesce(p_call_id, call_id),
+        candidate_auth = coalesce(p_candidate_auth, candidate_auth)
+    where id = p_interview_id
+      and (p_from_status is null or status = any(p_from_status))
+    returning *;
+$$;
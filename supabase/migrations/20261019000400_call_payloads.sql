@@ -0,0 +1,50 @@
+-- Call payloads are validated and built when an interview is created, so placing the call
+-- only has to enqueue them. call_status tracks the asynchronous dispatch:
+-- queued -> placed (Vapi accepted the call) | failed; the reconciler may later set ended.
+
+alter table public.interviews
+    add column if not exists call_payload jsonb,
+    add column if not exists call_payload_error text,
+    add column if not exists call_status text,
+    add column if not exists call_error text,
+    add column if not exists call_queued_at timestamptz;
+
+drop function if exists public.transition_interview(bigint, text, text, uuid, text[]);
+
+create or replace function public.transition_interview(
+    p_interview_id bigint,
+    p_status text default null,
+    p_call_id text default null,
+    p_candidate_auth uuid default null,
+    p_from_status text[] default null,
+    p_call_status text default null,
+    p_call_error text default null
+)
+returns setof public.interviews
+language sql
+as $$
+    update public.interviews
+    set status = coalesce(p_status, status),
+        call_id = coalesce(p_call_id, call_id),
+        candidate_auth = coalesce(p_candidate_auth, candidate_auth),
+        call_status = coalesce(p_call_status, call_status),
+        call_error = coalesce(p_call_error, call_error)
+    where id = p_interview_id
+      and (p_from_status is null or status = any(p_from_status))
+    returning *;
+$$;
+
+-- Claims the interview for a new call. Returns no row while another call is queued or
+-- placed, which keeps concurrent clicks from dialling twice.
+create or replace function public.queue_call(p_interview_id bigint)
+returns setof public.interviews
+language sql
+as $$
+    update public.interviews
+    set call_status = 'queued',
+        call_error = null,
+        call_queued_at = now()
+    where id = p_interview_id
+      and (call_status is null or call_status in ('failed', 'ended'))
+    returning *;
+$$;
@@ -0,0 +1,5 @@
+-- Workflow template (public/workflow_templates/<name>.json) each role's Vapi workflow is
+-- compiled from; null uses the default template.
+
+alter table public.roles
+    add column if not exists workflow_template text;
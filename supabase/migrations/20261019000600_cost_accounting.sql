@@ -0,0 +1,161 @@
+-- Per-interview call and grading spend, and cost_rollups: running totals per company,
+-- position (role title) and day, kept current by triggers so cost reports read a handful
+-- of rollup rows instead of scanning interviews.
+--
+-- Call figures are copied from the Vapi call object when its transcript is fetched
+-- (helper/company/transcript.py: ingest_call). Grading spend accumulates on the interview
+-- from every evaluation written, including regrades that overwrite an earlier row.
+
+alter table public.interviews
+    add column if not exists call_duration_seconds numeric,
+    add column if not exists call_cost numeric,
+    add column if not exists call_cost_breakdown jsonb,
+    add column if not exists call_ended_reason text;
+
+do $$
+begin
+    if not exists (
+        select 1 from information_schema.columns
+        where table_schema = 'public' and table_name = 'interviews' and column_name = 'grading_runs'
+    ) then
+        alter table public.interviews
+            add column grading_runs integer not null default 0,
+            add column grading_input_tokens bigint not null default 0,
+            add column grading_cached_input_tokens bigint not null default 0,
+            add column grading_output_tokens bigint not null default 0,
+            add column grading_cost numeric not null default 0;
+
+        -- One-time backfill from the evaluations kept so far.
+        update public.interviews i
+        set grading_runs = e.runs,
+            grading_input_tokens = e.input_tokens,
+            grading_cached_input_tokens = e.cached_input_tokens,
+            grading_output_tokens = e.output_tokens,
+            grading_cost = e.cost
+        from (
+            select interview_id,
+                   count(*) as runs,
+                   coalesce(sum((usage->>'input_tokens')::bigint), 0) as input_tokens,
+                   coalesce(sum((usage->>'cached_input_tokens')::bigint), 0) as cached_input_tokens,
+                   coalesce(sum((usage->>'output_tokens')::bigint), 0) as output_tokens,
+                   coalesce(sum((usage->>'cost_usd')::numeric), 0) as cost
+            from public.evaluations
+            group by interview_id
+        ) e
+        where e.interview_id = i.id;
+    end if;
+end $$;
+
+create table if not exists public.cost_rollups (
+    company_id uuid not null references public.company (company_id) on delete cascade,
+    position text not null,
+    day date not null,
+    calls integer not null default 0,
+    call_seconds numeric not null default 0,
+    call_cost numeric not null default 0,
+    grading_runs integer not null default 0,
+    grading_input_tokens bigint not null default 0,
+    grading_cached_input_tokens bigint not null default 0,
+    grading_output_tokens bigint not null default 0,
+    grading_cost numeric not null default 0,
+    primary key (company_id, position, day)
+);
+
+-- Adds (p_sign 1) or removes (-1) one interview's contribution to its rollup row.
+create or replace function public.apply_cost_rollup(p_interview public.interviews, p_sign integer)
+returns void
+language plpgsql
+as $$
+begin
+    if p_interview.call_cost is null and p_interview.call_duration_seconds is null and p_interview.grading_runs = 0 then
+        return;
+    end if;
+    insert into public.cost_rollups as r (
+        company_id, position, day, calls, call_seconds, call_cost, grading_runs,
+        grading_input_tokens, grading_cached_input_tokens, grading_output_tokens, grading_cost
+    ) values (
+        p_interview.company_id,
+        coalesce(p_interview.position, ''),
+        coalesce(p_interview.interview_date, p_interview.created_at::date),
+        p_sign * (p_interview.call_cost is not null or p_interview.call_duration_seconds is not null)::integer,
+        p_sign * coalesce(p_interview.call_duration_seconds, 0),
+        p_sign * coalesce(p_interview.call_cost, 0),
+        p_sign * p_interview.grading_runs,
+        p_sign * p_interview.grading_input_tokens,
+        p_sign * p_interview.grading_cached_input_tokens,
+        p_sign * p_interview.grading_output_tokens,
+        p_sign * p_interview.grading_cost
+    )
+    on conflict (company_id, position, day) do update set
+        calls = r.calls + excluded.calls,
+        call_seconds = r.call_seconds + excluded.call_seconds,
+        call_cost = r.call_cost + excluded.call_cost,
+        grading_runs = r.grading_runs + excluded.grading_runs,
+        grading_input_tokens = r.grading_input_tokens + excluded.grading_input_tokens,
+        grading_cached_input_tokens = r.grading_cached_input_tokens + excluded.grading_cached_input_tokens,
+        grading_output_tokens = r.grading_output_tokens + excluded.grading_output_tokens,
+        grading_cost = r.grading_cost + excluded.grading_cost;
+end;
+$$;
+
+create or replace function public.rollup_interview_costs()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op = 'UPDATE'
+       and (old.company_id, old.position, old.interview_date, old.created_at, old.call_duration_seconds, old.call_cost,
+            old.grading_runs, old.grading_input_tokens, old.grading_cached_input_tokens, old.grading_output_tokens, old.grading_cost)
+       is not distinct from
+           (new.company_id, new.position, new.interview_date, new.created_at, new.call_duration_seconds, new.call_cost,
+            new.grading_runs, new.grading_input_tokens, new.grading_cached_input_tokens, new.grading_output_tokens, new.grading_cost) then
+        return null;
+    end if;
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform public.apply_cost_rollup(old, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.apply_cost_rollup(new, 1);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists interviews_cost_rollup on public.interviews;
+create trigger interviews_cost_rollup
+    after insert or delete or update of company_id, position, interview_date, created_at, call_duration_seconds, call_cost,
+        grading_runs, grading_input_tokens, grading_cached_input_tokens, grading_output_tokens, grading_cost
+    on public.interviews
+    for each row execute function public.rollup_interview_costs();
+
+create or replace function public.accumulate_grading_usage()
+returns trigger
+language plpgsql
+as $$
+begin
+    if new.usage is null then
+        return null;
+    end if;
+    update public.interviews
+    set grading_runs = grading_runs + 1,
+        grading_input_tokens = grading_input_tokens + coalesce((new.usage->>'input_tokens')::bigint, 0),
+        grading_cached_input_tokens = grading_cached_input_tokens + coalesce((new.usage->>'cached_input_tokens')::bigint, 0),
+        grading_output_tokens = grading_output_tokens + coalesce((new.usage->>'output_tokens')::bigint, 0),
+        grading_cost = grading_cost + coalesce((new.usage->>'cost_usd')::numeric, 0)
+    where id = new.interview_id;
+    return null;
+end;
+$$;
+
+drop trigger if exists evaluations_grading_usage on public.evaluations;
+create trigger evaluations_grading_usage
+    after insert or update of usage on public.evaluations
+    for each row execute function public.accumulate_grading_usage();
+
+-- Rebuilt from interviews on every run of this migration; the triggers keep it current after.
+do $$
+begin
+    lock table public.cost_rollups in exclusive mode;
+    delete from public.cost_rollups;
+    perform public.apply_cost_rollup(i, 1) from public.interviews i;
+end $$;
@@ -0,0 +1,9 @@
+-- Where each interview's call recording was archived (helper/company/recordings.py):
+-- a path in RECORDINGS_DIR or the RECORDINGS_BUCKET storage bucket.
+
+alter table public.interviews
+    add column if not exists recording_path text,
+    add column if not exists recording_content_type text,
+    add column if not exists recording_size bigint,
+    add column if not exists recording_archived_at timestamptz,
+    add column if not exists recording_error text;
@@ -0,0 +1,5 @@
+-- Grading backend each company's transcripts are graded with (helper/evaluation/engine.py:
+-- openai or the local heuristic); null uses the deployment default, GRADING_BACKEND.
+
+alter table public.company
+    add column if not exists grading_backend text;
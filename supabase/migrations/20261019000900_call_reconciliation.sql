@@ -0,0 +1,39 @@
+-- Call state for the reconciler (helper/company/reconcile.py). call_status now runs
+-- queued -> placed -> ended (the interview is Completed) | failed (never placed, never
+-- answered or lost at Vapi; the candidate may call again), and the interview status is
+-- In Progress while a call is placed rather than Completed as soon as it is dialled.
+
+alter table public.interviews
+    add column if not exists call_sync_attempts integer not null default 0;
+
+-- The reconciler pages through interviews by call state (where call_status = ? and id > ? order by id).
+create index if not exists interviews_call_status_id_idx
+    on public.interviews (call_status, id);
+
+-- ... and through ended calls still waiting to be graded.
+create index if not exists interviews_call_status_id_ungraded_idx
+    on public.interviews (call_status, id)
+    where ai_evaluation is null;
+
+create or replace function public.queue_call(p_interview_id bigint)
+returns setof public.interviews
+language sql
+as $$
+    update public.interviews
+    set call_status = 'queued',
+        call_error = null,
+        call_queued_at = now(),
+        call_sync_attempts = 0
+    where id = p_interview_id
+      and (call_status is null or call_status in ('failed', 'ended'))
+    returning *;
+$$;
+
+-- Calls placed before call_status existed: settled if their transcript was stored, otherwise
+-- left for the reconciler to fetch again.
+update public.interviews
+set call_status = case
+        when transcript is not null and transcript <> 'Failed to retrieve transcript' then 'ended'
+        else 'placed'
+    end
+where call_id is not null and call_status is null;
@@ -0,0 +1,11 @@
+-- Calling code each company's candidate numbers are read in when entered without one
+-- (helper/candidate/create_call.py normalize_phone); null requires a leading + instead of
+-- assuming a country.
+
+alter table public.company
+    add column if not exists phone_country_code text;
+
+alter table public.company
+    drop constraint if exists company_phone_country_code_check;
+alter table public.company
+    add constraint company_phone_country_code_check check (phone_country_code ~ '^[1-9][0-9]{0,2}$');
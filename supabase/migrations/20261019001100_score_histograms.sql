@@ -0,0 +1,127 @@
+-- Evaluation analytics rollups. Triggers keep score_histograms (interviews per company,
+-- position, day, score category and score) and recommendation_rollups current from
+-- interviews.ai_evaluation, the same way cost_rollups is kept. Scores are integers in 0-100,
+-- so the histogram gives exact averages and percentiles. An analytics request adds up the
+-- rows for its range in one evaluation_histograms call. Rows are never copied into the API
+-- workers.
+--
+-- Only evaluations with an overall_score are counted. Keys ending in _score count when they
+-- are numeric; they are truncated and clamped to 0-100. A null position counts as
+-- 'Unspecified'.
+
+create table if not exists public.score_histograms (
+    company_id uuid not null references public.company (company_id) on delete cascade,
+    position text not null,
+    day date not null,
+    field text not null,
+    score smallint not null,
+    interviews integer not null default 0,
+    primary key (company_id, position, day, field, score)
+);
+
+create table if not exists public.recommendation_rollups (
+    company_id uuid not null references public.company (company_id) on delete cascade,
+    position text not null,
+    day date not null,
+    recommendation text not null,
+    interviews integer not null default 0,
+    primary key (company_id, position, day, recommendation)
+);
+
+-- Adds (p_sign 1) or removes (-1) one interview's evaluation from its rollup rows.
+create or replace function public.apply_evaluation_rollup(p_interview public.interviews, p_sign integer)
+returns void
+language plpgsql
+as $$
+declare
+    v_position text := coalesce(p_interview.position, 'Unspecified');
+    v_day date := coalesce(p_interview.interview_date, p_interview.created_at::date);
+begin
+    if jsonb_typeof(p_interview.ai_evaluation) is distinct from 'object' or not p_interview.ai_evaluation ? 'overall_score' then
+        return;
+    end if;
+    insert into public.score_histograms as h (company_id, position, day, field, score, interviews)
+    select p_interview.company_id, v_position, v_day, s.key,
+           least(greatest(trunc((s.value #>> '{}')::numeric), 0), 100)::smallint, p_sign
+    from jsonb_each(p_interview.ai_evaluation) s
+    where s.key like '%\_score' and (s.value #>> '{}') ~ '^-?[0-9]+(\.[0-9]+)?$'
+    on conflict (company_id, position, day, field, score) do update set
+        interviews = h.interviews + excluded.interviews;
+
+    insert into public.recommendation_rollups as r (company_id, position, day, recommendation, interviews)
+    values (
+        p_interview.company_id, v_position, v_day,
+        coalesce(nullif(p_interview.ai_evaluation->>'recommendation', ''), 'Unknown'), p_sign
+    )
+    on conflict (company_id, position, day, recommendation) do update set
+        interviews = r.interviews + excluded.interviews;
+end;
+$$;
+
+create or replace function public.rollup_interview_evaluations()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op = 'UPDATE'
+       and (old.company_id, old.position, old.interview_date, old.created_at, old.ai_evaluation)
+       is not distinct from
+           (new.company_id, new.position, new.interview_date, new.created_at, new.ai_evaluation) then
+        return null;
+    end if;
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform public.apply_evaluation_rollup(old, -1);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.apply_evaluation_rollup(new, 1);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists interviews_evaluation_rollup on public.interviews;
+create trigger interviews_evaluation_rollup
+    after insert or delete or update of company_id, position, interview_date, created_at, ai_evaluation
+    on public.interviews
+    for each row execute function public.rollup_interview_evaluations();
+
+-- A company's histograms summed over a day range (inclusive; null bounds are open) and
+-- optionally one position: score rows carry field and score, recommendation rows carry
+-- recommendation. At most positions x (categories x 101 + recommendations) rows.
+create or replace function public.evaluation_histograms(
+    p_company_id uuid,
+    p_position text default null,
+    p_start date default null,
+    p_end date default null
+)
+returns table ("position" text, field text, score smallint, recommendation text, interviews bigint)
+language sql
+stable
+as $$
+    select h.position, h.field, h.score, null::text, sum(h.interviews)
+    from public.score_histograms h
+    where h.company_id = p_company_id
+      and (p_position is null or h.position = p_position)
+      and (p_start is null or h.day >= p_start)
+      and (p_end is null or h.day <= p_end)
+    group by h.position, h.field, h.score
+    having sum(h.interviews) > 0
+    union all
+    select r.position, null, null, r.recommendation, sum(r.interviews)
+    from public.recommendation_rollups r
+    where r.company_id = p_company_id
+      and (p_position is null or r.position = p_position)
+      and (p_start is null or r.day >= p_start)
+      and (p_end is null or r.day <= p_end)
+    group by r.position, r.recommendation
+    having sum(r.interviews) > 0;
+$$;
+
+-- Rebuilt from interviews on every run of this migration; the trigger keeps them current after.
+do $$
+begin
+    lock table public.score_histograms, public.recommendation_rollups in exclusive mode;
+    delete from public.score_histograms;
+    delete from public.recommendation_rollups;
+    perform public.apply_evaluation_rollup(i, 1) from public.interviews i where i.ai_evaluation is not null;
+end $$;
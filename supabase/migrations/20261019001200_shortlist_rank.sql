@@ -0,0 +1,45 @@
+-- Shortlist ordering as indexed columns on interviews, so a role's shortlist is read a page
+-- at a time straight from an index (helper/company/ranking.py) instead of being loaded
+-- and sorted in every API worker.
+--
+-- shortlist_rank packs the tie-breakers (overall, technical, problem solving and
+-- communication score, each truncated and clamped to 0-100, missing or non-numeric as 0)
+-- into one integer in base 101, so ordering by shortlist_rank desc, id is the ranking.
+-- It is null for interviews without a graded ai_evaluation (no overall_score).
+-- ai_recommendation copies the evaluation's recommendation for the filtered shortlist.
+-- Adding the stored columns rewrites interviews once.
+--
+-- Analytics and the shortlist no longer read interviews_company_id_id_evaluated_idx
+-- (query_indexes migration); it is kept for exports restricted to graded interviews
+-- (evaluated_only).
+
+create or replace function public.evaluation_score(p_scores jsonb, p_field text)
+returns integer
+language sql
+immutable
+as $$
+    select case
+        when (p_scores->>p_field) ~ '^-?[0-9]+(\.[0-9]+)?$'
+            then least(greatest(trunc((p_scores->>p_field)::numeric), 0), 100)::integer
+        else 0
+    end;
+$$;
+
+alter table public.interviews
+    add column if not exists shortlist_rank integer generated always as (
+        case when jsonb_typeof(ai_evaluation) = 'object' and ai_evaluation ? 'overall_score' then
+            public.evaluation_score(ai_evaluation, 'overall_score') * 1030301
+            + public.evaluation_score(ai_evaluation, 'technical_score') * 10201
+            + public.evaluation_score(ai_evaluation, 'problem_solving_score') * 101
+            + public.evaluation_score(ai_evaluation, 'communication_score')
+        end
+    ) stored,
+    add column if not exists ai_recommendation text generated always as (ai_evaluation->>'recommendation') stored;
+
+-- A role's shortlist, and the same filtered by recommendation, in rank order.
+create index if not exists interviews_shortlist_idx
+    on public.interviews (company_id, position, shortlist_rank desc, id)
+    where shortlist_rank is not null;
+create index if not exists interviews_shortlist_recommendation_idx
+    on public.interviews (company_id, position, ai_recommendation, shortlist_rank desc, id)
+    where shortlist_rank is not null;
@@ -0,0 +1,14 @@
+-- Why an ended call could not be graded (its transcript could not be retrieved, or the
+-- candidate never answered). The reconciler (helper/company/reconcile.py) records it instead
+-- of retrying on every pass; storing a newly fetched transcript clears it
+-- (helper/company/transcript.py: ingest_call).
+
+alter table public.interviews
+    add column if not exists evaluation_error text;
+
+-- Ended calls still waiting to be graded, without those given up on.
+create index if not exists interviews_call_status_id_gradable_idx
+    on public.interviews (call_status, id)
+    where ai_evaluation is null and evaluation_error is null;
+
+drop index if exists public.interviews_call_status_id_ungraded_idx;
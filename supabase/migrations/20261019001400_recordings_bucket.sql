@@ -0,0 +1,13 @@
+-- Private Supabase Storage bucket for call recordings when RECORDINGS_BACKEND=supabase
+-- (helper/company/recordings.py; the name must match RECORDINGS_BUCKET). The API uploads
+-- and signs URLs with the service key, so the bucket needs no policies. Skipped on
+-- databases without Supabase Storage.
+
+do $$
+begin
+    if to_regclass('storage.buckets') is not null then
+        insert into storage.buckets (id, name, public)
+        values ('recordings', 'recordings', false)
+        on conflict (id) do nothing;
+    end if;
+end $$;
@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.cache import reset_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    """Every test starts from an empty process-local cache."""
+    monkeypatch.delenv("CACHE_URL", raising=False)
+    reset_cache()
+    yield
+    reset_cache()
@@ -0,0 +1,120 @@
+"""An in-memory stand-in for the parts of the Supabase query builder the helpers use."""
+
+
+_OPERATORS = {
+    "eq": lambda a, b: a == b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+    "gt": lambda a, b: a > b,
+}
+
+
+class _Result:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class _Query:
+    def __init__(self, rows: list[dict]):
+        self._rows = rows
+        self._filters = []
+        self._update = None
+        self._insert = None
+        self._limit = None
+        self._offset = 0
+        self._order = []
+        self._negate = False
+        self._count = None
+
+    def select(self, columns="*", count=None):
+        self._count = count
+        return self
+
+    @property
+    def not_(self):
+        self._negate = True
+        return self
+
+    def update(self, values: dict):
+        self._update = values
+        return self
+
+    def insert(self, values):
+        self._insert = values
+        return self
+
+    def eq(self, column, value):
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def _compare(self, column, operator, value):
+        self._filters.append(lambda row: row.get(column) is not None and _OPERATORS[operator](row[column], value))
+        return self
+
+    def in_(self, column, values):
+        self._filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def lt(self, column, value):
+        return self._compare(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._compare(column, "lte", value)
+
+    def gt(self, column, value):
+        return self._compare(column, "gt", value)
+
+    def is_(self, column, value):
+        negate, self._negate = self._negate, False
+        self._filters.append(lambda row: (row.get(column) is None) != negate)
+        return self
+
+    def or_(self, filters: str):
+        """Flat "column.operator.integer,..." conditions only."""
+        conditions = [condition.split(".") for condition in filters.split(",")]
+        self._filters.append(lambda row: any(
+            row.get(column) is not None and _OPERATORS[operator](row[column], int(value))
+            for column, operator, value in conditions
+        ))
+        return self
+
+    def order(self, column, desc=False):
+        self._order.append((column, desc))
+        return self
+
+    def offset(self, count):
+        self._offset = count
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def execute(self):
+        if self._insert is not None:
+            inserted = self._insert if isinstance(self._insert, list) else [self._insert]
+            self._rows.extend(dict(row) for row in inserted)
+            return _Result([dict(row) for row in inserted])
+        rows = [row for row in self._rows if all(matches(row) for matches in self._filters)]
+        count = len(rows) if self._count == "exact" else None
+        for column, desc in reversed(self._order):
+            rows.sort(key=lambda row: row.get(column), reverse=desc)
+        rows = rows[self._offset:]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        if self._update is not None:
+            for row in rows:
+                row.update(self._update)
+        return _Result([dict(row) for row in rows], count)
+
+
+class FakeSupabase:
+    def __init__(self, **tables: list[dict]):
+        self.tables = tables
+
+    def table(self, name: str) -> _Query:
+        return _Query(self.tables.setdefault(name, []))
+
+    def row(self, table: str, id) -> dict:
+        return next(row for row in self.tables[table] if row["id"] == id)
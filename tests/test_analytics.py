@@ -0,0 +1,52 @@
+import random
+from collections import Counter
+from helper.company.analytics import SCORE_FIELDS, evaluation_summary
+
+
+def histogram_rows(evaluations: list[tuple[str, dict]]) -> list[dict]:
+    """What evaluation_histograms returns for these (position, scores) pairs."""
+    scores, recommendations = Counter(), Counter()
+    for position, evaluation in evaluations:
+        for field in SCORE_FIELDS:
+            scores[(position, field, evaluation[field])] += 1
+        recommendations[(position, evaluation["recommendation"])] += 1
+    return [
+        {"position": position, "field": field, "score": score, "recommendation": None, "interviews": n}
+        for (position, field, score), n in scores.items()
+    ] + [
+        {"position": position, "field": None, "score": None, "recommendation": recommendation, "interviews": n}
+        for (position, recommendation), n in recommendations.items()
+    ]
+
+def nearest_rank(values: list[int], pct: int) -> int:
+    values = sorted(values)
+    return values[max(1, -(-pct * len(values) // 100)) - 1]
+
+
+def test_summary_matches_the_raw_scores():
+    rng = random.Random(7)
+    evaluations = [
+        (rng.choice(("Backend", "Data")), {**{field: rng.randint(0, 100) for field in SCORE_FIELDS}, "recommendation": rng.choice(("Hire", "No Hire"))})
+        for _ in range(300)
+    ]
+    summary = evaluation_summary(histogram_rows(evaluations))
+
+    assert summary["overall"]["count"] == 300
+    for position in ("Backend", "Data"):
+        mine = [scores for name, scores in evaluations if name == position]
+        result = summary["positions"][position]
+        assert result["count"] == len(mine)
+        assert result["recommendations"] == dict(Counter(scores["recommendation"] for scores in mine))
+        for field in SCORE_FIELDS:
+            values = [scores[field] for scores in mine]
+            assert result["categories"][field]["average"] == round(sum(values) / len(values), 2)
+            assert result["categories"][field]["p50"] == nearest_rank(values, 50)
+            assert result["categories"][field]["p90"] == nearest_rank(values, 90)
+    values = [scores["overall_score"] for _, scores in evaluations]
+    assert summary["overall"]["categories"]["overall_score"]["p75"] == nearest_rank(values, 75)
+
+def test_no_evaluations():
+    summary = evaluation_summary([])
+    assert summary["positions"] == {}
+    assert summary["overall"]["count"] == 0
+    assert summary["overall"]["categories"]["overall_score"] == {"average": None, "p25": None, "p50": None, "p75": None, "p90": None}
@@ -0,0 +1,59 @@
+import pytest
+from utils import cache
+from utils.cache import MemoryCache, SqliteCache
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    return MemoryCache() if request.param == "memory" else SqliteCache(str(tmp_path / "cache.db"))
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Drives both time.time and time.monotonic, so entries can be expired on demand."""
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+def rows(backend) -> int:
+    if isinstance(backend, SqliteCache):
+        return backend._connect().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    return len(backend._data)
+
+
+def test_entries_expire(backend, clock):
+    backend.set("a", {"value": 1}, ttl=10)
+    assert backend.get("a") == {"value": 1}
+    clock[0] += 11
+    assert backend.get("a") is None
+
+def test_add_only_claims_missing_or_expired_keys(backend, clock):
+    assert backend.add("lease", 1, ttl=10)
+    assert not backend.add("lease", 2, ttl=10)
+    clock[0] += 11
+    assert backend.add("lease", 3, ttl=10)
+    assert backend.get("lease") == 3
+
+def test_update_is_a_read_modify_write(backend):
+    assert backend.update("counter", lambda old: ((old or 0) + 5, "first")) == "first"
+    backend.update("counter", lambda old: (old * 2, None))
+    assert backend.get("counter") == 10
+    assert backend.incr("counter") == 11
+
+def test_purge_drops_only_expired_entries(backend, clock):
+    backend.set("short", 1, ttl=5)
+    backend.set("long", 2, ttl=60)
+    backend.set("forever", 3)
+    clock[0] += 10
+    assert backend.purge() == 1
+    assert rows(backend) == 2
+    assert backend.get("long") == 2 and backend.get("forever") == 3
+
+def test_written_but_never_read_keys_are_purged_by_later_writes(backend, clock, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_PURGE_INTERVAL_WRITES", 10)
+    for idx in range(9):
+        backend.set(f"etag:{idx}", idx, ttl=5)
+    clock[0] += 10
+    assert rows(backend) == 9
+    backend.set("fresh", True, ttl=5)
+    assert rows(backend) == 1
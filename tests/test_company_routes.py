@@ -0,0 +1,35 @@
+import asyncio
+from datetime import datetime, timezone
+import pytest
+from fastapi import HTTPException
+from fake_supabase import FakeSupabase
+import routes.company as company_routes
+
+
+def caller(company_id: str = "c1") -> company_routes.CompanyInDB:
+    return company_routes.CompanyInDB(
+        id=1, created_at=datetime.now(timezone.utc), username="acme", email="hr@acme.test",
+        disabled=False, company_id=company_id, hashed_password="x",
+    )
+
+@pytest.fixture
+def other_tenants_interview(monkeypatch):
+    supabase = FakeSupabase(interviews=[{"id": 7, "company_id": "c2", "transcript": "AI: Hi\nUser: Hello", "ai_evaluation": None}])
+    monkeypatch.setattr(company_routes, "supabase", supabase)
+    checked = []
+    monkeypatch.setattr(company_routes.rate_limiter, "check", lambda *args, **kwargs: checked.append(args))
+    return supabase, checked
+
+
+@pytest.mark.parametrize("handler", [
+    company_routes.evaluate_interview_transcript,
+    company_routes.stream_interview_transcript_evaluation,
+])
+def test_grading_another_companys_interview_is_refused(other_tenants_interview, handler):
+    supabase, checked = other_tenants_interview
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(handler(7, caller()))
+    assert exc.value.status_code == 403
+    # Refused before any of the caller's grading quota is spent or anything is written.
+    assert checked == []
+    assert supabase.row("interviews", 7)["ai_evaluation"] is None
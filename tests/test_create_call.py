@@ -0,0 +1,70 @@
+import pytest
+import requests
+from fake_supabase import FakeSupabase
+from helper.candidate import create_call
+from helper.candidate.create_call import normalize_phone, prepare_interview_call
+
+
+@pytest.mark.parametrize("number, country_code, expected", [
+    ("+44 7700 900123", None, "+447700900123"),
+    ("0044 7700 900123", None, "+447700900123"),
+    ("+1 (415) 555-0100", None, "+14155550100"),
+    ("+1 (415) 555-0100", "44", "+14155550100"),
+    ("07700 900123", "44", "+447700900123"),
+    ("(415) 555-0100", "1", "+14155550100"),
+    ("1 415 555 0100", "1", "+14155550100"),
+])
+def test_normalize_phone(number, country_code, expected):
+    assert normalize_phone(number, country_code) == expected
+
+@pytest.mark.parametrize("number", ["07700 900123", "(415) 555-0100", "4155550100"])
+def test_numbers_without_a_country_code_are_rejected_without_a_company_default(number):
+    # Guessing a country silently stores someone else's number.
+    with pytest.raises(ValueError, match="needs its country code"):
+        normalize_phone(number)
+
+@pytest.mark.parametrize("number", ["", "+12", "+1234567890123456", "+44 7700 9OO123", "+0 7700 900123"])
+def test_invalid_numbers_are_rejected(number):
+    with pytest.raises(ValueError):
+        normalize_phone(number, "44")
+
+
+class _Response:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Server Error")
+
+def prepare(monkeypatch, get) -> tuple[tuple, dict]:
+    monkeypatch.setattr(requests, "get", get)
+    interview = {
+        "id": 1, "vapi_workflow_id": "workflow-1", "candidate_phone": "+447700900123", "candidate_name": "Ada",
+    }
+    supabase = FakeSupabase(interviews=[dict(interview)])
+    return prepare_interview_call(supabase, interview), supabase.row("interviews", 1)
+
+def test_prepared_payload_is_stored(monkeypatch):
+    (payload, error), stored = prepare(monkeypatch, lambda *args, **kwargs: _Response(200))
+    assert error is None
+    assert payload["customer"]["number"] == "+447700900123"
+    assert stored["call_payload"] == payload
+
+def test_deleted_workflow_is_reported(monkeypatch):
+    (payload, error), stored = prepare(monkeypatch, lambda *args, **kwargs: _Response(404))
+    assert payload is None
+    assert error == "Workflow workflow-1 does not exist"
+    assert stored["call_payload_error"] == error
+
+def _unreachable(*args, **kwargs):
+    raise requests.ConnectionError("connection refused")
+
+@pytest.mark.parametrize("failure", [lambda *args, **kwargs: _Response(500), _unreachable])
+def test_vapi_errors_are_reported_instead_of_raised(monkeypatch, failure):
+    (payload, error), stored = prepare(monkeypatch, failure)
+    assert payload is None
+    assert error.startswith("Could not look up workflow workflow-1 on Vapi")
+    assert stored["call_payload_error"] == error
+    # Nothing was cached, so the next attempt asks Vapi again.
+    assert not create_call.get_cache().get("vapi:workflow:workflow-1")
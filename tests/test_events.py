@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from helper.company import events
+from helper.company.events import InterviewEventBus
+
+
+@pytest.fixture(autouse=True)
+def fast_poll(monkeypatch):
+    monkeypatch.setattr(events, "EVENT_POLL_SECONDS", 0.01)
+
+
+def drain(queue: asyncio.Queue) -> list[dict]:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_events_reach_subscribers_on_another_worker():
+    # Two buses over the same cache stand in for two gunicorn workers sharing CACHE_URL.
+    async def scenario():
+        streaming, publishing = InterviewEventBus(), InterviewEventBus()
+        queue = streaming.subscribe("c1")
+        other_company = streaming.subscribe("c2")
+        publishing.publish_interview({"id": 1, "company_id": "c1", "status": "Completed"})
+        publishing.publish_interview({"id": 2, "company_id": "c1", "call_status": "ended"})
+        await asyncio.sleep(0.1)
+        received = drain(queue)
+        assert [event["interview_id"] for event in received] == [1, 2]
+        assert received[0]["status"] == "Completed"
+        assert drain(other_company) == []
+        streaming.unsubscribe("c1", queue)
+        streaming.unsubscribe("c2", other_company)
+
+    asyncio.run(scenario())
+
+def test_own_events_are_delivered_once():
+    async def scenario():
+        bus = InterviewEventBus()
+        queue = bus.subscribe("c1")
+        bus.publish_interview({"id": 1, "company_id": "c1", "status": "Pending"})
+        await asyncio.sleep(0.1)
+        assert [event["interview_id"] for event in drain(queue)] == [1]
+        bus.unsubscribe("c1", queue)
+
+    asyncio.run(scenario())
+
+def test_a_new_subscriber_does_not_replay_old_events():
+    async def scenario():
+        publishing, streaming = InterviewEventBus(), InterviewEventBus()
+        publishing.publish_interview({"id": 1, "company_id": "c1", "status": "Pending"})
+        queue = streaming.subscribe("c1")
+        publishing.publish_interview({"id": 2, "company_id": "c1", "status": "Completed"})
+        await asyncio.sleep(0.1)
+        assert [event["interview_id"] for event in drain(queue)] == [2]
+        streaming.unsubscribe("c1", queue)
+        await asyncio.sleep(0.05)
+        assert streaming._poller.done()
+
+    asyncio.run(scenario())
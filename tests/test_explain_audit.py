@@ -0,0 +1,25 @@
+import ast
+from db_functions.explain_audit import _pattern, _unwind
+
+
+def pattern(source: str):
+    return _pattern(_unwind(ast.parse(source, mode="eval").body))
+
+
+def test_literal_chain_is_audited_exactly():
+    query = pattern('supabase.table("interviews").select("id, status").eq("company_id", company).order("id").limit(50)')
+    assert query.sql() == "select id, status from public.interviews where company_id = $1 order by id limit 50"
+    assert query.approximations == []
+
+def test_computed_parts_are_reported():
+    query = pattern('supabase.table("interviews").select(COLUMNS).eq("company_id", company).limit(PAGE_SIZE)')
+    assert query.sql() == "select * from public.interviews where company_id = $1 limit 100"
+    assert query.approximations == [
+        "select(COLUMNS) audited as select *",
+        "limit(PAGE_SIZE) audited as limit 100",
+    ]
+
+def test_computed_filter_column_is_reported():
+    query = pattern('supabase.table("interviews").select("id").eq(column, value).eq("id", 1)')
+    assert query.sql() == "select id from public.interviews where id = $1"
+    assert query.approximations == [".eq(column) left out: the column is not a literal"]
@@ -0,0 +1,86 @@
+import pytest
+from helper.evaluation.engine import evaluate
+from helper.evaluation.heuristic import heuristic_scores
+from helper.evaluation.rubrics import get_rubric, list_rubrics
+from helper.company.transcript import TRANSCRIPT_UNAVAILABLE
+
+# Anchor transcripts the heuristic is calibrated against.
+STRONG = """AI: Tell me about a project you are proud of.
+User: I led a team of three building a FastAPI service on AWS. We cached hot queries in Redis, which reduced p99 latency by 40 percent, and I mentored an intern through the Postgres migration.
+AI: How did you debug the slow endpoint?
+User: First I measured where time went, found the root cause was a missing index, and weighed the trade-off against write throughput before adding it."""
+
+SOLID = """AI: Can you tell me about yourself?
+User: Sure. I'm a backend engineer with about four years of experience, mostly in Python. At my current company I work on the payments API, which handles a few thousand requests a second.
+AI: Describe a difficult bug you fixed.
+User: We had intermittent timeouts in production. I added logging around the database calls, noticed that one query was doing a full table scan when a certain filter was used, and added a composite index. After the fix the timeouts went away and the endpoint got about three times faster.
+AI: How do you work with your team?
+User: We do code review on every change and I pair with newer engineers when they pick up something unfamiliar. When we disagree on a design we write a short doc and decide together.
+AI: How do you learn new things?
+User: Mostly by building something small. When we moved to Kubernetes I set up a test cluster and read the docs until I understood how deployments roll out."""
+
+# One substantive, relevant answer.
+SINGLE_ANSWER = """AI: Tell me about a technical challenge you solved.
+User: At my last internship our nightly data export took six hours. I profiled it, found we were loading every row into memory, and rewrote it to stream rows from Postgres in batches with a server-side cursor. It dropped to twenty minutes and memory stayed flat, so we could run it hourly instead."""
+
+VAGUE = """AI: Tell me about yourself.
+User: I like computers and I am a hard worker. I am good with people.
+AI: Describe a challenge.
+User: There was a hard thing once and I did it.
+AI: Why this role?
+User: It seems good and I want to work here."""
+
+EVASIVE = """AI: Tell me about a project you are proud of.
+User: Um, I don't know, I guess a website.
+AI: What did you build?
+User: Uh, kind of a page. Not sure.
+AI: How did you handle problems?
+User: I asked someone."""
+
+HIRE = ("Hire", "Strong Hire")
+
+
+@pytest.mark.parametrize("transcript", [STRONG, SOLID, SINGLE_ANSWER])
+@pytest.mark.parametrize("rubric", [rubric.name for rubric in list_rubrics()])
+def test_competent_answers_land_in_the_hire_bands(rubric, transcript):
+    scores = heuristic_scores(get_rubric(rubric), transcript)
+    assert scores["overall_score"] >= 65
+    if "recommendation" in scores:
+        assert scores["recommendation"] in HIRE
+
+def test_vague_answers_fall_short_of_hire():
+    scores = heuristic_scores(get_rubric("interview"), VAGUE)
+    assert 35 <= scores["overall_score"] < 65
+    assert scores["recommendation"] == "No Hire"
+
+def test_evasive_answers_are_strong_no_hire():
+    scores = heuristic_scores(get_rubric("interview"), EVASIVE)
+    assert scores["overall_score"] < 50
+    assert scores["recommendation"] == "Strong No Hire"
+
+def test_scores_rank_the_anchors():
+    overall = [heuristic_scores(get_rubric(), text)["overall_score"] for text in (SOLID, SINGLE_ANSWER, VAGUE, EVASIVE)]
+    assert overall == sorted(overall, reverse=True)
+
+def test_evidence_is_named_in_the_comments():
+    scores = heuristic_scores(get_rubric("interview"), STRONG)
+    assert "fastapi" in scores["technical_comment"]
+    assert "Leadership" in scores["key_strengths"] or "leadership" in scores["overall_comment"]
+
+@pytest.mark.parametrize("transcript", [
+    "",
+    None,
+    TRANSCRIPT_UNAVAILABLE,
+    "AI: Hello, can you hear me?\nAI: It seems you're not there, goodbye.",
+    "User:   \nAI: Are you there?",
+])
+def test_transcripts_without_candidate_answers_are_not_graded(transcript):
+    with pytest.raises(ValueError, match="no answers from the candidate"):
+        heuristic_scores(get_rubric(), transcript)
+
+def test_grading_is_deterministic_and_free():
+    first = evaluate(SOLID, backend="heuristic")
+    second = evaluate(SOLID, backend="heuristic")
+    assert first["scores"] == second["scores"]
+    assert first["usage"]["backend"] == "heuristic"
+    assert first["usage"]["cost_usd"] == 0
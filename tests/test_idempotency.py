@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from fastapi import HTTPException, Response
+from utils.idempotency import idempotent
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+def counting_operation(result=None):
+    calls = []
+
+    async def operation():
+        calls.append(1)
+        return result if result is not None else {"call": len(calls)}
+
+    return operation, calls
+
+
+def test_repeat_with_the_same_key_replays_the_stored_result():
+    operation, calls = counting_operation()
+    first = run(idempotent("call", "key-1", "fp", operation))
+    response = Response()
+    second = run(idempotent("call", "key-1", "fp", operation, response))
+    assert first == second == {"call": 1}
+    assert len(calls) == 1
+    assert response.headers["Idempotent-Replayed"] == "true"
+
+def test_without_a_key_the_operation_always_runs():
+    operation, calls = counting_operation()
+    run(idempotent("call", None, "fp", operation))
+    run(idempotent("call", None, "fp", operation))
+    assert len(calls) == 2
+
+def test_reusing_a_key_for_a_different_request_is_rejected():
+    operation, _ = counting_operation()
+    run(idempotent("call", "key-1", "fp-a", operation))
+    with pytest.raises(HTTPException) as exc:
+        run(idempotent("call", "key-1", "fp-b", operation))
+    assert exc.value.status_code == 422
+
+def test_a_concurrent_duplicate_gets_409():
+    async def scenario():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await release.wait()
+            return {"ok": True}
+
+        first = asyncio.create_task(idempotent("call", "key-1", "fp", slow))
+        await started.wait()
+        with pytest.raises(HTTPException) as exc:
+            await idempotent("call", "key-1", "fp", slow)
+        release.set()
+        return exc.value, await first
+
+    error, result = run(scenario())
+    assert error.status_code == 409
+    assert result == {"ok": True}
+
+def test_a_failed_operation_releases_the_key():
+    async def failing():
+        raise HTTPException(status_code=502, detail="upstream")
+
+    with pytest.raises(HTTPException):
+        run(idempotent("call", "key-1", "fp", failing))
+    operation, calls = counting_operation()
+    assert run(idempotent("call", "key-1", "fp", operation)) == {"call": 1}
+
+@pytest.mark.parametrize("key", ["", "k" * 256])
+def test_invalid_keys_are_rejected(key):
+    operation, calls = counting_operation()
+    with pytest.raises(HTTPException) as exc:
+        run(idempotent("call", key, "fp", operation))
+    assert exc.value.status_code == 400
+    assert not calls
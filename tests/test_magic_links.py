@@ -0,0 +1,38 @@
+import asyncio
+import time
+from helper.company import gen_credentials
+from helper.company.gen_credentials import send_magic_links
+
+
+def test_concurrent_bulk_sends_share_one_pace(monkeypatch):
+    monkeypatch.setattr(gen_credentials, "MAGIC_LINK_RATE_PER_SECOND", 20)
+    sent = []
+    monkeypatch.setattr(gen_credentials, "_sign_in_with_otp", lambda email: sent.append((time.monotonic(), email)))
+
+    async def two_requests():
+        return await asyncio.gather(
+            send_magic_links([f"a{idx}@example.com" for idx in range(4)]),
+            send_magic_links([f"b{idx}@example.com" for idx in range(4)]),
+        )
+
+    results = asyncio.run(two_requests())
+    assert all(error is None for result in results for error in result.values())
+    times = sorted(at for at, _ in sent)
+    assert len(times) == 8
+    # One bucket for both requests: 8 sends at 20/s need at least 7 intervals of 50 ms.
+    assert times[-1] - times[0] >= 7 * 0.05 * 0.9
+
+def test_rate_limited_sends_are_retried(monkeypatch):
+    monkeypatch.setattr(gen_credentials, "MAGIC_LINK_RATE_PER_SECOND", 0)
+    sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda seconds: sleep(0))
+    attempts = []
+
+    def flaky(email):
+        attempts.append(email)
+        if len(attempts) == 1:
+            raise RuntimeError("Email rate limit exceeded")
+
+    monkeypatch.setattr(gen_credentials, "_sign_in_with_otp", flaky)
+    assert asyncio.run(send_magic_links(["a@example.com", "a@example.com"])) == {"a@example.com": None}
+    assert attempts == ["a@example.com", "a@example.com"]
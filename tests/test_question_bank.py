@@ -0,0 +1,95 @@
+import pytest
+from fake_supabase import FakeSupabase
+from helper.company.question_bank import QuestionBank, _stem, parse_question_file
+
+QUESTIONS = [
+    "Explain the difference between a process and a thread.",
+    "How do you handle disagreements with teammates?",
+    "Describe a time you had to debug a production issue.",
+    "What are the advantages of using indexes in a database?",
+    "How would you design a URL shortener?",
+    "Explain how garbage collection works in Java.",
+    "What is the difference between SQL and NoSQL databases?",
+    "Describe your experience leading a team.",
+]
+
+
+@pytest.fixture
+def bank() -> QuestionBank:
+    bank = QuestionBank()
+    bank._bank_loaded = True
+    for idx, text in enumerate(QUESTIONS, start=1):
+        bank.add(idx, text, "c1", role_id=10)
+    bank.add(100, "Explain the difference between a process and a thread.", "c2", role_id=20)
+    bank.add("bank:shared:0", "How do you keep up to date with new technology?")
+    return bank
+
+
+@pytest.mark.parametrize("word, stem", [
+    ("processes", "process"), ("processing", "process"), ("processed", "process"),
+    ("differences", "differenc"), ("threads", "thread"), ("technologies", "technology"),
+    ("indexes", "index"), ("scaling", "scal"), ("scale", "scal"), ("running", "run"),
+    ("prioritise", "prioritiz"), ("prioritize", "prioritiz"), ("class", "class"), ("status", "status"),
+])
+def test_inflections_share_a_stem(word, stem):
+    assert _stem(word) == stem
+
+@pytest.mark.parametrize("rephrased, original_id", [
+    ("Explain the differences between processes and threads", 1),
+    ("How do you handle disagreements with your teammates?", 2),
+    ("Describe a time when you debugged an issue in production.", 3),
+    ("What are the advantages of database indexes?", 4),
+    ("Explain how Java garbage collection works.", 6),
+    ("What's the difference between SQL and NoSQL databases?", 7),
+    ("Describe your experience with leading teams.", 8),
+])
+def test_paraphrases_are_duplicates(bank, rephrased, original_id):
+    duplicate = bank.find_duplicate(rephrased, "c1")
+    assert duplicate is not None and duplicate["question_id"] == original_id
+
+@pytest.mark.parametrize("different", [
+    "Explain the difference between TCP and UDP.",
+    "How do you handle feedback from your manager?",
+    "What are the disadvantages of using indexes in a database?",
+    "How would you design a chat application?",
+    "Explain how memory management works in C++.",
+    "Describe your experience mentoring junior engineers.",
+])
+def test_related_but_different_questions_are_not_duplicates(bank, different):
+    assert bank.find_duplicate(different, "c1") is None
+
+def test_search_ranks_the_closest_question_first(bank):
+    results = bank.search("How do you handle disagreements when leading a team?", "c1", limit=3)
+    assert [result["question_id"] for result in results] == [2, 8]
+    assert results[0]["score"] > results[1]["score"]
+
+def test_search_only_sees_the_callers_questions_and_the_shared_bank(bank):
+    seen = {(result["source"], result["question_id"]) for result in bank.search("process thread technology", "c1", limit=20)}
+    assert ("company", 1) in seen
+    assert ("bank", None) in seen
+    assert ("company", 100) not in seen
+    assert bank.find_duplicate("Explain the differences between processes and threads", "c3") is None
+
+def test_role_filters(bank):
+    assert bank.search("process thread", "c1", role_id=99) == []
+    assert bank.search("process thread", "c1", exclude_role_id=10, include_shared=False) == []
+
+def test_removed_questions_are_not_found(bank):
+    bank.remove(1, "c1")
+    assert bank.find_duplicate("Explain the differences between processes and threads", "c1") is None
+
+def test_warm_loads_only_the_companys_roles():
+    supabase = FakeSupabase(
+        roles=[{"id": 10, "company_id": "c1"}, {"id": 20, "company_id": "c2"}],
+        questions=[
+            {"id": 1, "role_id": 10, "question_text": QUESTIONS[0]},
+            {"id": 2, "role_id": 20, "question_text": QUESTIONS[1]},
+        ],
+    )
+    bank = QuestionBank()
+    bank.warm(supabase, "c1")
+    assert bank.find_duplicate(QUESTIONS[0], "c1")["question_id"] == 1
+    assert bank.find_duplicate(QUESTIONS[1], "c1") is None
+
+def test_parse_question_file_strips_numbering():
+    assert parse_question_file("﻿1. First?\n\n- Second?\n3) Third?\n") == ["First?", "Second?", "Third?"]
@@ -0,0 +1,67 @@
+import random
+from fake_supabase import FakeSupabase
+from helper.company.ranking import TIE_BREAKERS, shortlist
+
+COMPANY = "c1"
+
+
+def interview(idx: int, scores: dict | None, position: str = "Backend") -> dict:
+    """An interviews row with the generated columns the shortlist migration adds."""
+    rank = None
+    if scores is not None:
+        rank = 0
+        for field in TIE_BREAKERS:
+            rank = rank * 101 + scores.get(field, 0)
+    return {
+        "id": idx, "company_id": COMPANY, "position": position, "candidate_name": f"Candidate {idx}",
+        "ai_evaluation": scores, "shortlist_rank": rank,
+        "ai_recommendation": scores.get("recommendation") if scores else None,
+    }
+
+def graded(rng: random.Random) -> dict:
+    # Few distinct scores, so ties run across page boundaries.
+    return {**{field: rng.randint(70, 72) for field in TIE_BREAKERS}, "recommendation": rng.choice(("Hire", "No Hire"))}
+
+def supabase_with(count: int = 120):
+    rng = random.Random(3)
+    rows = [interview(idx, graded(rng) if idx % 7 else None) for idx in range(1, count + 1)]
+    rows.append(interview(count + 1, graded(rng), position="Design"))
+    return FakeSupabase(interviews=rows), rows
+
+def ranked(rows: list[dict], recommendation: str | None = None) -> list[int]:
+    candidates = [
+        row for row in rows
+        if row["position"] == "Backend" and row["ai_evaluation"]
+        and recommendation in (None, row["ai_evaluation"]["recommendation"])
+    ]
+    candidates.sort(key=lambda row: tuple(-row["ai_evaluation"][field] for field in TIE_BREAKERS) + (row["id"],))
+    return [row["id"] for row in candidates]
+
+
+def test_cursor_pages_walk_the_ranking_in_order():
+    supabase, rows = supabase_with()
+    for recommendation in (None, "Hire"):
+        seen, ranks, cursor = [], [], None
+        while True:
+            page = shortlist(supabase, COMPANY, "Backend", limit=9, recommendation=recommendation, cursor=cursor)
+            seen += [item["interview_id"] for item in page["items"]]
+            ranks += [item["rank"] for item in page["items"]]
+            assert page["total"] == len(ranked(rows, recommendation))
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == ranked(rows, recommendation)
+        assert ranks == list(range(1, len(seen) + 1))
+
+def test_offset_page_matches_the_ranking():
+    supabase, rows = supabase_with()
+    page = shortlist(supabase, COMPANY, "Backend", limit=10, offset=20)
+    assert [item["interview_id"] for item in page["items"]] == ranked(rows)[20:30]
+    assert [item["rank"] for item in page["items"]] == list(range(21, 31))
+    assert page["items"][0]["overall_score"] is not None
+
+def test_last_page_has_no_cursor():
+    supabase, rows = supabase_with(10)
+    page = shortlist(supabase, COMPANY, "Backend", limit=100)
+    assert page["next_cursor"] is None
+    assert page["total"] == len(page["items"]) == len(ranked(rows))
@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from utils import ratelimit
+from utils.ratelimit import FairScheduler, RateLimiter, take_token
+
+
+def test_take_token_allows_a_burst_then_throttles():
+    now = 1000.0
+    assert [take_token("t", 3, 60, now) for _ in range(3)] == [0, 0, 0]
+    # The fourth request waits one emission interval (60 / 3 seconds).
+    assert take_token("t", 3, 60, now) == pytest.approx(20)
+
+def test_take_token_refills_at_the_configured_rate():
+    now = 1000.0
+    for _ in range(3):
+        take_token("t", 3, 60, now)
+    assert take_token("t", 3, 60, now + 19) == pytest.approx(1)
+    assert take_token("t", 3, 60, now + 20) == 0
+    assert take_token("t", 3, 60, now + 20) > 0
+
+def test_take_token_buckets_are_independent():
+    now = 1000.0
+    take_token("a", 1, 60, now)
+    assert take_token("a", 1, 60, now) > 0
+    assert take_token("b", 1, 60, now) == 0
+
+def test_check_raises_429_with_retry_after(monkeypatch):
+    monkeypatch.setitem(ratelimit.RATE_LIMITS, "evaluation", {"company": (1, 60)})
+    limiter = RateLimiter()
+    limiter.check("evaluation", "company-1")
+    with pytest.raises(HTTPException) as exc:
+        limiter.check("evaluation", "company-1")
+    assert exc.value.status_code == 429
+    assert int(exc.value.headers["Retry-After"]) >= 59
+    limiter.check("evaluation", "company-2")
+
+def test_fair_scheduler_admits_waiting_companies_round_robin():
+    async def scenario():
+        scheduler = FairScheduler(slots=1, per_key=1)
+        assert await scheduler.acquire("a", 1)
+        order = []
+
+        async def wait(key):
+            assert await scheduler.acquire(key, 1)
+            order.append(key)
+            scheduler.release(key)
+
+        # Company a queues twice before b queues once; b still gets the second slot.
+        tasks = [asyncio.create_task(wait(key)) for key in ("a", "a", "b")]
+        await asyncio.sleep(0)
+        scheduler.release("a")
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["a", "b", "a"]
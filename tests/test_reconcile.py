@@ -0,0 +1,146 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from fake_supabase import FakeSupabase
+from fastapi import HTTPException
+from helper.company import reconcile, transcript
+from helper.company.reconcile import Reconciler
+from helper.company.transcript import TRANSCRIPT_UNAVAILABLE
+
+CALLS = {
+    "ended": {"status": "ended", "transcript": "AI: Hi\nUser: I led the migration.", "endedReason": "customer-ended-call"},
+    "no-answer": {"status": "ended", "transcript": "", "endedReason": "customer-did-not-answer"},
+    "ringing": {"status": "ringing"},
+}
+
+
+def interview(id: int, **fields) -> dict:
+    return {
+        "id": id, "company_id": "company-1", "candidate_name": "Ada", "candidate_email": f"ada{id}@example.com",
+        "position": "Engineer", "status": "In Progress", "interview_date": None, "created_at": "2026-10-01",
+        "call_id": None, "call_status": None, "call_queued_at": None, "call_sync_attempts": 0,
+        "transcript": None, "recording_path": None, "ai_evaluation": None, **fields,
+    }
+
+@pytest.fixture
+def graded(monkeypatch):
+    """Grading through a stub engine; returns the (interview id, backend) pairs graded."""
+    calls = []
+    monkeypatch.setattr(reconcile, "RECONCILE_PAGE_SIZE", 2)
+    monkeypatch.setattr(reconcile, "RECONCILE_GRADING", True)
+    monkeypatch.setattr(reconcile, "fetch_call", CALLS.get)
+    monkeypatch.setattr(transcript.recording_archiver, "submit", lambda *args: False)
+
+    def evaluate(text, backend=None):
+        return {"scores": {"overall_score": 80}, "usage": {"backend": backend}, "backend": backend}
+
+    def record_evaluation(supabase, row, result, make_current=True):
+        calls.append((row["id"], result["backend"]))
+        supabase.table("interviews").update({"ai_evaluation": result["scores"]}).eq("id", row["id"]).execute()
+
+    monkeypatch.setattr(reconcile, "evaluate", evaluate)
+    monkeypatch.setattr(reconcile, "record_evaluation", record_evaluation)
+    return calls
+
+def run_pass(supabase) -> dict:
+    return asyncio.run(Reconciler().run_once(supabase))
+
+def database(*interviews) -> FakeSupabase:
+    return FakeSupabase(interviews=list(interviews), company=[{"company_id": "company-1", "grading_backend": "heuristic"}])
+
+
+def test_stale_queued_calls_fail_and_fresh_ones_wait(graded):
+    now = datetime.now(timezone.utc)
+    stale = (now - timedelta(seconds=reconcile.RECONCILE_QUEUED_TIMEOUT_SECONDS + 60)).isoformat()
+    supabase = database(
+        interview(1, status="Pending", call_status="queued", call_queued_at=stale),
+        interview(2, status="Pending", call_status="queued", call_queued_at=now.isoformat()),
+    )
+    stats = run_pass(supabase)
+    assert supabase.row("interviews", 1)["call_status"] == "failed"
+    assert supabase.row("interviews", 2)["call_status"] == "queued"
+    assert stats["queued_expired"] == 1
+
+def test_placed_calls_follow_vapi(graded):
+    supabase = database(
+        interview(1, call_status="placed", call_id="ended"),
+        interview(2, call_status="placed", call_id="no-answer"),
+        interview(3, call_status="placed", call_id="ringing"),
+    )
+    stats = run_pass(supabase)
+    assert (supabase.row("interviews", 1)["status"], supabase.row("interviews", 1)["call_status"]) == ("Completed", "ended")
+    assert (supabase.row("interviews", 2)["status"], supabase.row("interviews", 2)["call_status"]) == ("Pending", "failed")
+    assert supabase.row("interviews", 3)["call_status"] == "placed"
+    assert stats["calls_ended"] == 2
+    assert stats["calls_in_progress"] == 1
+    # The call that ended with a conversation is graded in the same pass.
+    assert graded == [(1, "heuristic")]
+
+def test_unfetchable_calls_are_retried_then_abandoned(graded):
+    supabase = database(
+        interview(1, call_status="placed", call_id="missing"),
+        interview(2, call_status="placed", call_id="missing", call_sync_attempts=reconcile.RECONCILE_MAX_FETCH_ATTEMPTS - 1),
+    )
+    stats = run_pass(supabase)
+    retried, abandoned = supabase.row("interviews", 1), supabase.row("interviews", 2)
+    assert (retried["call_status"], retried["call_sync_attempts"]) == ("placed", 1)
+    assert (abandoned["call_status"], abandoned["status"]) == ("failed", "Pending")
+    assert (stats["fetch_retries"], stats["calls_abandoned"]) == (1, 1)
+
+def test_calls_settled_meanwhile_are_not_counted_as_retries(graded, monkeypatch):
+    supabase = database(interview(1, call_status="placed", call_id="missing"))
+
+    def settled_by_the_dispatcher(call_id):
+        supabase.row("interviews", 1)["call_status"] = "ended"
+        return None
+
+    monkeypatch.setattr(reconcile, "fetch_call", settled_by_the_dispatcher)
+    stats = run_pass(supabase)
+    assert supabase.row("interviews", 1)["call_sync_attempts"] == 0
+    assert stats["sync_superseded"] == 1
+    assert "fetch_retries" not in stats
+
+def test_ended_interviews_are_graded_unless_the_transcript_is_missing(graded):
+    supabase = database(
+        interview(1, status="Completed", call_status="ended", transcript="AI: Hi\nUser: Hello there."),
+        interview(2, status="Completed", call_status="ended", transcript=TRANSCRIPT_UNAVAILABLE),
+        interview(3, status="Completed", call_status="ended", transcript="AI: Hi\nUser: Again.", ai_evaluation={"overall_score": 50}),
+    )
+    stats = run_pass(supabase)
+    assert graded == [(1, "heuristic")]
+    assert supabase.row("interviews", 2)["ai_evaluation"] is None
+    assert supabase.row("interviews", 2)["evaluation_error"]
+    assert (stats["graded"], stats["ungradable"]) == (1, 1)
+
+def test_ungradable_interviews_are_not_rescanned(graded, monkeypatch):
+    def no_answers(text, backend=None):
+        raise ValueError("The transcript has no answers from the candidate to grade")
+
+    monkeypatch.setattr(reconcile, "evaluate", no_answers)
+    supabase = database(interview(1, status="Completed", call_status="ended", transcript="AI: Hello? Are you there?"))
+    first = run_pass(supabase)
+    assert supabase.row("interviews", 1)["evaluation_error"] == "The transcript has no answers from the candidate to grade"
+    assert first["ungradable"] == 1
+    second = run_pass(supabase)
+    assert second["scanned"] == 0
+
+def test_a_refetched_transcript_clears_the_evaluation_error(graded):
+    supabase = database(interview(1, call_status="placed", call_id="ended", evaluation_error="The call's transcript could not be retrieved"))
+    run_pass(supabase)
+    assert supabase.row("interviews", 1)["evaluation_error"] is None
+    assert graded == [(1, "heuristic")]
+
+def test_throttled_grading_is_deferred(graded, monkeypatch):
+    def throttled(*args, **kwargs):
+        raise HTTPException(status_code=429, detail="Too many evaluation requests")
+
+    monkeypatch.setattr(reconcile.rate_limiter, "check", throttled)
+    supabase = database(interview(1, status="Completed", call_status="ended", transcript="AI: Hi\nUser: Hello."))
+    stats = run_pass(supabase)
+    assert graded == []
+    assert stats["grading_deferred"] == 1
+
+def test_one_pass_per_interval_across_workers(graded):
+    supabase = database()
+    assert asyncio.run(Reconciler().run_if_due(supabase)) is not None
+    assert asyncio.run(Reconciler().run_if_due(supabase)) is None
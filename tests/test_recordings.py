@@ -0,0 +1,22 @@
+import logging
+from helper.company import recordings
+from helper.company.recordings import check_transcoder, recording_url
+
+
+def test_missing_ffmpeg_is_reported_at_startup(monkeypatch, caplog):
+    monkeypatch.setattr(recordings, "RECORDING_CODEC", "opus")
+    monkeypatch.setattr(recordings, "FFMPEG_BINARY", "/nonexistent/ffmpeg")
+    with caplog.at_level(logging.WARNING, logger=recordings.__name__):
+        assert not check_transcoder()
+    assert "uncompressed WAV" in caplog.text
+
+def test_wav_codec_needs_no_transcoder(monkeypatch, caplog):
+    monkeypatch.setattr(recordings, "RECORDING_CODEC", "wav")
+    monkeypatch.setattr(recordings, "FFMPEG_BINARY", "/nonexistent/ffmpeg")
+    assert check_transcoder()
+    assert not caplog.text
+
+def test_recording_url_reads_either_vapi_field():
+    assert recording_url({"recordingUrl": "https://a"}) == "https://a"
+    assert recording_url({"artifact": {"recordingUrl": "https://b"}}) == "https://b"
+    assert recording_url({}) is None
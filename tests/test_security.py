@@ -0,0 +1,21 @@
+import pytest
+from fastapi import HTTPException
+from utils.security import require_metrics_token
+
+
+def test_metrics_are_hidden_without_a_configured_token(monkeypatch):
+    monkeypatch.delenv("METRICS_TOKEN", raising=False)
+    with pytest.raises(HTTPException) as exc:
+        require_metrics_token("anything")
+    assert exc.value.status_code == 404
+
+@pytest.mark.parametrize("header", [None, "", "wrong"])
+def test_metrics_reject_a_missing_or_wrong_token(monkeypatch, header):
+    monkeypatch.setenv("METRICS_TOKEN", "s3cret")
+    with pytest.raises(HTTPException) as exc:
+        require_metrics_token(header)
+    assert exc.value.status_code == 401
+
+def test_metrics_accept_the_configured_token(monkeypatch):
+    monkeypatch.setenv("METRICS_TOKEN", "s3cret")
+    require_metrics_token("s3cret")
@@ -0,0 +1,75 @@
+import pytest
+from fake_supabase import FakeSupabase
+from helper.company import transcript
+from helper.company.transcript import TRANSCRIPT_UNAVAILABLE, ingest_call
+from utils.etag import company_views
+
+ENDED_CALL = {
+    "status": "ended",
+    "transcript": "AI: Tell me about a project.\nUser: I built the billing API.",
+    "cost": 0.21,
+    "startedAt": "2026-10-01T10:00:00+00:00",
+    "endedAt": "2026-10-01T10:05:00+00:00",
+    "endedReason": "customer-ended-call",
+}
+
+
+@pytest.fixture
+def archived(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(transcript.recording_archiver, "submit", lambda supabase, interview, call: submitted.append(interview["id"]))
+    return submitted
+
+def placed_interview(**fields) -> dict:
+    return {
+        "id": 1, "company_id": "company-1", "candidate_email": "ada@example.com", "call_id": "call-1",
+        "status": "In Progress", "call_status": "placed", "transcript": None, **fields,
+    }
+
+
+def test_fetch_failure_stores_the_sentinel_and_leaves_the_call_placed(monkeypatch, archived):
+    monkeypatch.setattr(transcript, "fetch_call", lambda call_id: None)
+    interview = placed_interview()
+    supabase = FakeSupabase(interviews=[dict(interview)])
+    generation = company_views.current("company-1")
+
+    assert ingest_call(supabase, interview) == TRANSCRIPT_UNAVAILABLE
+    stored = supabase.row("interviews", 1)
+    assert stored["transcript"] == TRANSCRIPT_UNAVAILABLE
+    assert stored["call_status"] == "placed"
+    assert stored["status"] == "In Progress"
+    assert interview["transcript"] == TRANSCRIPT_UNAVAILABLE
+    assert company_views.current("company-1") == generation + 1
+    assert archived == []
+
+def test_fetch_failure_keeps_a_transcript_stored_earlier(monkeypatch, archived):
+    monkeypatch.setattr(transcript, "fetch_call", lambda call_id: None)
+    interview = placed_interview(transcript="AI: Hi\nUser: Hello")
+    supabase = FakeSupabase(interviews=[dict(interview)])
+
+    assert ingest_call(supabase, interview) == "AI: Hi\nUser: Hello"
+    assert supabase.row("interviews", 1)["transcript"] == "AI: Hi\nUser: Hello"
+
+def test_ended_call_completes_the_interview(monkeypatch, archived):
+    monkeypatch.setattr(transcript, "fetch_call", lambda call_id: ENDED_CALL)
+    interview = placed_interview()
+    supabase = FakeSupabase(interviews=[dict(interview)])
+    generation = company_views.current("company-1")
+
+    assert ingest_call(supabase, interview) == ENDED_CALL["transcript"]
+    stored = supabase.row("interviews", 1)
+    assert (stored["status"], stored["call_status"]) == ("Completed", "ended")
+    assert stored["call_duration_seconds"] == 300
+    assert stored["call_cost"] == 0.21
+    assert company_views.current("company-1") == generation + 1
+    assert archived == [1]
+
+def test_ended_call_without_a_conversation_lets_the_candidate_retry(monkeypatch, archived):
+    call = {"status": "ended", "transcript": "", "endedReason": "customer-did-not-answer"}
+    interview = placed_interview()
+    supabase = FakeSupabase(interviews=[dict(interview)])
+
+    ingest_call(supabase, interview, call)
+    stored = supabase.row("interviews", 1)
+    assert (stored["status"], stored["call_status"]) == ("Pending", "failed")
+    assert stored["call_error"] == "customer-did-not-answer"
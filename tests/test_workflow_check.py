@@ -0,0 +1,83 @@
+import pytest
+from helper.company.workflow_check import WorkflowGraph, check_workflow, estimate, question_script
+from helper.company.workflow_templates import get_workflow_template, list_workflow_templates
+
+
+def conversation(name: str, start: bool = False, extracts: tuple[str, ...] = ()) -> dict:
+    node = {"name": name, "type": "conversation"}
+    if start:
+        node["isStart"] = True
+    if extracts:
+        node["variableExtractionPlan"] = {"output": [{"title": title} for title in extracts]}
+    return node
+
+def hangup(name: str = "hangup") -> dict:
+    return {"name": name, "type": "tool", "tool": {"type": "endCall"}}
+
+def edge(source: str, target: str, prompt: str | None = None) -> dict:
+    return {"from": source, "to": target, **({"condition": {"type": "ai", "prompt": prompt}} if prompt else {})}
+
+def workflow(nodes: list[dict], edges: list[dict]) -> dict:
+    return {"name": "test", "nodes": nodes, "edges": edges}
+
+
+@pytest.mark.parametrize("template", [template.name for template in list_workflow_templates()])
+@pytest.mark.parametrize("questions", [0, 1, 5])
+def test_every_template_renders_a_valid_workflow(template, questions):
+    report = check_workflow(get_workflow_template(template).render([f"Question {idx}" for idx in range(questions)]))
+    assert report.problems == []
+    assert report.min_turns <= report.max_turns
+
+def test_turns_and_estimates_of_the_standard_template():
+    report = check_workflow(get_workflow_template("standard").render(["A", "B"]))
+    # introduction, two questions, progression and conclusion; each question may be retried twice.
+    assert (report.min_turns, report.max_turns) == (5, 9)
+    assert (report.min_duration_seconds, report.min_cost) == estimate(5)
+
+def test_simulated_calls_follow_the_candidate_answers():
+    graph = WorkflowGraph(get_workflow_template("standard").render(["A", "B"]))
+    clear = graph.simulate(question_script([[8], [8]]))
+    assert clear.terminated
+    assert clear.path == ["introduction", "question_1", "question_2", "progression", "conclusion", "hangup"]
+
+    retried = graph.simulate(question_script([[0, 0, 8], [3, 8]]))
+    assert retried.terminated
+    assert retried.path == [
+        "introduction", "question_1", "retry_1", "retry2_1", "question_2", "retry_2", "progression", "conclusion", "hangup",
+    ]
+    assert retried.turns == 8
+
+@pytest.mark.parametrize("nodes, edges, problem", [
+    ([conversation("a"), hangup()], [edge("a", "hangup")], "expected one start node, found 0"),
+    ([conversation("a", start=True), hangup()], [edge("a", "missing")], "edge a -> missing references an unknown node"),
+    ([conversation("a", start=True), conversation("b")], [edge("a", "b")], "no endCall node"),
+    ([conversation("a", start=True), conversation("b"), hangup()], [edge("a", "hangup")], "node b is unreachable"),
+    (
+        [conversation("a", start=True), conversation("b"), hangup()],
+        [edge("a", "b"), edge("b", "a", "if {$[a].x} == true"), edge("a", "hangup")],
+        "the graph has a cycle, so calls may not terminate",
+    ),
+    (
+        [conversation("a", start=True, extracts=("score",)), hangup()],
+        [edge("a", "hangup", "if {$[a].quality} > 5")],
+        "edge from a reads quality, which a does not extract",
+    ),
+    (
+        [conversation("a", start=True), conversation("b", extracts=("x",)), conversation("c"), hangup()],
+        [edge("a", "b"), edge("a", "c"), edge("b", "c"), edge("c", "hangup", "if {$[b].x} == true")],
+        "edge from c reads b.x on a path that skips b",
+    ),
+])
+def test_broken_graphs_are_reported(nodes, edges, problem):
+    report = check_workflow(workflow(nodes, edges))
+    assert problem in report.problems
+    assert not report.ok
+
+def test_simulation_stops_where_no_edge_matches():
+    graph = WorkflowGraph(workflow(
+        [conversation("a", start=True, extracts=("x",)), hangup()],
+        [edge("a", "hangup", "if {$[a].x} == true")],
+    ))
+    simulation = graph.simulate({"a": [{"x": False}]})
+    assert not simulation.terminated
+    assert simulation.reason == "no edge from a matches"
@@ -0,0 +1,77 @@
+import json
+import math
+from pathlib import Path
+import pytest
+from helper.company.genworkflow import create_automated_interview_workflow
+from helper.company.workflow_templates import compile_template, get_workflow_template
+
+FIXTURES = Path(__file__).parent / "fixtures"
+QUESTIONS = ["Tell me about yourself.", "Describe a bug you chased down and how you fixed it."]
+
+def minimal_spec(**overrides) -> dict:
+    return {
+        "intro": {"name": "intro", "type": "conversation"},
+        "question": {"nodes": [{"name": "q${n}", "prompt": "${question}"}], "edges": [{"from": "q${n}", "to": "${next}"}]},
+        "conclusion": {"name": "conclusion"},
+        "end": {"name": "end", "type": "tool"},
+        "workflow": {"name": "${name}", "nodes": "${nodes}", "edges": "${edges}"},
+        **overrides,
+    }
+
+
+def test_standard_template_matches_the_handwritten_generator():
+    # Output of the generator the standard template replaced, for the same arguments.
+    expected = json.loads((FIXTURES / "standard_workflow.json").read_text())
+    workflow = create_automated_interview_workflow(
+        QUESTIONS, company_name="TechCorp", interviewer_name="Alex", name="TechCorp_Engineer_Interview_Workflow",
+        voice="andrew", model="gpt-4o", timeout_seconds=45, template="standard",
+    )
+    assert json.dumps(workflow) == json.dumps(expected)
+
+def test_renders_are_independent_copies():
+    template = get_workflow_template("standard")
+    expected = template.render(QUESTIONS)
+    first = template.render(QUESTIONS)
+    first["nodes"][0]["name"] = "changed"
+    first["nodes"][1]["metadata"]["position"]["x"] = -1
+    first["workflow"] = None
+    assert template.render(QUESTIONS) == expected
+
+def test_default_template_follows_the_setting(monkeypatch):
+    monkeypatch.setattr("helper.company.workflow_templates.DEFAULT_WORKFLOW_TEMPLATE", "concise")
+    assert create_automated_interview_workflow(QUESTIONS) == get_workflow_template("concise").render(
+        QUESTIONS, company_name="Your Company", interviewer_name="AI Interviewer", name="Automated Interview",
+        voice="andrew", model="gpt-4", timeout_seconds=30,
+    )
+    assert create_automated_interview_workflow(QUESTIONS) != create_automated_interview_workflow(QUESTIONS, template="standard")
+
+def test_template_values_are_data_not_code():
+    code = "__import__('os').system('echo pwned')"
+    spec = minimal_spec(
+        intro={"name": "intro", "prompt": code, "limit": math.inf, "missing": math.nan, "flags": [True, None]},
+    )
+    workflow = compile_template(spec, "untrusted").render(QUESTIONS, name=code)
+    intro = workflow["nodes"][0]
+    assert workflow["name"] == intro["prompt"] == code
+    assert intro["limit"] == math.inf and math.isnan(intro["missing"])
+    assert intro["flags"] == [True, None]
+
+def test_questions_are_chained_in_order():
+    workflow = compile_template(minimal_spec(), "minimal").render(QUESTIONS, name="Interview")
+    assert [node["name"] for node in workflow["nodes"]] == ["intro", "q1", "q2", "conclusion", "end"]
+    assert workflow["edges"] == [
+        {"from": "intro", "to": "q1"},
+        {"from": "q1", "to": "q2"},
+        {"from": "q2", "to": "conclusion"},
+        {"from": "conclusion", "to": "end"},
+    ]
+    assert workflow["nodes"][2]["prompt"] == QUESTIONS[1]
+
+@pytest.mark.parametrize("spec, error", [
+    (minimal_spec(conclusion={"name": "${unknown}"}), "undefined"),
+    (minimal_spec(end={"$fragment": "missing"}), "Unknown fragment"),
+    ({"intro": {}}, "missing"),
+])
+def test_invalid_templates_are_rejected(spec, error):
+    with pytest.raises(ValueError, match=error):
+        compile_template(spec, "broken")
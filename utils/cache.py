@@ -0,0 +1,281 @@
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+import orjson
+
+_cache = None
+# Expired entries are only dropped when read; this many writes to a cache also sweep them out,
+# so keys that are written and never read again (ETags, rate-limit buckets) can't pile up.
+CACHE_PURGE_INTERVAL_WRITES = int(os.getenv("CACHE_PURGE_INTERVAL_WRITES", "1000"))
+
+
+class MemoryCache:
+    """
+    Process-local TTL cache. The default; each worker keeps its own copy.
+
+    Every backend offers get/set/add/delete/incr plus update(key, fn, ttl), an atomic
+    read-modify-write where fn(old_value) returns (new_value, result), and purge(), which
+    drops expired entries and returns how many.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: dict[str, tuple[object, float | None]] = {}
+        self._writes = itertools.count(1)
+
+    def _wrote(self):
+        if next(self._writes) % CACHE_PURGE_INTERVAL_WRITES == 0:
+            self.purge()
+
+    def purge(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (_, expires_at) in self._data.items() if expires_at is not None and expires_at <= now]
+            for key in expired:
+                del self._data[key]
+        return len(expired)
+
+    def _alive(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._alive(key)
+            return orjson.loads(entry[0]) if entry else None
+
+    def set(self, key: str, value, ttl: float | None = None):
+        with self._lock:
+            self._data[key] = (orjson.dumps(value), time.monotonic() + ttl if ttl else None)
+        self._wrote()
+
+    def add(self, key: str, value, ttl: float | None = None) -> bool:
+        with self._lock:
+            if self._alive(key):
+                return False
+            self._data[key] = (orjson.dumps(value), time.monotonic() + ttl if ttl else None)
+        self._wrote()
+        return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            entry = self._alive(key)
+            value = (orjson.loads(entry[0]) if entry else 0) + amount
+            self._data[key] = (orjson.dumps(value), entry[1] if entry else None)
+        self._wrote()
+        return value
+
+    def update(self, key: str, fn, ttl: float | None = None):
+        with self._lock:
+            entry = self._alive(key)
+            value, result = fn(orjson.loads(entry[0]) if entry else None)
+            self._data[key] = (orjson.dumps(value), time.monotonic() + ttl if ttl else None)
+        self._wrote()
+        return result
+
+
+class SqliteCache:
+    """
+    Cache shared by every worker on one host through a SQLite file (by default on /dev/shm, so
+    it lives in shared memory). A stand-in for Redis when a single machine runs several workers.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._local = threading.local()
+        self._writes = itertools.count(1)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _wrote(self):
+        if next(self._writes) % CACHE_PURGE_INTERVAL_WRITES == 0:
+            self.purge()
+
+    def purge(self) -> int:
+        # The file lives in shared memory, so expired rows would otherwise hold RAM until restart.
+        return self._connect().execute(
+            "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+        ).rowcount
+
+    def get(self, key: str):
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        ).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def set(self, key: str, value, ttl: float | None = None):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, orjson.dumps(value), time.time() + ttl if ttl else None)
+        )
+        self._wrote()
+
+    def add(self, key: str, value, ttl: float | None = None) -> bool:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM cache WHERE key = ? AND expires_at IS NOT NULL AND expires_at <= ?", (key, time.time()))
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, orjson.dumps(value), time.time() + ttl if ttl else None)
+            ).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._wrote()
+        return inserted == 1
+
+    def delete(self, key: str):
+        self._connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            value = (orjson.loads(row[0]) if row else 0) + amount
+            conn.execute("INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, NULL)", (key, orjson.dumps(value)))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._wrote()
+        return value
+
+    def update(self, key: str, fn, ttl: float | None = None):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+            value, result = fn(orjson.loads(row[0]) if row else None)
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, orjson.dumps(value), time.time() + ttl if ttl else None)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._wrote()
+        return result
+
+
+class RedisCache:
+    """Cache shared across hosts. Requires the optional `redis` package."""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str):
+        value = self._client.get(key)
+        return orjson.loads(value) if value is not None else None
+
+    def set(self, key: str, value, ttl: float | None = None):
+        self._client.set(key, orjson.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    def add(self, key: str, value, ttl: float | None = None) -> bool:
+        return bool(self._client.set(key, orjson.dumps(value), px=int(ttl * 1000) if ttl else None, nx=True))
+
+    def delete(self, key: str):
+        self._client.delete(key)
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        return int(self._client.incrby(key, amount))
+
+    def purge(self) -> int:
+        # Redis expires keys itself.
+        return 0
+
+    def update(self, key: str, fn, ttl: float | None = None):
+        import redis
+
+        while True:
+            with self._client.pipeline() as pipe:
+                try:
+                    pipe.watch(key)
+                    current = pipe.get(key)
+                    value, result = fn(orjson.loads(current) if current is not None else None)
+                    pipe.multi()
+                    pipe.set(key, orjson.dumps(value), px=int(ttl * 1000) if ttl else None)
+                    pipe.execute()
+                    return result
+                except redis.WatchError:
+                    continue
+
+
+def create_cache(url: str | None):
+    """
+    CACHE_URL selects the backend:
+        unset / memory://              process-local
+        sqlite:////dev/shm/yapply.db   shared by workers on one host
+        redis://host:6379/0            shared across hosts
+    """
+    if not url or url.startswith("memory://"):
+        return MemoryCache()
+    parsed = urlparse(url)
+    if parsed.scheme == "sqlite":
+        return SqliteCache(parsed.path)
+    if parsed.scheme in ("redis", "rediss"):
+        return RedisCache(url)
+    raise ValueError(f"Unsupported CACHE_URL: {url}")
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = create_cache(os.getenv("CACHE_URL"))
+    return _cache
+
+def reset_cache():
+    global _cache
+    _cache = None
+
+
+class Generation:
+    """
+    Shared change counter per scope (e.g. company). In-process indexes remember the generation
+    they were built at; when another worker records a change the shared counter moves ahead
+    and the stale worker rebuilds on its next read.
+    """
+
+    def __init__(self, namespace: str):
+        self._namespace = namespace
+
+    def current(self, scope: str) -> int:
+        return get_cache().get(f"gen:{self._namespace}:{scope}") or 0
+
+    def bump(self, scope: str) -> int:
+        return get_cache().incr(f"gen:{self._namespace}:{scope}")
+
+
+os.register_at_fork(after_in_child=reset_cache)
@@ -0,0 +1,45 @@
+import hashlib
+import os
+from typing import Callable
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+from utils.cache import Generation, get_cache
+
+VIEW_CACHE_TTL_SECONDS = int(os.getenv("VIEW_CACHE_TTL_SECONDS", "300"))
+
+# Bumped by every handler that changes a company's roles, questions or interviews; the
+# ETags and cached bodies of that company's read endpoints are derived from it.
+company_views = Generation("company_views")
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag.removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def cached_view(request: Request, scope: str, resource: str, load: Callable) -> Response:
+    """
+    Serves a read-mostly view with an ETag derived from the scope's generation, so a matching
+    If-None-Match is answered with 304 from the cache alone. Otherwise the body comes from the
+    response cache when it was built at the current generation, or from load(), which must
+    return JSON-ready data (it is cached and sent through orjson as is). Errors raised by
+    load() are not cached.
+    """
+    generation = company_views.current(scope)
+    digest = hashlib.blake2b(f"{scope}:{resource}:{generation}".encode(), digest_size=8).hexdigest()
+    etag = f'W/"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    cache_key = f"view:{scope}:{resource}"
+    cached = get_cache().get(cache_key)
+    if cached is not None and cached["generation"] == generation:
+        body = cached["body"]
+    else:
+        body = load()
+        get_cache().set(cache_key, {"generation": generation, "body": body}, ttl=VIEW_CACHE_TTL_SECONDS)
+    return ORJSONResponse(body, headers=headers)
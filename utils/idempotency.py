@@ -0,0 +1,52 @@
+import os
+from typing import Awaitable, Callable
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from utils.cache import get_cache
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+# How long a request may hold its key before another attempt is allowed to take over.
+IN_FLIGHT_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_IN_FLIGHT_TTL_SECONDS", "300"))
+MAX_KEY_LENGTH = 255
+
+
+async def idempotent(scope: str, key: str | None, fingerprint: str, operation: Callable[[], Awaitable],
+                     response: Response | None = None):
+    """
+    Runs operation once per Idempotency-Key and replays its stored result for repeats within
+    IDEMPOTENCY_TTL_SECONDS. The key is claimed with an atomic cache add, so concurrent
+    duplicates get 409 instead of running the operation twice; reusing a key for a different
+    request (fingerprint) is rejected with 422. Failed operations release the key so the
+    client can retry. Without a key the operation simply runs.
+    """
+    if key is None:
+        return await operation()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+
+    cache = get_cache()
+    cache_key = f"idempotency:{scope}:{key}"
+    while not cache.add(cache_key, {"state": "pending", "fingerprint": fingerprint}, ttl=IN_FLIGHT_TTL_SECONDS):
+        stored = cache.get(cache_key)
+        if stored is None:
+            # Expired between the add and the get; try to claim it again.
+            continue
+        if stored["fingerprint"] != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        if stored["state"] == "pending":
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still in progress",
+                headers={"Retry-After": "1"},
+            )
+        if response is not None:
+            response.headers["Idempotent-Replayed"] = "true"
+        return stored["body"]
+
+    try:
+        body = jsonable_encoder(await operation())
+    except BaseException:
+        cache.delete(cache_key)
+        raise
+    cache.set(cache_key, {"state": "done", "fingerprint": fingerprint, "body": body}, ttl=IDEMPOTENCY_TTL_SECONDS)
+    return body
@@ -0,0 +1,209 @@
+import asyncio
+import math
+import os
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from utils.cache import get_cache
+
+
+def _rate(env: str, default: str) -> tuple[int, float] | None:
+    """"burst/seconds", e.g. "10/60" allows bursts of 10 refilling at 10 per minute. "0" disables."""
+    value = os.getenv(env, default)
+    if value.strip() == "0":
+        return None
+    burst, seconds = value.split("/")
+    return int(burst), float(seconds)
+
+
+# Token buckets per endpoint class; "company" buckets are keyed by company_id, "candidate"
+# buckets by the candidate's email.
+RATE_LIMITS = {
+    "evaluation": {"company": _rate("RATE_LIMIT_EVALUATION", "30/60")},
+    "workflow": {"company": _rate("RATE_LIMIT_WORKFLOW", "10/60")},
+    "export": {"company": _rate("RATE_LIMIT_EXPORT", "10/600")},
+    "call": {
+        "company": _rate("RATE_LIMIT_CALL", "60/60"),
+        "candidate": _rate("RATE_LIMIT_CALL_CANDIDATE", "3/600"),
+    },
+}
+# Concurrent requests per worker for each class, and how many of them one company may hold.
+CONCURRENCY = {
+    "evaluation": (int(os.getenv("RATE_LIMIT_EVALUATION_CONCURRENCY", "8")), int(os.getenv("RATE_LIMIT_EVALUATION_PER_COMPANY", "2"))),
+    "workflow": (int(os.getenv("RATE_LIMIT_WORKFLOW_CONCURRENCY", "4")), int(os.getenv("RATE_LIMIT_WORKFLOW_PER_COMPANY", "1"))),
+    "export": (int(os.getenv("RATE_LIMIT_EXPORT_CONCURRENCY", "2")), int(os.getenv("RATE_LIMIT_EXPORT_PER_COMPANY", "1"))),
+    "call": (int(os.getenv("RATE_LIMIT_CALL_CONCURRENCY", "16")), int(os.getenv("RATE_LIMIT_CALL_PER_COMPANY", "4"))),
+}
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("RATE_LIMIT_QUEUE_TIMEOUT_SECONDS", "30"))
+OUTCOMES = ("allowed", "throttled", "queued", "queue_timeout")
+
+
+def take_token(key: str, burst: int, seconds: float, now: float | None = None) -> float:
+    """
+    Token bucket in GCRA form: the bucket is stored as one timestamp (when it will be full
+    again), so a check is a single atomic read-modify-write on the cache. Works against the
+    in-process cache or a shared one (CACHE_URL) so every worker draws from the same bucket.
+    Returns 0 when a token was taken, otherwise the seconds until one is available.
+    """
+    interval = seconds / burst
+    tolerance = seconds - interval
+    now = time.time() if now is None else now
+
+    def step(full_at):
+        full_at = max(full_at or now, now)
+        if full_at - now > tolerance:
+            return full_at, full_at - tolerance - now
+        return full_at + interval, 0.0
+
+    return get_cache().update(f"ratelimit:{key}", step, ttl=seconds + 1)
+
+
+class FairScheduler:
+    """
+    Caps concurrent requests per worker and per company. When slots are scarce, waiting
+    requests are admitted round-robin across companies, so one company's backlog can't take
+    every slot while others wait.
+    """
+
+    def __init__(self, slots: int, per_key: int):
+        self._slots = slots
+        self._per_key = per_key
+        self._in_use = 0
+        self._active: Counter = Counter()
+        self._waiting: OrderedDict[str, deque] = OrderedDict()
+
+    def _grant(self, key: str):
+        self._in_use += 1
+        self._active[key] += 1
+
+    def _dispatch(self):
+        while self._in_use < self._slots:
+            for key, queue in self._waiting.items():
+                if self._active[key] < self._per_key:
+                    break
+            else:
+                return
+            future = queue.popleft()
+            if not queue:
+                del self._waiting[key]
+            else:
+                self._waiting.move_to_end(key)
+            if not future.done():
+                self._grant(key)
+                future.set_result(None)
+
+    def release(self, key: str):
+        self._in_use -= 1
+        self._active[key] -= 1
+        if self._active[key] <= 0:
+            del self._active[key]
+        self._dispatch()
+
+    def available(self, key: str) -> bool:
+        return self._in_use < self._slots and self._active[key] < self._per_key and key not in self._waiting
+
+    async def acquire(self, key: str, timeout: float) -> bool:
+        """Returns False when no slot freed up within timeout."""
+        if self.available(key):
+            self._grant(key)
+            return True
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(key, deque()).append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        except BaseException:
+            if future.done() and not future.cancelled():
+                self.release(key)
+            raise
+        finally:
+            queue = self._waiting.get(key)
+            if queue is not None and future in queue:
+                queue.remove(future)
+                if not queue:
+                    del self._waiting[key]
+
+    def stats(self) -> dict:
+        return {
+            "slots": self._slots,
+            "in_use": self._in_use,
+            "waiting": sum(len(queue) for queue in self._waiting.values()),
+        }
+
+
+class RateLimiter:
+    def __init__(self):
+        self._schedulers: dict[str, FairScheduler] = {}
+        self._throttled_companies: dict[str, Counter] = {}
+
+    def _scheduler(self, endpoint: str) -> FairScheduler:
+        scheduler = self._schedulers.get(endpoint)
+        if scheduler is None:
+            scheduler = self._schedulers[endpoint] = FairScheduler(*CONCURRENCY[endpoint])
+        return scheduler
+
+    def _count(self, endpoint: str, outcome: str, company_id: str | None = None):
+        get_cache().incr(f"ratelimit:metrics:{endpoint}:{outcome}")
+        if outcome in ("throttled", "queue_timeout") and company_id:
+            self._throttled_companies.setdefault(endpoint, Counter())[company_id] += 1
+
+    def _throttle(self, endpoint: str, company_id: str, retry_after: float):
+        self._count(endpoint, "throttled", company_id)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many {endpoint} requests, retry later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+    def check(self, endpoint: str, company_id: str, candidate: str | None = None):
+        """Takes a token from each bucket that applies, raising 429 with Retry-After when one is empty."""
+        limits = RATE_LIMITS[endpoint]
+        buckets = [("company", company_id)]
+        if candidate is not None:
+            buckets.append(("candidate", candidate))
+        for scope, key in buckets:
+            rate = limits.get(scope)
+            if rate is None:
+                continue
+            retry_after = take_token(f"{endpoint}:{scope}:{key}", *rate)
+            if retry_after:
+                self._throttle(endpoint, company_id, retry_after)
+
+    @asynccontextmanager
+    async def slot(self, endpoint: str, company_id: str):
+        """Holds one of the worker's concurrent slots for the endpoint class, queueing fairly when none are free."""
+        scheduler = self._scheduler(endpoint)
+        if not scheduler.available(company_id):
+            self._count(endpoint, "queued")
+        if not await scheduler.acquire(company_id, QUEUE_TIMEOUT_SECONDS):
+            self._count(endpoint, "queue_timeout", company_id)
+            raise HTTPException(status_code=429, detail=f"Too many {endpoint} requests in progress, retry later", headers={"Retry-After": "1"})
+        self._count(endpoint, "allowed")
+        try:
+            yield
+        finally:
+            scheduler.release(company_id)
+
+    @asynccontextmanager
+    async def limit(self, endpoint: str, company_id: str, candidate: str | None = None):
+        self.check(endpoint, company_id, candidate)
+        async with self.slot(endpoint, company_id):
+            yield
+
+    def metrics(self) -> dict:
+        """Throttle counters (shared across workers when CACHE_URL is shared) plus this worker's queue state."""
+        cache = get_cache()
+        return {
+            endpoint: {
+                **{outcome: cache.get(f"ratelimit:metrics:{endpoint}:{outcome}") or 0 for outcome in OUTCOMES},
+                "worker": self._scheduler(endpoint).stats(),
+                "top_throttled_companies": dict(self._throttled_companies.get(endpoint, Counter()).most_common(10)),
+            }
+            for endpoint in RATE_LIMITS
+        }
+
+
+rate_limiter = RateLimiter()
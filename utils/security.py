@@ -1,12 +1,27 @@
-from passlib.context import CryptContext
+import hmac
+import os
+from functools import lru_cache
+from fastapi import Header, HTTPException
 
-pwd_context = CryptContext(["bcrypt"], deprecated="auto")
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(["bcrypt"], deprecated="auto")
 
 def hash_password(access_code: str) -> str:
-    return pwd_context.hash(access_code)
+    return get_pwd_context().hash(access_code)
 
 def verify_password(plain_code: str, hashed_code: str) -> bool:
-    return pwd_context.verify(plain_code, hashed_code)
+    return get_pwd_context().verify(plain_code, hashed_code)
+
+def require_metrics_token(x_metrics_token: str | None = Header(default=None)):
+    """Admin gate for the /metrics endpoints. They are hidden entirely unless METRICS_TOKEN is set."""
+    expected = os.getenv("METRICS_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_metrics_token or not hmac.compare_digest(x_metrics_token.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Unauthorized")
 
 if __name__ == "__main__":
     print(hash_password("secret"))